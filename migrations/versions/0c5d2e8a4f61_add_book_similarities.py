@@ -0,0 +1,41 @@
+"""add book_similarities table and tag -> book index
+
+Revision ID: 0c5d2e8a4f61
+Revises: f3c0a9d27b15
+Create Date: 2026-03-26 16:08:55.910427
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c5d2e8a4f61'
+down_revision: Union[str, Sequence[str], None] = 'f3c0a9d27b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_book_tag_tag_id_book_id', 'book_tag', ['tag_id', 'book_id'], unique=False)
+    op.create_table('book_similarities',
+    sa.Column('book_id', sa.UUID(), nullable=False),
+    sa.Column('similar_book_id', sa.UUID(), nullable=False),
+    sa.Column('score', sa.REAL(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['similar_book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id', 'similar_book_id')
+    )
+    op.create_index('ix_book_similarities_book_id_score', 'book_similarities', ['book_id', 'score', 'similar_book_id'], unique=False)
+    op.create_index('ix_book_similarities_similar_book_id', 'book_similarities', ['similar_book_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_similarities_similar_book_id', table_name='book_similarities')
+    op.drop_index('ix_book_similarities_book_id_score', table_name='book_similarities')
+    op.drop_table('book_similarities')
+    op.drop_index('ix_book_tag_tag_id_book_id', table_name='book_tag')
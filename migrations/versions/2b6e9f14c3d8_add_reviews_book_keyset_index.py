@@ -0,0 +1,28 @@
+"""add reviews keyset index per book
+
+Revision ID: 2b6e9f14c3d8
+Revises: 91f0b6d4e2a7
+Create Date: 2026-03-19 09:52:41.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b6e9f14c3d8'
+down_revision: Union[str, Sequence[str], None] = '91f0b6d4e2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reviews_book_id_created_at_id', 'reviews', ['book_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reviews_book_id_created_at_id', table_name='reviews')
@@ -0,0 +1,30 @@
+"""add books keyset pagination indexes
+
+Revision ID: 3f1c9a7e2b44
+Revises: 54e78adbd8e8
+Create Date: 2026-03-02 10:14:52.118304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7e2b44'
+down_revision: Union[str, Sequence[str], None] = '54e78adbd8e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_books_created_at_id', 'books', ['created_at', 'id'], unique=False)
+    op.create_index('ix_books_user_id_created_at_id', 'books', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_user_id_created_at_id', table_name='books')
+    op.drop_index('ix_books_created_at_id', table_name='books')
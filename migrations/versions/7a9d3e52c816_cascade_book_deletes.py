@@ -0,0 +1,39 @@
+"""cascade book and tag deletes to reviews and book_tag
+
+Revision ID: 7a9d3e52c816
+Revises: e41b7c6a0d93
+Create Date: 2026-03-12 11:37:09.613840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a9d3e52c816'
+down_revision: Union[str, Sequence[str], None] = 'e41b7c6a0d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, constraint, column, referred table)
+FOREIGN_KEYS = [
+    ('reviews', 'reviews_book_id_fkey', 'book_id', 'books'),
+    ('book_tag', 'book_tag_book_id_fkey', 'book_id', 'books'),
+    ('book_tag', 'book_tag_tag_id_fkey', 'tag_id', 'tags'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, name, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'])
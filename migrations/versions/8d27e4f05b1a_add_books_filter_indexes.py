@@ -0,0 +1,38 @@
+"""add books filter and sort indexes
+
+Revision ID: 8d27e4f05b1a
+Revises: 3f1c9a7e2b44
+Create Date: 2026-03-04 16:41:07.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d27e4f05b1a'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7e2b44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_books_author', 'books', ['author'], unique=False)
+    op.create_index('ix_books_publisher', 'books', ['publisher'], unique=False)
+    op.create_index('ix_books_language', 'books', ['language'], unique=False)
+    op.create_index('ix_books_published_date_id', 'books', ['published_date', 'id'], unique=False)
+    op.create_index('ix_books_page_count_id', 'books', ['page_count', 'id'], unique=False)
+    op.create_index('ix_books_title_id', 'books', ['title', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_title_id', table_name='books')
+    op.drop_index('ix_books_page_count_id', table_name='books')
+    op.drop_index('ix_books_published_date_id', table_name='books')
+    op.drop_index('ix_books_language', table_name='books')
+    op.drop_index('ix_books_publisher', table_name='books')
+    op.drop_index('ix_books_author', table_name='books')
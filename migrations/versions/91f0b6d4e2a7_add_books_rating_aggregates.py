@@ -0,0 +1,87 @@
+"""add books rating aggregates
+
+Revision ID: 91f0b6d4e2a7
+Revises: 7a9d3e52c816
+Create Date: 2026-03-16 15:02:44.871265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '91f0b6d4e2a7'
+down_revision: Union[str, Sequence[str], None] = '7a9d3e52c816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('review_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('books', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column(
+        'books',
+        sa.Column('rating_histogram', postgresql.ARRAY(sa.Integer()), server_default='{0,0,0,0,0}', nullable=False),
+    )
+
+    # backfill from the existing reviews
+    op.execute(
+        """
+        UPDATE books
+        SET review_count = stats.review_count,
+            rating_sum = stats.rating_sum,
+            rating_histogram = stats.rating_histogram
+        FROM (
+            SELECT book_id,
+                   count(*) AS review_count,
+                   sum(rating) AS rating_sum,
+                   ARRAY[
+                       count(*) FILTER (WHERE rating = 1),
+                       count(*) FILTER (WHERE rating = 2),
+                       count(*) FILTER (WHERE rating = 3),
+                       count(*) FILTER (WHERE rating = 4),
+                       count(*) FILTER (WHERE rating = 5)
+                   ]::integer[] AS rating_histogram
+            FROM reviews
+            WHERE book_id IS NOT NULL
+            GROUP BY book_id
+        ) AS stats
+        WHERE books.id = stats.book_id
+        """
+    )
+
+    op.add_column(
+        'books',
+        sa.Column(
+            'avg_rating',
+            postgresql.DOUBLE_PRECISION(),
+            # unrated books have no average, so they sort after every rated book
+            sa.Computed(
+                "CASE WHEN review_count > 0 THEN rating_sum::double precision / review_count END",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index('ix_books_avg_rating_id', 'books', ['avg_rating', 'id'], unique=False)
+    # ascending NULLS LAST is the default order; descending NULLS LAST needs its own index
+    op.create_index(
+        'ix_books_avg_rating_desc_id', 'books',
+        [sa.text('avg_rating DESC NULLS LAST'), sa.text('id DESC')], unique=False,
+    )
+    op.create_index('ix_books_review_count_id', 'books', ['review_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_review_count_id', table_name='books')
+    op.drop_index('ix_books_avg_rating_desc_id', table_name='books')
+    op.drop_index('ix_books_avg_rating_id', table_name='books')
+    op.drop_column('books', 'avg_rating')
+    op.drop_column('books', 'rating_histogram')
+    op.drop_column('books', 'rating_sum')
+    op.drop_column('books', 'review_count')
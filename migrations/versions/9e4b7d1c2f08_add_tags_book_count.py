@@ -0,0 +1,45 @@
+"""add tags book_count
+
+Revision ID: 9e4b7d1c2f08
+Revises: 0c5d2e8a4f61
+Create Date: 2026-03-29 09:12:05.518342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b7d1c2f08'
+down_revision: Union[str, Sequence[str], None] = '0c5d2e8a4f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tags', sa.Column('book_count', sa.Integer(), server_default='0', nullable=False))
+
+    # backfill from the existing links
+    op.execute(
+        """
+        UPDATE tags
+        SET book_count = counts.book_count
+        FROM (
+            SELECT tag_id, count(*) AS book_count
+            FROM book_tag
+            GROUP BY tag_id
+        ) AS counts
+        WHERE tags.id = counts.tag_id
+        """
+    )
+
+    op.create_index('ix_tags_book_count_id', 'tags', ['book_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tags_book_count_id', table_name='tags')
+    op.drop_column('tags', 'book_count')
@@ -0,0 +1,30 @@
+"""add reviews listing indexes
+
+Revision ID: d4a81c7f5e20
+Revises: 2b6e9f14c3d8
+Create Date: 2026-03-20 14:26:03.551982
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a81c7f5e20'
+down_revision: Union[str, Sequence[str], None] = '2b6e9f14c3d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reviews_created_at_id', 'reviews', ['created_at', 'id'], unique=False)
+    op.create_index('ix_reviews_user_id_created_at_id', 'reviews', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reviews_user_id_created_at_id', table_name='reviews')
+    op.drop_index('ix_reviews_created_at_id', table_name='reviews')
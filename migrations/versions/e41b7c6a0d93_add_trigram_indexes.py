@@ -0,0 +1,42 @@
+"""add trigram indexes for suggestions
+
+Revision ID: e41b7c6a0d93
+Revises: c5e8a1d39f70
+Create Date: 2026-03-09 14:05:48.290117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b7c6a0d93'
+down_revision: Union[str, Sequence[str], None] = 'c5e8a1d39f70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_books_title_trgm', 'books', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_books_author_trgm', 'books', ['author'], unique=False,
+        postgresql_using='gin', postgresql_ops={'author': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_tags_name_trgm', 'tags', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tags_name_trgm', table_name='tags')
+    op.drop_index('ix_books_author_trgm', table_name='books')
+    op.drop_index('ix_books_title_trgm', table_name='books')
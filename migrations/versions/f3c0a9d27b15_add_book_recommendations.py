@@ -0,0 +1,36 @@
+"""add book_recommendations table
+
+Revision ID: f3c0a9d27b15
+Revises: d4a81c7f5e20
+Create Date: 2026-03-24 10:41:18.362057
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c0a9d27b15'
+down_revision: Union[str, Sequence[str], None] = 'd4a81c7f5e20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_recommendations',
+    sa.Column('book_id', sa.UUID(), nullable=False),
+    sa.Column('neighbor_ids', postgresql.ARRAY(sa.UUID()), nullable=False),
+    sa.Column('scores', postgresql.ARRAY(sa.REAL()), nullable=False),
+    sa.Column('computed_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('book_recommendations')
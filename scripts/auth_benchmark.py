@@ -0,0 +1,145 @@
+"""Per-request cost of the authentication dependencies.
+
+Drives a route shaped like the book routes (a RoleChecker dependency plus the
+access token as a parameter) through the real dependency chain and counts the
+JWT decodes, blocklist lookups and user loads each request makes. Redis and
+the database are replaced by stand-ins that sleep for a configurable round
+trip, so the numbers isolate the pipeline itself. The baseline reproduces the
+previous pipeline: two bearer instances, each decoding the token twice.
+
+    python -m scripts.auth_benchmark --requests 2000 --redis-rtt-ms 0.3 --db-rtt-ms 1
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.auth import dependencies
+from src.auth.utils import create_access_token
+from src.db.main import get_session
+
+calls = Counter()
+_decode = dependencies.decode_access_token
+
+
+def _counting_decode(token: str) -> dict:
+    calls["decode"] += 1
+    return _decode(token)
+
+
+def _blocklist(rtt: float):
+    async def is_token_blocked(jti: str) -> bool:
+        calls["blocklist"] += 1
+        await asyncio.sleep(rtt)
+        return False
+    return is_token_blocked
+
+
+def _user_loader(rtt: float):
+    async def get_user_by_email(email: str, session):
+        calls["user"] += 1
+        await asyncio.sleep(rtt)
+        return SimpleNamespace(email=email, role="user", is_verified=True)
+    return get_user_by_email
+
+
+async def _no_session():
+    yield None
+
+
+class _LegacyAccessTokenBearer(dependencies.AccessTokenBearer):
+    """The pipeline before decode-once: no request reuse and a second decode in token_valid."""
+
+    async def __call__(self, request: Request):
+        credentials = await dependencies.HTTPBearer.__call__(self, request)
+        token = credentials.credentials
+        token_data = dependencies.decode_access_token(token)
+        if not self.token_valid(token):
+            raise dependencies.InvalidToken()
+        if await dependencies.is_token_blocked(token_data['jti']):
+            raise dependencies.InvalidToken()
+        self.verify_token_data(token_data)
+        return token_data
+
+    def token_valid(self, token: str) -> bool:
+        return dependencies.decode_access_token(token) is not None
+
+
+def _legacy_app() -> FastAPI:
+    async def get_current_user(
+            token_data: dict = Depends(_LegacyAccessTokenBearer()),
+            session=Depends(get_session)):
+        return await dependencies.user_service.get_user_by_email(token_data['user']['email'], session)
+
+    class RoleChecker(dependencies.RoleChecker):
+        async def __call__(self, current_user=Depends(get_current_user)):
+            return await super().__call__(current_user)
+
+    app = FastAPI()
+
+    @app.get("/probe", dependencies=[Depends(RoleChecker(["admin", "user"]))])
+    async def probe(token_details: dict = Depends(_LegacyAccessTokenBearer())):
+        return {"email": token_details['user']['email']}
+
+    return app
+
+
+def _current_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/probe", dependencies=[Depends(dependencies.RoleChecker(["admin", "user"]))])
+    async def probe(token_details: dict = Depends(dependencies.access_token_bearer)):
+        return {"email": token_details['user']['email']}
+
+    return app
+
+
+def measure(app: FastAPI, requests: int, token: str) -> dict:
+    app.dependency_overrides[get_session] = _no_session
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with TestClient(app) as client:
+        client.get("/probe", headers=headers).raise_for_status()  # warm up
+        calls.clear()
+        started = time.perf_counter()
+        for _ in range(requests):
+            client.get("/probe", headers=headers).raise_for_status()
+        elapsed = time.perf_counter() - started
+
+    return {
+        "decodes": calls["decode"] / requests,
+        "blocklist lookups": calls["blocklist"] / requests,
+        "user loads": calls["user"] / requests,
+        "ms per request": 1000 * elapsed / requests,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--redis-rtt-ms", type=float, default=0.3)
+    parser.add_argument("--db-rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    token = create_access_token({"email": "bench@example.com", "user_uid": "bench", "role": "user"})
+
+    with mock.patch.object(dependencies, "decode_access_token", _counting_decode), \
+            mock.patch.object(dependencies, "is_token_blocked", _blocklist(args.redis_rtt_ms / 1000)), \
+            mock.patch.object(dependencies.user_service, "get_user_by_email", _user_loader(args.db_rtt_ms / 1000)):
+        results = {
+            "before": measure(_legacy_app(), args.requests, token),
+            "after": measure(_current_app(), args.requests, token),
+        }
+
+    print(f"{'per request':<20}{'before':>10}{'after':>10}")
+    for metric in results["before"]:
+        print(f"{metric:<20}{results['before'][metric]:>10.2f}{results['after'][metric]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,22 @@ from src.books.routes import book_router
 from src.auth.routes import auth_router
 from src.reviews.routes import review_router
 from src.tags.routes import tags_router
+from src.export.routes import export_router
 from .errors import register_error_handlers
 from .middleware import register_middleware
-# from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
+from src.tags import cache as tag_cache
 # from src.db.main import init_db
 
-# @asynccontextmanager
-# async def life_span(app:FastAPI):
-#   print(f"server is starting ... ")
-#   await init_db()
-#   yield
-#   print(f"server has been stopped ... ") 
+@asynccontextmanager
+async def life_span(app:FastAPI):
+  # every worker warms its own tag cache and listens for invalidations from the others
+  tag_listener = await tag_cache.start()
+  yield
+  tag_listener.cancel()
+  with suppress(asyncio.CancelledError):
+    await tag_listener
 
 
 # Internal release version (for your team)
@@ -27,6 +32,7 @@ app = FastAPI(
   title="Bookly API",
   version=API_RELEASE, 
   description="A simple REST API for a book review web service built with FastAPI",
+  lifespan=life_span,
 )
 
 # Register Error Handlers
@@ -44,6 +50,7 @@ v1_router.include_router(book_router, prefix="/books", tags=["Books"])
 v1_router.include_router(auth_router, prefix="/auth", tags=["Auth"])
 v1_router.include_router(review_router, prefix="/reviews", tags=["Reviews"])
 v1_router.include_router(tags_router, prefix="/tags", tags=["Tags"])
+v1_router.include_router(export_router, prefix="/export", tags=["Export"])
 
 
 # 3. Include only the Master Router in your main app
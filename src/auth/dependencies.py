@@ -19,37 +19,46 @@ from src.errors import (
 user_service = UserService()
 
 class TokenBearer(HTTPBearer):
+    # request.state attribute holding the verified claims, so every dependency that
+    # asks for this kind of token within one request shares a single decode and
+    # blocklist lookup
+    state_key = "token_data"
+
     def __init__(self, auto_error: bool = True):
         super().__init__(auto_error=auto_error)
 
     async def __call__(self, request: Request) -> HTTPAuthorizationCredentials | None:
+        token_data = getattr(request.state, self.state_key, None)
+        if token_data is not None:
+            return token_data
+
         credentials = await super().__call__(request)
         
         token = credentials.credentials if credentials else None
         token_data = decode_access_token(token) if token else None
 
-        if not self.token_valid(token):
+        if not self.token_valid(token_data):
             raise InvalidToken()
         
-        if token_data and await is_token_blocked(token_data['jti']):
+        if await is_token_blocked(token_data['jti']):
             raise InvalidToken()
         
         self.verify_token_data(token_data)
-        
-        return token_data if token_data else None
+
+        setattr(request.state, self.state_key, token_data)
+        return token_data
         
     
-    def token_valid(self, token: str) -> bool:
-        # Implement your token validation logic here
-        # For example, you can decode the token and check its validity
-        token_data = decode_access_token(token)
-        
+    def token_valid(self, token_data: dict | None) -> bool:
+        # the token has already been decoded once; a failed decode yields None
         return token_data is not None
     
     def verify_token_data(self, token_data: dict):
         raise NotImplementedError("Subclasses must implement this method to verify token data")
 
 class AccessTokenBearer(TokenBearer):
+    state_key = "access_token_data"
+
     def verify_token_data(self, token_data: dict) -> None:
         # Implement your access token specific validation logic here
         # For example, you can check if the token has the correct scopes or permissions
@@ -57,14 +66,21 @@ class AccessTokenBearer(TokenBearer):
             raise AccessTokenRequired()
 
 class RefreshTokenBearer(TokenBearer):
+    state_key = "refresh_token_data"
+
     def verify_token_data(self, token_data: dict) -> None:
         # Implement your refresh token specific validation logic here
         # For example, you can check if the token has the correct scopes or permissions
         if token_data and not token_data['refresh']:
             raise RefreshTokenRequired()
         
+# Shared instances: FastAPI caches a dependency per request by identity, so routes,
+# get_current_user and RoleChecker depending on the same object resolve it once.
+access_token_bearer = AccessTokenBearer()
+refresh_token_bearer = RefreshTokenBearer()
+
 async def get_current_user(
-        token_data: dict = Depends(AccessTokenBearer()),
+        token_data: dict = Depends(access_token_bearer),
         session: AsyncSession = Depends(get_session)) -> dict:
     # This function can be used in your routes to get the current user's details from the token
     user_email = token_data['user']['email']
@@ -77,7 +93,7 @@ class RoleChecker:
         self.allowed_roles = allowed_roles
 
     async def __call__(self, current_user: dict = Depends(get_current_user)) -> Any:
-        if not current_user.isVerified:
+        if not current_user.is_verified:
             raise AccountNotVerified()
         if current_user.role not in self.allowed_roles:
             raise InsufficientPermission()
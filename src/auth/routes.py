@@ -7,10 +7,11 @@ from .utils import create_access_token, verify_password, hash_password
 from src.auth.token_instance import email_token_service, reset_token_service
 from datetime import timedelta, datetime
 from fastapi.responses import JSONResponse
-from .dependencies import AccessTokenBearer, RefreshTokenBearer, get_current_user, RoleChecker
+from .dependencies import access_token_bearer, refresh_token_bearer, RoleChecker, get_current_user
 from src.db.redis import add_token_to_blocklist, is_token_blocked 
 from src.errors import InvalidCredentials, UserAlreadyExists, InvalidToken, UserNotFound
 from src.config import Config
+from src.db.models import User
 from src.celery_tasks import send_verification_email, send_password_reset_email
 
 auth_router = APIRouter()
@@ -63,10 +64,15 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
     )
 
 @auth_router.get("/me", response_model=UserReadWithBooks, status_code=status.HTTP_200_OK)
-async def read_current_user(current_user: dict = Depends(get_current_user), _:bool = Depends(role_checker)):
+async def read_current_user(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    _:bool = Depends(role_checker)):
+    # role_checker loaded the user through the same get_current_user; only /me renders
+    # the books and reviews, so only /me adds them to that instance
     if not current_user:
         raise InvalidCredentials()
-    return current_user
+    return await user_service.load_books_and_reviews(current_user, session)
   
 @auth_router.post("/login")
 async def login_user(login_data: UserLogin, session: AsyncSession = Depends(get_session)):
@@ -107,7 +113,7 @@ async def login_user(login_data: UserLogin, session: AsyncSession = Depends(get_
     raise InvalidCredentials()
 
 @auth_router.post("/refresh_token")
-async def new_access_token(token_details: dict = Depends(RefreshTokenBearer())):
+async def new_access_token(token_details: dict = Depends(refresh_token_bearer)):
     expiry_timestamp = token_details.get("exp")
     if datetime.fromtimestamp(expiry_timestamp) < datetime.now():
         raise InvalidToken()
@@ -121,7 +127,7 @@ async def new_access_token(token_details: dict = Depends(RefreshTokenBearer())):
     )
 
 @auth_router.post("/logout")
-async def logout_user(token_details: dict = Depends(AccessTokenBearer())):
+async def logout_user(token_details: dict = Depends(access_token_bearer)):
     jti = token_details.get("jti")
     if jti:
         await add_token_to_blocklist(jti)
@@ -1,7 +1,9 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
+from sqlalchemy.orm import noload
+from sqlalchemy.orm.attributes import set_committed_value
 from .utils import hash_password
-from src.db.models import User
+from src.db.models import Book, Review, User
 from .schema import UserCreate
 from itsdangerous import (
     URLSafeTimedSerializer,
@@ -12,12 +14,22 @@ import logging
 
 class UserService:
   async def get_user_by_email(self, email: str, session: AsyncSession):
-
-    statement = select(User).where(User.email == email)
+    # books and reviews are selectin relationships; only /me renders them (load_books_and_reviews)
+    statement = select(User).where(User.email == email).options(noload(User.books), noload(User.reviews))
     result = await session.exec(statement)
 
     return result.first()  # Returns the first matching user or None if not found
   
+  async def load_books_and_reviews(self, user: User, session: AsyncSession) -> User:
+    """Fill in the books and reviews of a user already loaded without them, one query each."""
+
+    books = await session.exec(select(Book).where(Book.user_id == user.id).options(noload(Book.reviews)))
+    reviews = await session.exec(select(Review).where(Review.user_id == user.id))
+    set_committed_value(user, "books", books.all())
+    set_committed_value(user, "reviews", reviews.all())
+
+    return user
+
   async def user_exists(self, email: str, session: AsyncSession):
     user = await self.get_user_by_email(email, session)
     return True if user is not None else False
@@ -0,0 +1,49 @@
+import uuid
+from typing import Iterable, Optional
+
+from src.db.redis import cache_delete, cache_get, cache_incr, cache_mget, cache_set
+
+BOOK_DETAIL_TTL = 300  # seconds; entries are also dropped on every write that changes them
+BOOK_DETAIL_HITS_KEY = "cache:book_detail:hits"
+BOOK_DETAIL_MISSES_KEY = "cache:book_detail:misses"
+INVALIDATION_BATCH = 1000
+
+
+def book_detail_key(book_id: uuid.UUID | str) -> str:
+  return f"book:{book_id}:detail"
+
+
+# Entries are stored as "<version>\n<payload>", the version being the book's ETag.
+# A read that raced a write may still store what it read after the write's
+# invalidation, but under the old version, which no later reader accepts.
+
+async def get_book_detail(book_id: uuid.UUID, version: str) -> Optional[bytes]:
+  entry = await cache_get(book_detail_key(book_id))
+  prefix = f"{version}\n".encode()
+  payload = entry[len(prefix):] if entry is not None and entry.startswith(prefix) else None
+  await cache_incr(BOOK_DETAIL_HITS_KEY if payload is not None else BOOK_DETAIL_MISSES_KEY)
+  return payload
+
+
+async def set_book_detail(book_id: uuid.UUID, version: str, payload: str) -> None:
+  await cache_set(book_detail_key(book_id), f"{version}\n{payload}", ex=BOOK_DETAIL_TTL)
+
+
+async def invalidate_book_details(book_ids: Iterable[uuid.UUID | str]) -> None:
+  """Drop cached BookDetail payloads; call after the change has been committed."""
+
+  keys = [book_detail_key(book_id) for book_id in book_ids]
+  for start in range(0, len(keys), INVALIDATION_BATCH):
+    await cache_delete(*keys[start:start + INVALIDATION_BATCH])
+
+
+async def get_book_detail_stats() -> dict:
+  hits, misses = await cache_mget(BOOK_DETAIL_HITS_KEY, BOOK_DETAIL_MISSES_KEY)
+  hits, misses = int(hits or 0), int(misses or 0)
+  total = hits + misses
+
+  return {
+    "hits": hits,
+    "misses": misses,
+    "hit_ratio": round(hits / total, 4) if total else 0.0,
+  }
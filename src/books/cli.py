@@ -0,0 +1,43 @@
+"""Bulk import books from the command line.
+
+    python -m src.books.cli books.ndjson --user-id <uuid>
+    python -m src.books.cli catalog.csv --format csv
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from src.db.bulk import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, iter_records
+from src.db.main import async_session
+from src.books.service import BookService
+
+READ_SIZE = 1 << 16
+
+
+async def read_file(path: Path):
+  with path.open("rb") as f:
+    while chunk := f.read(READ_SIZE):
+      yield chunk
+
+
+async def import_file(path: Path, fmt: str, user_id: str | None, chunk_size: int):
+  async with async_session() as session:
+    records = iter_records(read_file(path), fmt)
+    return await BookService().import_books(records, user_id, session, chunk_size=chunk_size)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Bulk import books from an NDJSON or CSV file")
+  parser.add_argument("path", type=Path)
+  parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+  parser.add_argument("--user-id", help="owner of the imported books")
+  parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+  args = parser.parse_args()
+
+  fmt = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "ndjson")
+  report = asyncio.run(import_file(args.path, fmt, args.user_id, args.chunk_size))
+  print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+  main()
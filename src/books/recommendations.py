@@ -0,0 +1,156 @@
+"""Offline item-item collaborative filtering over the reviews table.
+
+Builds a sparse user x book matrix of mean-centred ratings (adjusted cosine),
+multiplies it with itself one block of books at a time and keeps the top
+neighbours of every book in book_recommendations. Run by the
+build_book_recommendations Celery task; the API only ever reads the result.
+"""
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.bulk import copy_records
+from src.db.main import worker_session
+from src.db.models import Book, BookRecommendation, Review
+from src.books.schemas import RECOMMENDATION_NEIGHBORS
+
+SIMILARITY_BLOCK = 2048  # books per block; bounds the memory of one sparse product
+READ_BATCH = 50000
+
+RECOMMENDATION_COLUMNS = ("book_id", "neighbor_ids", "scores", "computed_at")
+
+
+def rating_matrix(users: np.ndarray, books: np.ndarray, ratings: np.ndarray, n_users: int, n_books: int) -> sp.csr_matrix:
+  """User x book matrix of ratings minus each user's mean rating."""
+
+  ratings = ratings.astype(np.float32)
+  counts = np.bincount(users, minlength=n_users)
+  means = np.bincount(users, weights=ratings, minlength=n_users) / np.maximum(counts, 1)
+  centred = ratings - means[users].astype(np.float32)
+  # duplicate (user, book) pairs are summed by the constructor; reviews are one per pair in practice
+  return sp.csr_matrix((centred, (users, books)), shape=(n_users, n_books), dtype=np.float32)
+
+
+def top_k_neighbors(matrix: sp.csr_matrix, k: int = RECOMMENDATION_NEIGHBORS) -> Tuple[np.ndarray, np.ndarray]:
+  """Top-k cosine neighbours of every column of `matrix`.
+
+  Returns (neighbours, scores), both n_books x k and best first; rows with
+  fewer than k positive similarities are padded with -1 and 0.
+  """
+
+  n_books = matrix.shape[1]
+  norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+  inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0).astype(np.float32)
+  items = (matrix @ sp.diags(inverse)).T.tocsr()  # book x user, unit rows
+  items_t = items.T.tocsc()
+
+  neighbors = np.full((n_books, k), -1, dtype=np.int32)
+  scores = np.zeros((n_books, k), dtype=np.float32)
+
+  for start in range(0, n_books, SIMILARITY_BLOCK):
+    stop = min(start + SIMILARITY_BLOCK, n_books)
+    block = (items[start:stop] @ items_t).tocoo()
+
+    rows, cols, values = block.row, block.col, block.data
+    keep = (values > 0) & (cols != rows + start)
+    rows, cols, values = rows[keep], cols[keep], values[keep]
+    if not len(rows):
+      continue
+
+    # sort by row, best score first, then rank every entry within its row
+    order = np.lexsort((-values, rows))
+    rows, cols, values = rows[order], cols[order], values[order]
+    row_starts = np.searchsorted(rows, np.arange(stop - start))
+    rank = np.arange(len(rows)) - row_starts[rows]
+    top = rank < k
+
+    neighbors[rows[top] + start, rank[top]] = cols[top]
+    scores[rows[top] + start, rank[top]] = values[top]
+
+  return neighbors, scores
+
+
+def recommendation_rows(
+  book_ids: List[uuid.UUID],
+  neighbors: np.ndarray,
+  scores: np.ndarray,
+  surviving: Set[uuid.UUID],
+  computed_at: datetime,
+) -> List[tuple]:
+  """book_recommendations rows of the books in `surviving`, without neighbours outside it."""
+
+  alive = np.fromiter((book_id in surviving for book_id in book_ids), dtype=bool, count=len(book_ids))
+  rows = []
+  for index, book_id in enumerate(book_ids):
+    if not alive[index]:
+      continue
+    found = neighbors[index] >= 0
+    found[found] = alive[neighbors[index][found]]
+    if found.any():
+      rows.append((
+        book_id,
+        [book_ids[i] for i in neighbors[index][found]],
+        scores[index][found].tolist(),
+        computed_at,
+      ))
+  return rows
+
+
+async def _load_ratings(session: AsyncSession) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[uuid.UUID], int]:
+  user_index: Dict[uuid.UUID, int] = {}
+  book_index: Dict[uuid.UUID, int] = {}
+  users: List[int] = []
+  books: List[int] = []
+  ratings: List[int] = []
+
+  result = await session.stream(
+    select(Review.user_id, Review.book_id, Review.rating)
+    .where(Review.user_id.is_not(None), Review.book_id.is_not(None))
+    .execution_options(yield_per=READ_BATCH)
+  )
+  async for partition in result.partitions():
+    for user_id, book_id, rating in partition:
+      users.append(user_index.setdefault(user_id, len(user_index)))
+      books.append(book_index.setdefault(book_id, len(book_index)))
+      ratings.append(rating)
+
+  return (
+    np.asarray(users, dtype=np.int32),
+    np.asarray(books, dtype=np.int32),
+    np.asarray(ratings, dtype=np.int8),
+    list(book_index),
+    len(user_index),
+  )
+
+
+async def build_recommendations(k: int = RECOMMENDATION_NEIGHBORS) -> dict:
+  """Recompute every book's neighbour list and swap it in with one transaction."""
+
+  started = time.perf_counter()
+  async with worker_session() as session:
+    users, books, ratings, book_ids, n_users = await _load_ratings(session)
+    await session.commit()  # no transaction stays open while the matrix is computed
+    matrix = rating_matrix(users, books, ratings, n_users, len(book_ids))
+    neighbors, scores = top_k_neighbors(matrix, k)
+
+    # readers keep seeing the previous lists until the commit
+    await session.execute(delete(BookRecommendation))
+    # books deleted while the matrix was computed would fail the COPY on the foreign key
+    surviving = set((await session.execute(select(Book.id))).scalars())
+    rows = recommendation_rows(book_ids, neighbors, scores, surviving, datetime.now())
+    await copy_records(session, BookRecommendation.__tablename__, RECOMMENDATION_COLUMNS, rows)
+    await session.commit()
+
+  return {
+    "reviews": len(ratings),
+    "books": len(book_ids),
+    "users": n_users,
+    "recommended": len(rows),
+    "seconds": round(time.perf_counter() - started, 2),
+  }
@@ -1,36 +1,139 @@
-from fastapi import APIRouter, Path, status, Depends
+from fastapi import APIRouter, Path, Query, Request, Response, status, Depends
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.db.main import get_session
 from src.books.service import BookService
-from fastapi.exceptions import HTTPException
-from typing import List
-from src.books.schemas import Book, BookUpdate, BookCreate, BookDetail
-from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.books.cache import get_book_detail_stats
+from src.books import trending
+from src.etag import etag_matches, make_etag, not_modified, set_cache_headers
+from fastapi.exceptions import HTTPException, RequestValidationError
+from pydantic import ValidationError
+from typing import List, Optional
+from datetime import date
+import uuid
+from src.books.schemas import (
+  Book, BookUpdate, BookCreate, BookDetail, BookPage, BookFilter, BookSuggestion, BookRecommendation, SimilarBookPage, TrendingBook,
+  BookBatchGetRequest, BookBatchGetResponse, BookBulkSelection, BookBulkUpdate, BookBulkResult,
+  BOOK_SORT_PATTERN, DEFAULT_BOOK_SORT, RECOMMENDATION_NEIGHBORS, SUGGEST_MIN_LENGTH, SUGGEST_PATTERN, TAG_QUERY_PATTERN
+)
+from src.auth.dependencies import RoleChecker, access_token_bearer
 from src.errors import BookNotFound
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.db.bulk import IMPORT_FORMATS, ImportReport, iter_records
+from src.db.projection import parse_fields, partial_page_schema
+from fastapi.responses import JSONResponse
 
 
 book_router = APIRouter()
 book_service = BookService()
-access_token_bearer = AccessTokenBearer()  # Initialize the access token bearer
 role_checker = Depends(RoleChecker(allowed_roles=["admin","user"]))
+admin_role_checker = Depends(RoleChecker(allowed_roles=["admin"]))
 
-@book_router.get("/", response_model=List[Book], status_code=status.HTTP_200_OK, dependencies=[role_checker])
+# detail changes whenever a review or tag does, so clients always revalidate
+BOOK_DETAIL_CACHE_CONTROL = "private, no-cache"
+
+FIELDS_QUERY = Query(None, description="Comma separated fields to return, e.g. id,title,author")
+
+def sparse_page(page: dict, fields: tuple) -> JSONResponse:
+  schema = partial_page_schema(Book, fields)
+  return JSONResponse(content=schema.model_validate(page).model_dump(mode="json"))
+
+def get_book_filters(
+    author: Optional[List[str]] = Query(None, description="Match any of the given authors"),
+    publisher: Optional[List[str]] = Query(None, description="Match any of the given publishers"),
+    language: Optional[List[str]] = Query(None, description="Match any of the given languages"),
+    published_from: Optional[date] = Query(None),
+    published_to: Optional[date] = Query(None),
+    published_year: Optional[int] = Query(None, ge=1, le=9999, description="Published in this calendar year"),
+    min_pages: Optional[int] = Query(None, ge=0),
+    max_pages: Optional[int] = Query(None, ge=0),
+    tags: Optional[str] = Query(
+      None, max_length=500, pattern=TAG_QUERY_PATTERN,
+      description="Tag expression: python,data is AND, data|ml is OR, -beginner is NOT")) -> BookFilter:
+  try:
+    return BookFilter(
+      author=author,
+      publisher=publisher,
+      language=language,
+      published_from=published_from,
+      published_to=published_to,
+      published_year=published_year,
+      min_pages=min_pages,
+      max_pages=max_pages,
+      tags=tags,
+    )
+  except ValidationError as e:
+    # raised inside a dependency, so it has to be turned into the usual 422 by hand
+    raise RequestValidationError(e.errors(include_url=False, include_context=False))
+
+@book_router.get("/", response_model=BookPage, status_code=status.HTTP_200_OK, dependencies=[role_checker])
 async def get_all_books(
+    filters: BookFilter = Depends(get_book_filters),
+    sort: str = Query(DEFAULT_BOOK_SORT, pattern=BOOK_SORT_PATTERN, description="Sort key, prefix with - for descending"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = FIELDS_QUERY,
     session: AsyncSession = Depends(get_session), 
-    token_details: dict = Depends(access_token_bearer)) -> List[Book]:
+    token_details: dict = Depends(access_token_bearer)) -> BookPage:
     
-    print("User details from token:", token_details)  # Debugging line to check token data
-    books = await book_service.get_all_books(session)
+    selected = parse_fields(fields, Book)
+    books = await book_service.get_all_books(
+      session, filters=filters, sort=sort, limit=limit, cursor=cursor, fields=selected
+    )
+    if selected:
+      return sparse_page(books, selected)
     return books
 
-@book_router.get("/user/{user_id}", response_model=List[Book], status_code=status.HTTP_200_OK, dependencies=[role_checker])
+@book_router.get("/user/{user_id}", response_model=BookPage, status_code=status.HTTP_200_OK, dependencies=[role_checker])
 async def get_user_books(
     user_id: str,
+    filters: BookFilter = Depends(get_book_filters),
+    sort: str = Query(DEFAULT_BOOK_SORT, pattern=BOOK_SORT_PATTERN, description="Sort key, prefix with - for descending"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = FIELDS_QUERY,
     session: AsyncSession = Depends(get_session), 
-    token_details: dict = Depends(access_token_bearer)) -> List[Book]:
+    token_details: dict = Depends(access_token_bearer)) -> BookPage:
     
-    
-    books = await book_service.get_user_books(user_id, session)
+    selected = parse_fields(fields, Book)
+    books = await book_service.get_user_books(
+      user_id, session, filters=filters, sort=sort, limit=limit, cursor=cursor, fields=selected
+    )
+    if selected:
+      return sparse_page(books, selected)
+    return books
+
+@book_router.get("/search", response_model=BookPage, status_code=status.HTTP_200_OK, dependencies=[role_checker])
+async def search_books(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for in title, author and publisher"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)) -> BookPage:
+
+    books = await book_service.search_books(q, session, limit=limit, cursor=cursor)
+    return books
+
+@book_router.get("/suggest", response_model=List[BookSuggestion], status_code=status.HTTP_200_OK, dependencies=[role_checker])
+async def suggest_books(
+    # a shorter or blank prefix has no trigrams to look up, so it would scan and rank the whole table
+    q: str = Query(
+      ..., min_length=SUGGEST_MIN_LENGTH, max_length=100, pattern=SUGGEST_PATTERN,
+      description=f"What the user has typed so far, at least {SUGGEST_MIN_LENGTH} characters"),
+    limit: int = Query(10, ge=1, le=25),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)) -> List[BookSuggestion]:
+
+    suggestions = await book_service.suggest(q, session, limit=limit)
+    return suggestions
+
+@book_router.get("/trending", response_model=List[TrendingBook], status_code=status.HTTP_200_OK, dependencies=[role_checker])
+async def get_trending_books(
+    window: str = Query("week", pattern=f"^({'|'.join(trending.TRENDING_WINDOWS)})$", description="day or week"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)) -> List[TrendingBook]:
+
+    books = await book_service.get_trending(window, session, limit=limit)
     return books
 
 @book_router.post("/", response_model=Book, status_code=status.HTTP_201_CREATED, dependencies=[role_checker])
@@ -42,16 +145,89 @@ async def create_book(
   new_book = await book_service.create_book(book,user_id, session)
   return new_book
 
+@book_router.post("/batch-get", response_model=BookBatchGetResponse, status_code=status.HTTP_200_OK, dependencies=[role_checker])
+async def batch_get_books(
+  batch: BookBatchGetRequest,
+  session: AsyncSession = Depends(get_session),
+  token_details: dict = Depends(access_token_bearer)) -> BookBatchGetResponse:
+  # one query for the books, one for their tags and one LATERAL query for each book's first review page
+  items = await book_service.get_books_by_ids(batch.ids, session)
+  return {"items": items}
+
+@book_router.patch("/bulk", response_model=BookBulkResult, status_code=status.HTTP_200_OK, dependencies=[admin_role_checker])
+async def bulk_update_books(
+  bulk_update: BookBulkUpdate,
+  session: AsyncSession = Depends(get_session),
+  token_details: dict = Depends(access_token_bearer)) -> BookBulkResult:
+  book_ids = await book_service.bulk_update_books(bulk_update, bulk_update.patch, session)
+  return {"count": len(book_ids), "ids": book_ids}
+
+@book_router.post("/bulk-delete", response_model=BookBulkResult, status_code=status.HTTP_200_OK, dependencies=[admin_role_checker])
+async def bulk_delete_books(
+  selection: BookBulkSelection,
+  session: AsyncSession = Depends(get_session),
+  token_details: dict = Depends(access_token_bearer)) -> BookBulkResult:
+  book_ids = await book_service.bulk_delete_books(selection, session)
+  return {"count": len(book_ids), "ids": book_ids}
+
+@book_router.post("/import", response_model=ImportReport, status_code=status.HTTP_200_OK, dependencies=[admin_role_checker])
+async def import_books(
+  request: Request,
+  format: str = Query("ndjson", pattern=f"^({'|'.join(IMPORT_FORMATS)})$", description="Body format: ndjson or csv"),
+  user_id: Optional[uuid.UUID] = Query(None, description="Owner of the imported books, defaults to the caller"),
+  session: AsyncSession = Depends(get_session),
+  token_details: dict = Depends(access_token_bearer)) -> ImportReport:
+  # the body is decoded as it arrives, so catalogs of any size use constant memory
+  owner_id = user_id or token_details.get('user')['id']
+  records = iter_records(request.stream(), format)
+  report = await book_service.import_books(records, owner_id, session)
+  return report
+
+@book_router.get("/cache/stats", status_code=status.HTTP_200_OK, dependencies=[admin_role_checker])
+async def get_book_cache_stats() -> dict:
+  return await get_book_detail_stats()
+
 @book_router.get("/{book_uid}", response_model=BookDetail, status_code=status.HTTP_200_OK, dependencies=[role_checker])
 async def get_book(
+  request: Request,
   book_uid: str = Path(..., description="The ID of the book to retrieve"), 
   session: AsyncSession = Depends(get_session),
-  token_details: dict = Depends(access_token_bearer)) -> Book:
+  token_details: dict = Depends(access_token_bearer)) -> Response:
 
-  book = await book_service.get_book(book_uid, session)
-  if not book:
+  try:
+    book_id = uuid.UUID(book_uid)
+  except ValueError:
     raise BookNotFound()
-  return book
+
+  etag = make_etag(*await book_service.get_book_etag_parts(book_id, session))
+  trending.record(book_id, trending.VIEW_WEIGHT)  # fire and forget, also for 304s
+  if etag_matches(request, etag):
+    return not_modified(etag, BOOK_DETAIL_CACHE_CONTROL)
+
+  # the payload is already a serialized BookDetail, so skip re-validation
+  payload = await book_service.get_book_detail(book_id, etag, session)
+  response = Response(content=payload, media_type="application/json")
+  set_cache_headers(response, etag, BOOK_DETAIL_CACHE_CONTROL)
+  return response
+
+@book_router.get("/{book_uid}/recommendations", response_model=List[BookRecommendation], status_code=status.HTTP_200_OK, dependencies=[role_checker])
+async def get_book_recommendations(
+  book_uid: uuid.UUID,
+  limit: int = Query(10, ge=1, le=RECOMMENDATION_NEIGHBORS),
+  session: AsyncSession = Depends(get_session),
+  token_details: dict = Depends(access_token_bearer)) -> List[BookRecommendation]:
+  # neighbour lists are rebuilt nightly by the build_book_recommendations task
+  return await book_service.get_recommendations(book_uid, session, limit=limit)
+
+@book_router.get("/{book_uid}/similar", response_model=SimilarBookPage, status_code=status.HTTP_200_OK, dependencies=[role_checker])
+async def get_similar_books(
+  book_uid: uuid.UUID,
+  limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+  cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+  session: AsyncSession = Depends(get_session),
+  token_details: dict = Depends(access_token_bearer)) -> SimilarBookPage:
+  # neighbours are kept up to date by TagService.add_tags_to_book
+  return await book_service.get_similar_books(book_uid, session, limit=limit, cursor=cursor)
 
 @book_router.patch("/{book_uid}", response_model=Book, status_code=status.HTTP_200_OK, dependencies=[role_checker])
 async def update_book(
@@ -1,9 +1,27 @@
-from typing import Optional,List
-from pydantic import BaseModel
+from typing import Optional,List,Tuple
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime, date
 from src.reviews.schemas import ReviewRead
 from src.tags.schemas import TagModel
+from src.db.bulk import INT4_MAX, reject_nul
 import uuid
+
+BOOK_SORT_KEYS = ("created_at", "published_date", "page_count", "title", "avg_rating", "review_count")
+BOOK_SORT_PATTERN = rf"^-?({'|'.join(BOOK_SORT_KEYS)})$"
+DEFAULT_BOOK_SORT = "-created_at"
+MAX_BATCH_GET = 500
+MAX_BULK_IDS = 10000
+# comma separated terms are ANDed, | separates alternatives within a term, a leading - negates it:
+# "python,data|ml,-beginner" is python AND (data OR ml) AND NOT beginner
+# spaces around names and terms are ignored; a name needs one visible character and cannot start with -
+_TAG_NAME = r"\s*[^,|\s\-]([^,|]*[^,|\s])?\s*"
+_TAG_TERM = rf"\s*-?{_TAG_NAME}(\|{_TAG_NAME})*"
+TAG_QUERY_PATTERN = rf"^{_TAG_TERM}(,{_TAG_TERM})*$"
+# pg_trgm cannot use its GIN indexes for a LIKE prefix shorter than three characters
+SUGGEST_MIN_LENGTH = 3
+SUGGEST_PATTERN = rf"\S.{{{SUGGEST_MIN_LENGTH - 2},}}\S"  # that many characters once stripped
+RECOMMENDATION_NEIGHBORS = 50  # neighbours stored per book by the recommendations job
+
 class Book(BaseModel):
   id: uuid.UUID
   title: str
@@ -12,26 +30,138 @@ class Book(BaseModel):
   published_date: date
   page_count: int
   language: str
+  review_count: int = 0
+  avg_rating: Optional[float] = None
   created_at: datetime
   updated_at: datetime
 
 class BookDetail(Book):
-  reviews: List[ReviewRead]
+  rating_histogram: List[int] = Field(default_factory=list, description="Number of 1..5 star reviews")
+  reviews: List[ReviewRead] = Field(..., description="Newest reviews first; review_count is the total")
+  reviews_next_cursor: Optional[str] = Field(None, description="Pass to /reviews/book/{book_id} for the next page")
   tags: List[TagModel]
 
+class BookPage(BaseModel):
+  items: List[Book]
+  next_cursor: Optional[str] = None
+
+
+class BookBatchGetRequest(BaseModel):
+  ids: List[uuid.UUID] = Field(..., min_length=1, max_length=MAX_BATCH_GET)
+
+class BookBatchItem(BaseModel):
+  id: uuid.UUID
+  found: bool
+  book: Optional[BookDetail] = None
+
+class BookBatchGetResponse(BaseModel):
+  items: List[BookBatchItem]
+
+class BookRecommendation(BaseModel):
+  book: Book
+  score: float = Field(..., description="Adjusted cosine similarity of the two books' ratings")
+
+class SimilarBook(BaseModel):
+  book: Book
+  score: float = Field(..., description="Jaccard overlap of the two books' tags")
+
+class SimilarBookPage(BaseModel):
+  items: List[SimilarBook]
+  next_cursor: Optional[str] = None
+
+class TrendingBook(BaseModel):
+  book: Book
+  score: float = Field(..., description="Weighted views and reviews within the window")
+
+class BookSuggestion(BaseModel):
+  kind: str = Field(..., description="Where the match came from: title, author or tag")
+  value: str
+  score: float
 
 class BookCreate(BaseModel):
   title: str
   author: str
   publisher: str
   published_date: date
-  page_count: int
+  page_count: int = Field(..., ge=0, le=INT4_MAX)  # books.page_count is an INTEGER
   language: str
 
+  @field_validator("title", "author", "publisher", "language")
+  @classmethod
+  def no_nul(cls, value):
+    return reject_nul(value)
+
 class BookUpdate(BaseModel):
   title: Optional[str] = None
   author: Optional[str] = None
   publisher: Optional[str] = None
   published_date: Optional[date] = None
-  page_count: Optional[int] = None
-  language: Optional[str] = None
\ No newline at end of file
+  page_count: Optional[int] = Field(None, ge=0, le=INT4_MAX)
+  language: Optional[str] = None
+
+  @field_validator("title", "author", "publisher", "language")
+  @classmethod
+  def no_nul(cls, value):
+    return None if value is None else reject_nul(value)
+
+class BookFilter(BaseModel):
+  author: Optional[List[str]] = Field(None, min_length=1, description="Match any of the given authors")
+  publisher: Optional[List[str]] = Field(None, min_length=1, description="Match any of the given publishers")
+  language: Optional[List[str]] = Field(None, min_length=1, description="Match any of the given languages")
+  published_from: Optional[date] = None
+  published_to: Optional[date] = None
+  published_year: Optional[int] = Field(None, ge=1, le=9999, description="Published in this calendar year")
+  min_pages: Optional[int] = Field(None, ge=0)
+  max_pages: Optional[int] = Field(None, ge=0)
+  tags: Optional[str] = Field(
+    None, max_length=500, pattern=TAG_QUERY_PATTERN,
+    description="Tag expression: a,b is AND, a|b is OR, -a is NOT",
+  )
+
+  @model_validator(mode="after")
+  def check_ranges(self):
+    # an inverted range can only ever match nothing, so it is a client error
+    for low, high in (("published_from", "published_to"), ("min_pages", "max_pages")):
+      if getattr(self, low) is not None and getattr(self, high) is not None and getattr(self, low) > getattr(self, high):
+        raise ValueError(f"{low} must not be after {high}")
+    return self
+
+
+def tag_query_terms(tags: str) -> List[Tuple[bool, Tuple[str, ...]]]:
+  """Split a tag expression into (negated, alternative names) terms that are ANDed together."""
+
+  terms = []
+  for term in tags.split(","):
+    term = term.strip()
+    negated = term.startswith("-")
+    names = tuple(dict.fromkeys(name.strip() for name in term.removeprefix("-").split("|")))
+    terms.append((negated, names))
+  return terms
+
+
+class BookBulkSelection(BaseModel):
+  """Either an explicit id list or a non-empty filter, never both."""
+  ids: Optional[List[uuid.UUID]] = Field(None, min_length=1, max_length=MAX_BULK_IDS)
+  filter: Optional[BookFilter] = None
+
+  @model_validator(mode="after")
+  def check_selection(self):
+    if (self.ids is None) == (self.filter is None):
+      raise ValueError("provide exactly one of ids or filter")
+    # BookFilter rejects empty lists, so every condition set here becomes a WHERE clause
+    if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+      raise ValueError("filter must set at least one condition")
+    return self
+
+class BookBulkUpdate(BookBulkSelection):
+  patch: BookUpdate
+
+  @model_validator(mode="after")
+  def check_patch(self):
+    if not self.patch.model_fields_set:
+      raise ValueError("patch must set at least one field")
+    return self
+
+class BookBulkResult(BaseModel):
+  count: int
+  ids: List[uuid.UUID]
@@ -1,22 +1,244 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException,status
-from .schemas import BookCreate, BookUpdate
-from src.db.models import Book
+from .schemas import BookCreate, BookUpdate, BookFilter, BookDetail, BookBulkSelection, DEFAULT_BOOK_SORT, SUGGEST_MIN_LENGTH, tag_query_terms
+from .schemas import Book as BookSchema
+from . import cache as book_cache
+from . import trending
+from src.db.models import Book, Tag, Review, BookTag, BookRecommendation, BookSimilarity, User
+from src.db.redis import cache_get, cache_set
+from src.db.bulk import DEFAULT_CHUNK_SIZE, ImportRowError, copy_records, load_or_bisect, run_import, uuid_array
 from sqlmodel import select
-from sqlalchemy.orm import selectinload
-from src.errors import BookNotFound
+from sqlalchemy import tuple_, func, literal, literal_column, union_all, and_, any_, all_, or_, cast, update, delete, Integer, REAL
+from sqlalchemy.dialects import postgresql as pg
+from sqlalchemy.orm import selectinload, noload, aliased
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from src.errors import BookNotFound, InvalidCursor, UserNotFound
+from src.db.pagination import DEFAULT_PAGE_SIZE, build_page, decode_cursor
+from src.reviews.queries import first_review_pages, review_page
+from datetime import datetime, date
+from typing import AsyncIterator, List, Optional, Tuple, Any
+import json
+import uuid
+
+# sort key -> (column, parser for the value stored in the cursor)
+# every column here has a (column, id) btree index so sorted pages are index scans
+SORT_COLUMNS = {
+  "created_at": (Book.created_at, datetime.fromisoformat),
+  "published_date": (Book.published_date, date.fromisoformat),
+  "page_count": (Book.page_count, int),
+  "title": (Book.title, str),
+  "avg_rating": (Book.avg_rating, float),
+  "review_count": (Book.review_count, int),
+}
+# sort keys whose column can be NULL (avg_rating before the first review); NULLs sort
+# last in both directions and a cursor may hold null for them
+NULLABLE_SORT_KEYS = {"avg_rating"}
+
+BOOK_IMPORT_COLUMNS = (
+  "id", "title", "author", "publisher", "published_date", "page_count", "language",
+  "user_id", "created_at", "updated_at",
+)
+
+BOOK_DETAIL_REVIEWS = 10  # reviews embedded in a BookDetail; the rest are paged via /reviews/book/{id}
+
+SIMILAR_BOOKS_KEPT = 100  # tag-overlap neighbours stored per book in book_similarities
+SIMILARITY_LOCK = 190419  # advisory lock key serialising refresh_similarities batches
+
+SUGGEST_CACHE_TTL = 60  # seconds, popular prefixes stay warm during typing bursts
+
+def _escape_like(value: str) -> str:
+  return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 class BookService:
-  async def get_all_books(self, session: AsyncSession):
-    statement = select(Book).order_by(Book.created_at.desc())
+  def _filter_clauses(self, filters: Optional[BookFilter]) -> list:
+    if filters is None:
+      return []
+
+    clauses = []
+    for column, values in (
+      (Book.author, filters.author),
+      (Book.publisher, filters.publisher),
+      (Book.language, filters.language),
+    ):
+      if values:
+        clauses.append(column == values[0] if len(values) == 1 else column.in_(values))
+
+    if filters.published_from is not None:
+      clauses.append(Book.published_date >= filters.published_from)
+    if filters.published_to is not None:
+      clauses.append(Book.published_date <= filters.published_to)
+    if filters.published_year is not None:
+      # a range rather than extract(year ...) so ix_books_published_date_id still applies
+      clauses.append(Book.published_date.between(
+        date(filters.published_year, 1, 1), date(filters.published_year, 12, 31)
+      ))
+    if filters.min_pages is not None:
+      clauses.append(Book.page_count >= filters.min_pages)
+    if filters.max_pages is not None:
+      clauses.append(Book.page_count <= filters.max_pages)
+    if filters.tags:
+      clauses.extend(self._tag_clauses(filters.tags))
+
+    return clauses
+
+  def _tag_clauses(self, tags: str) -> list:
+    """One EXISTS per term over book_tag; the planner can probe (book_id, tag_id) per
+    candidate book or walk the (tag_id, book_id) postings, whichever is more selective."""
+
+    clauses = []
+    for negated, names in tag_query_terms(tags):
+      tag_ids = select(Tag.id).where(Tag.name == any_(literal(list(names), pg.ARRAY(pg.VARCHAR))))
+      tagged = (
+        select(BookTag.book_id)
+        .where(BookTag.book_id == Book.id, BookTag.tag_id.in_(tag_ids))
+        .exists()
+      )
+      clauses.append(~tagged if negated else tagged)
+    return clauses
+
+  def _id_in(self, book_ids: List[uuid.UUID]):
+    return Book.id == any_(uuid_array(book_ids))
+
+  def _selection_clauses(self, selection: BookBulkSelection) -> list:
+    if selection.ids is not None:
+      return [self._id_in(list(dict.fromkeys(selection.ids)))]
+    clauses = self._filter_clauses(selection.filter)
+    if not clauses:
+      # without a WHERE clause a bulk write would touch every book
+      raise ValueError("bulk selection matched no filter conditions")
+    return clauses
+
+  def _after(self, column, value, book_id: uuid.UUID, descending: bool, nullable: bool):
+    """Rows that come after (value, book_id) in the list order."""
+
+    if value is None:
+      # the cursor is already in the NULL tail, which is ordered by id alone
+      return and_(column.is_(None), Book.id < book_id if descending else Book.id > book_id)
+
+    position, after = tuple_(column, Book.id), tuple_(value, book_id)
+    clause = position < after if descending else position > after
+    # a row comparison is never true against NULL, so the tail is added explicitly
+    return or_(clause, column.is_(None)) if nullable else clause
+
+  async def _paginate(
+      self, clauses: list, filters: Optional[BookFilter], sort: str, limit: int, cursor: Optional[str],
+      session: AsyncSession, fields: Optional[Tuple[str, ...]] = None):
+    descending = sort.startswith("-")
+    sort_key = sort.lstrip("-")
+    column, parse = SORT_COLUMNS[sort_key]
+    nullable = sort_key in NULLABLE_SORT_KEYS
+
+    if fields:
+      # project only the requested columns (plus the keyset columns); no ORM entities
+      selected = dict.fromkeys((*fields, sort_key, "id"))
+      statement = select(*(getattr(Book, name) for name in selected))
+    else:
+      statement = select(Book).options(noload(Book.reviews))  # list views never render reviews
+
+    statement = statement.where(*clauses, *self._filter_clauses(filters))
+
+    # ties are broken by id so every row has a unique position in the ordering
+    if cursor:
+      parse_value = (lambda value: None if value is None else parse(value)) if nullable else parse
+      cursor_sort, value, book_id = decode_cursor(cursor, str, parse_value, uuid.UUID)
+      if cursor_sort != sort:
+        raise InvalidCursor()
+      statement = statement.where(self._after(column, value, book_id, descending, nullable))
+
+    direction = column.desc() if descending else column.asc()
+    if nullable:
+      direction = direction.nulls_last()
+    order = (direction, Book.id.desc() if descending else Book.id.asc())
+    statement = statement.order_by(*order).limit(limit + 1)
+
+    if fields:
+      result = await session.execute(statement)
+      rows, next_cursor = build_page(
+        result.mappings().all(), limit, lambda row: (sort, row[sort_key], row["id"])
+      )
+      return {"items": [{name: row[name] for name in fields} for row in rows], "next_cursor": next_cursor}
+
     result = await session.exec(statement)
-    return result.all()  # always returns a list, even if it's empty
+    books, next_cursor = build_page(
+      result.all(), limit, lambda book: (sort, getattr(book, sort_key), book.id)
+    )
+
+    return {"items": books, "next_cursor": next_cursor}
+
+  async def get_all_books(
+      self, session: AsyncSession, filters: Optional[BookFilter] = None, sort: str = DEFAULT_BOOK_SORT,
+      limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None):
+    return await self._paginate([], filters, sort, limit, cursor, session, fields=fields)
   
-  async def get_user_books(self, user_id: str, session: AsyncSession):
-    statement = select(Book).where(Book.user_id == user_id).order_by(Book.created_at.desc())
-    result = await session.exec(statement)
-    return result.all()  # always returns a list, even if it's empty
+  async def get_user_books(
+      self, user_id: str, session: AsyncSession, filters: Optional[BookFilter] = None, sort: str = DEFAULT_BOOK_SORT,
+      limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None):
+    clauses = [Book.user_id == user_id]
+    return await self._paginate(clauses, filters, sort, limit, cursor, session, fields=fields)
   
+  async def search_books(
+      self, query: str, session: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+    ts_query = func.websearch_to_tsquery("english", query)
+    rank = func.ts_rank(Book.search_vector, ts_query)
+
+    # the GIN index narrows the scan to matching rows; only those get ranked
+    statement = select(Book, rank).where(Book.search_vector.op("@@")(ts_query))
+    if cursor:
+      last_rank, book_id = decode_cursor(cursor, float, uuid.UUID)
+      statement = statement.where(tuple_(rank, Book.id) < tuple_(last_rank, book_id))
+
+    statement = (
+      statement
+      .options(noload(Book.reviews))
+      .order_by(rank.desc(), Book.id.desc())
+      .limit(limit + 1)
+    )
+    result = await session.exec(statement)
+    rows, next_cursor = build_page(result.all(), limit, lambda row: (row[1], row[0].id))
+
+    return {"items": [book for book, _ in rows], "next_cursor": next_cursor}
+
+  def _suggestions_from(self, kind: str, column, query: str, limit: int):
+    prefix_match = column.ilike(f"{_escape_like(query)}%", escape="\\")
+    return (
+      select(
+        literal_column(f"'{kind}'").label("kind"),
+        column.label("value"),
+        prefix_match.label("prefix_match"),
+        func.similarity(column, query).label("score"),
+      )
+      .where(column.op("%")(query) | prefix_match)
+      .group_by(column)
+      .order_by(prefix_match.desc(), func.similarity(column, query).desc())
+      .limit(limit)
+    )
+
+  async def suggest(self, query: str, session: AsyncSession, limit: int = 10):
+    query = query.strip().lower()
+    if len(query) < SUGGEST_MIN_LENGTH:
+      return []
+    cache_key = f"suggest:{limit}:{query}"
+
+    cached = await cache_get(cache_key)
+    if cached is not None:
+      return json.loads(cached)
+
+    statement = union_all(
+      self._suggestions_from("title", Book.title, query, limit),
+      self._suggestions_from("author", Book.author, query, limit),
+      self._suggestions_from("tag", Tag.name, query, limit),
+    )
+    result = await session.execute(statement)
+    rows = sorted(result.all(), key=lambda row: (row.prefix_match, row.score), reverse=True)[:limit]
+
+    suggestions = [
+      {"kind": row.kind, "value": row.value, "score": round(float(row.score), 4)}
+      for row in rows
+    ]
+    await cache_set(cache_key, json.dumps(suggestions), ex=SUGGEST_CACHE_TTL)
+
+    return suggestions
+
   async def create_book(self, book_data: BookCreate,user_id: str, session: AsyncSession):
     new_book = Book(**book_data.model_dump(), user_id=user_id)
 
@@ -26,13 +248,169 @@ class BookService:
 
     return new_book
   
+  async def import_books(
+      self, records: AsyncIterator[Tuple[int, Any]], user_id: str, session: AsyncSession,
+      chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Bulk load decoded rows in the BookCreate shape with one COPY per chunk.
+
+    A chunk the database rejects is split until the failing rows are found;
+    only those are reported and the rest load. Chunks already loaded stay
+    committed.
+    """
+
+    owner_id = uuid.UUID(str(user_id)) if user_id else None
+    if owner_id:
+      result = await session.execute(select(User.id).where(User.id == owner_id))
+      if result.first() is None:
+        raise UserNotFound()
+
+    async def copy_chunk(chunk: List[Tuple[int, BookCreate]]) -> None:
+      now = datetime.now()
+      copy_rows = [
+        (uuid.uuid4(), book.title, book.author, book.publisher, book.published_date,
+         book.page_count, book.language, owner_id, now, now)
+        for _, book in chunk
+      ]
+      await copy_records(session, Book.__tablename__, BOOK_IMPORT_COLUMNS, copy_rows)
+      await session.commit()
+
+    async def load_chunk(chunk: List[Tuple[int, BookCreate]]) -> List[ImportRowError]:
+      return await load_or_bisect(chunk, copy_chunk, session)
+
+    return await run_import(records, BookCreate.model_validate, load_chunk, chunk_size=chunk_size)
+
+  async def bulk_update_books(self, selection: BookBulkSelection, book_data: BookUpdate, session: AsyncSession):
+    """Apply one patch to every selected book with a single UPDATE ... RETURNING."""
+
+    values = book_data.model_dump(exclude_unset=True)
+    if not values:
+      raise ValueError("bulk update needs at least one field to set")
+
+    result = await session.execute(
+      update(Book)
+      .where(*self._selection_clauses(selection))
+      .values(**values)
+      .returning(Book.id)
+      .execution_options(synchronize_session=False)
+    )
+    book_ids = result.scalars().all()
+    await session.commit()
+    await book_cache.invalidate_book_details(book_ids)
+
+    return book_ids
+
+  async def _delete_books(self, clauses, session: AsyncSession) -> list:
+    """Delete the matching books, taking their links out of the tags' book counts.
+
+    The books are locked first so no link can be added between the count and
+    the delete. The links are deleted (and counted) ahead of the books so a
+    concurrent detach of the same link is counted once; reviews go by FK cascade.
+    """
+
+    if not clauses:
+      raise ValueError("refusing to delete books without a WHERE clause")
+
+    result = await session.execute(select(Book.id).where(*clauses).with_for_update())
+    book_ids = result.scalars().all()
+    if not book_ids:
+      return []
+
+    unlinked = (
+      delete(BookTag)
+      .where(BookTag.book_id == any_(uuid_array(book_ids)))
+      .returning(BookTag.tag_id)
+      .cte("unlinked")
+    )
+    tag_counts = (
+      select(unlinked.c.tag_id, func.count().label("n"))
+      .group_by(unlinked.c.tag_id)
+      .subquery("tag_counts")
+    )
+    uncounted = (
+      update(Tag)
+      .where(Tag.id == tag_counts.c.tag_id)
+      .values(book_count=Tag.book_count - tag_counts.c.n)
+      .returning(Tag.id)
+      .cte("uncounted")
+    )
+    await session.execute(
+      delete(Book)
+      .where(Book.id == any_(uuid_array(book_ids)))
+      .add_cte(uncounted)
+      .execution_options(synchronize_session=False)
+    )
+    return book_ids
+
+  async def bulk_delete_books(self, selection: BookBulkSelection, session: AsyncSession):
+    """Delete every selected book in two statements, however many there are"""
+
+    book_ids = await self._delete_books(self._selection_clauses(selection), session)
+    await session.commit()
+    await book_cache.invalidate_book_details(book_ids)
+
+    return book_ids
+
+  async def record_rating(self, book_id: uuid.UUID, rating: int, delta: int, session: AsyncSession) -> bool:
+    """Add (delta=1) or remove (delta=-1) one rating from the book's aggregates.
+
+    Runs as a single in-place UPDATE so concurrent reviews cannot lose counts;
+    the caller commits it together with the review row. Returns False when the
+    book does not exist.
+    """
+
+    result = await session.execute(
+      update(Book)
+      .where(Book.id == book_id)
+      .values({
+        Book.review_count: Book.review_count + delta,
+        Book.rating_sum: Book.rating_sum + delta * rating,
+        Book.rating_histogram[rating]: Book.rating_histogram[rating] + delta,
+      })
+      .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+  async def record_ratings(self, ratings: List[Tuple[uuid.UUID, int]], session: AsyncSession) -> None:
+    """Apply many (book_id, rating) additions with one UPDATE, touching each book once.
+
+    Per-book deltas are sent as six parallel arrays and unnested server side,
+    so the parameter count stays fixed however many books it covers.
+    """
+
+    totals: dict = {}
+    for book_id, rating in ratings:
+      counts = totals.setdefault(book_id, [0] * 5)
+      counts[rating - 1] += 1
+    if not totals:
+      return
+
+    book_ids = list(totals)
+    histograms = list(zip(*totals.values()))
+    deltas = func.unnest(
+      uuid_array(book_ids),
+      *(literal(list(counts), pg.ARRAY(Integer)) for counts in histograms),
+    ).table_valued("book_id", *(f"r{star}" for star in range(1, 6))).render_derived("deltas")
+    stars = [deltas.c[f"r{star}"] for star in range(1, 6)]
+
+    await session.execute(
+      update(Book)
+      .where(Book.id == deltas.c.book_id)
+      .values({
+        Book.review_count: Book.review_count + sum(stars[1:], stars[0]),
+        Book.rating_sum: Book.rating_sum + sum((star * count for star, count in enumerate(stars[1:], 2)), stars[0]),
+        Book.rating_histogram: pg.array([Book.rating_histogram[star] + stars[star - 1] for star in range(1, 6)]),
+      })
+      .execution_options(synchronize_session=False)
+    )
+
   async def get_book(self, book_id:str, session: AsyncSession):
+      # reviews are paged separately (see get_book_detail), never loaded wholesale
       result = await session.exec(
         select(Book)
         .where(Book.id == book_id)
         .options(
             selectinload(Book.tags),
-            selectinload(Book.reviews)
+            noload(Book.reviews)
         )
     )
       
@@ -41,32 +419,355 @@ class BookService:
          raise BookNotFound()
       
       return book  # Returns the first matching book or None if not found
+
+  def _book_detail(self, book: Book, reviews: dict) -> BookDetail:
+    fields = {name: getattr(book, name) for name in BookSchema.model_fields}
+    return BookDetail.model_validate({
+      **fields,
+      "rating_histogram": book.rating_histogram,
+      "tags": book.tags,
+      "reviews": reviews["items"],
+      "reviews_next_cursor": reviews["next_cursor"],
+    }, from_attributes=True)
+
+  async def get_books_by_ids(self, book_ids: List[uuid.UUID], session: AsyncSession) -> List[dict]:
+    """Resolve many books at once, keeping request order and marking missing ids."""
+
+    unique_ids = list(dict.fromkeys(book_ids))
+    result = await session.exec(
+      select(Book)
+      .where(self._id_in(unique_ids))
+      .options(
+        selectinload(Book.tags),
+        noload(Book.reviews),
+      )
+    )
+    books = {book.id: book for book in result.all()}
+    reviews = await first_review_pages(session, list(books), BOOK_DETAIL_REVIEWS)
+    details = {book_id: self._book_detail(book, reviews[book_id]) for book_id, book in books.items()}
+
+    return [
+      {"id": book_id, "found": book_id in details, "book": details.get(book_id)}
+      for book_id in book_ids
+    ]
+
+  async def get_recommendations(self, book_id: uuid.UUID, session: AsyncSession, limit: int = 10) -> List[dict]:
+    """Precomputed neighbours of a book: one primary-key read plus one lookup of at most `limit` books."""
+
+    result = await session.execute(
+      select(BookRecommendation.neighbor_ids[1:limit], BookRecommendation.scores[1:limit])
+      .where(BookRecommendation.book_id == book_id)
+    )
+    row = result.first()
+    if row is None:
+      return []
+
+    neighbor_ids, scores = row
+    result = await session.exec(
+      select(Book).where(self._id_in(neighbor_ids)).options(noload(Book.reviews))
+    )
+    books = {book.id: book for book in result.all()}
+
+    # neighbours deleted since the last build are skipped
+    return [
+      {"book": books[neighbor_id], "score": score}
+      for neighbor_id, score in zip(neighbor_ids, scores)
+      if neighbor_id in books
+    ]
+
+  def _best_neighbours(self, sources: List[uuid.UUID]):
+    """CTE of the best SIMILAR_BOOKS_KEPT tag-overlap neighbours of each source, scored from scratch."""
+
+    # each source's tags, then every other book on those tags via ix_book_tag_tag_id_book_id
+    wanted = func.unnest(uuid_array(sources)).table_valued("source").render_derived("sources")
+    mine = (
+      select(wanted.c.source, BookTag.tag_id)
+      .select_from(wanted)
+      .join(BookTag, BookTag.book_id == wanted.c.source)
+      .cte("mine")
+    )
+    shared = (
+      select(mine.c.source, BookTag.book_id.label("other"), func.count().label("shared"))
+      .join(BookTag, BookTag.tag_id == mine.c.tag_id)
+      .where(BookTag.book_id != mine.c.source)
+      .group_by(mine.c.source, BookTag.book_id)
+      .cte("shared")
+    )
+    source_sizes = select(mine.c.source, func.count().label("tags")).group_by(mine.c.source).cte("source_sizes")
+    # one grouped pass over the candidates' tags rather than a count per candidate
+    theirs = aliased(BookTag)
+    other_sizes = (
+      select(theirs.book_id, func.count().label("tags"))
+      .where(theirs.book_id.in_(select(shared.c.other)))
+      .group_by(theirs.book_id)
+      .cte("other_sizes")
+    )
+    union_size = cast(source_sizes.c.tags + other_sizes.c.tags - shared.c.shared, REAL)
+    score = cast(shared.c.shared, REAL).op("/", return_type=REAL())(union_size)
+    ranked = (
+      select(
+        shared.c.source,
+        shared.c.other,
+        score.label("score"),
+        func.row_number().over(partition_by=shared.c.source, order_by=(score.desc(), shared.c.other.desc())).label("position"),
+      )
+      .join(source_sizes, source_sizes.c.source == shared.c.source)
+      .join(other_sizes, other_sizes.c.book_id == shared.c.other)
+      .subquery("ranked")
+    )
+    return (
+      select(ranked.c.source, ranked.c.other, ranked.c.score)
+      .where(ranked.c.position <= SIMILAR_BOOKS_KEPT)
+      .cte("best")
+    )
+
+  async def _rebuild_similarities(self, sources: List[uuid.UUID], session: AsyncSession, push: bool = False) -> set:
+    """Rescore the lists of `sources` (and with push, add them to their neighbours'); returns the lists that grew."""
+
+    await session.execute(
+      delete(BookSimilarity)
+      .where(BookSimilarity.book_id == any_(uuid_array(sources)))
+      .execution_options(synchronize_session=False)
+    )
+
+    best = self._best_neighbours(sources)
+    pairs = select(best.c.source, best.c.other, best.c.score)
+    if push:
+      pairs = union_all(
+        pairs,
+        select(best.c.other, best.c.source, best.c.score).where(best.c.other != all_(uuid_array(sources))),
+      )
+    statement = pg.insert(BookSimilarity).from_select(["book_id", "similar_book_id", "score"], pairs)
+    # a concurrent refresh of a neighbouring book may have written the same pair already
+    result = await session.execute(
+      statement
+      .on_conflict_do_update(
+        index_elements=[BookSimilarity.book_id, BookSimilarity.similar_book_id],
+        set_={"score": statement.excluded.score},
+      )
+      .returning(BookSimilarity.book_id)
+    )
+    return set(result.scalars().all()) - set(sources)
+
+  async def _rescore_holders(self, changed: List[uuid.UUID], session: AsyncSession) -> set:
+    """Rescore in place the pairs other books hold for `changed`; returns the books that lost one."""
+
+    held = (
+      select(BookSimilarity.book_id.label("holder"), BookSimilarity.similar_book_id.label("changed"))
+      .where(
+        BookSimilarity.similar_book_id == any_(uuid_array(changed)),
+        BookSimilarity.book_id != all_(uuid_array(changed)),
+      )
+      .cte("held")
+    )
+    theirs, common = aliased(BookTag), aliased(BookTag)
+    overlap = (
+      select(
+        held.c.holder,
+        held.c.changed,
+        func.count(theirs.tag_id).label("tags"),
+        func.count(common.tag_id).label("shared"),
+      )
+      .select_from(held)
+      .outerjoin(theirs, theirs.book_id == held.c.holder)
+      .outerjoin(common, and_(common.book_id == held.c.changed, common.tag_id == theirs.tag_id))
+      .group_by(held.c.holder, held.c.changed)
+      .cte("overlap")
+    )
+    changed_sizes = (
+      select(BookTag.book_id, func.count().label("tags"))
+      .where(BookTag.book_id == any_(uuid_array(changed)))
+      .group_by(BookTag.book_id)
+      .cte("changed_sizes")
+    )
+    union_size = cast(overlap.c.tags + changed_sizes.c.tags - overlap.c.shared, REAL)
+    pair = and_(BookSimilarity.book_id == overlap.c.holder, BookSimilarity.similar_book_id == overlap.c.changed)
+    rescored = (
+      update(BookSimilarity)
+      .where(pair, overlap.c.shared > 0, changed_sizes.c.book_id == overlap.c.changed)
+      .values(score=cast(overlap.c.shared, REAL).op("/", return_type=REAL())(union_size))
+      .returning(BookSimilarity.book_id)
+      .cte("rescored")
+    )
+    result = await session.execute(
+      delete(BookSimilarity)
+      .where(pair, overlap.c.shared == 0)
+      .add_cte(rescored)
+      .returning(BookSimilarity.book_id)
+      .execution_options(synchronize_session=False)
+    )
+    return set(result.scalars().all())
+
+  async def _trim_similarities(self, book_ids, session: AsyncSession) -> None:
+    """Cut grown neighbour lists back to their best SIMILAR_BOOKS_KEPT."""
+
+    ranked = (
+      select(
+        BookSimilarity.book_id,
+        BookSimilarity.similar_book_id,
+        func.row_number().over(
+          partition_by=BookSimilarity.book_id,
+          order_by=(BookSimilarity.score.desc(), BookSimilarity.similar_book_id.desc()),
+        ).label("position"),
+      )
+      .where(BookSimilarity.book_id == any_(uuid_array(book_ids)))
+      .subquery()
+    )
+    await session.execute(
+      delete(BookSimilarity)
+      .where(tuple_(BookSimilarity.book_id, BookSimilarity.similar_book_id).in_(
+        select(ranked.c.book_id, ranked.c.similar_book_id).where(ranked.c.position > SIMILAR_BOOKS_KEPT)
+      ))
+      .execution_options(synchronize_session=False)
+    )
+
+  async def refresh_similarities(self, book_ids: List[uuid.UUID], session: AsyncSession) -> None:
+    """Update the tag-overlap (Jaccard) neighbours touched by a tag change to `book_ids`."""
+
+    changed = list(dict.fromkeys(book_ids))
+    if not changed:
+      return
+
+    # overlapping batches rewrite each other's lists, so they take turns
+    await session.execute(select(func.pg_advisory_xact_lock(SIMILARITY_LOCK)))
+
+    dropped = await self._rescore_holders(changed, session)
+    grown = await self._rebuild_similarities(changed, session, push=True)
+
+    if dropped:
+      full = await session.execute(
+        select(BookSimilarity.book_id)
+        .where(BookSimilarity.book_id == any_(uuid_array(dropped)))
+        .group_by(BookSimilarity.book_id)
+        .having(func.count() >= SIMILAR_BOOKS_KEPT)
+      )
+      short = list(dropped - set(full.scalars().all()))
+      if short:
+        grown = (grown | await self._rebuild_similarities(short, session)) - set(short)
+
+    if grown:
+      await self._trim_similarities(grown, session)
+
+  async def get_similar_books(
+      self, book_id: uuid.UUID, session: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+    score = BookSimilarity.score
+    statement = (
+      select(Book, score)
+      .join(BookSimilarity, BookSimilarity.similar_book_id == Book.id)
+      .where(BookSimilarity.book_id == book_id)
+    )
+    if cursor:
+      last_score, similar_book_id = decode_cursor(cursor, float, uuid.UUID)
+      statement = statement.where(
+        tuple_(score, BookSimilarity.similar_book_id) < tuple_(last_score, similar_book_id)
+      )
+
+    # a backward scan of ix_book_similarities_book_id_score
+    statement = (
+      statement
+      .options(noload(Book.reviews))
+      .order_by(score.desc(), BookSimilarity.similar_book_id.desc())
+      .limit(limit + 1)
+    )
+    result = await session.exec(statement)
+    rows, next_cursor = build_page(result.all(), limit, lambda row: (row[1], row[0].id))
+
+    return {"items": [{"book": book, "score": score} for book, score in rows], "next_cursor": next_cursor}
+
+  async def get_trending(self, window: str, session: AsyncSession, limit: int = DEFAULT_PAGE_SIZE) -> List[dict]:
+    """Books with the most views and reviews over the window, ranked from Redis."""
+
+    ranked = await trending.top_books(window, limit)
+    if not ranked:
+      return []
+
+    result = await session.exec(
+      select(Book).where(self._id_in([book_id for book_id, _ in ranked])).options(noload(Book.reviews))
+    )
+    books = {book.id: book for book in result.all()}
+
+    return [{"book": books[book_id], "score": score} for book_id, score in ranked if book_id in books]
+
+  async def get_book_etag_parts(self, book_id: uuid.UUID, session: AsyncSession) -> tuple:
+    """Watermarks of everything a BookDetail renders, read in one round trip.
+
+    Adding or removing a review goes through record_rating, which bumps
+    books.updated_at, so the embedded review page is covered by the book row.
+    Tags carry no updated_at, so their ids and names are folded in instead.
+    """
+
+    tag_signature = (
+      select(func.string_agg(func.concat(Tag.id, ":", Tag.name), aggregate_order_by(",", Tag.id)))
+      .join(BookTag, BookTag.tag_id == Tag.id)
+      .where(BookTag.book_id == Book.id)
+      .scalar_subquery()
+    )
+
+    result = await session.execute(
+      select(Book.updated_at, Book.review_count, tag_signature).where(Book.id == book_id)
+    )
+    row = result.first()
+    if row is None:
+      raise BookNotFound()
+
+    return (book_id, *row)
+
+  async def get_book_detail(self, book_id: uuid.UUID, version: str, session: AsyncSession) -> str:
+    """Serialized BookDetail, served from Redis when possible (read-through).
+
+    `version` is the book's current ETag; only an entry cached at that version is served.
+    """
+
+    cached = await book_cache.get_book_detail(book_id, version)
+    if cached is not None:
+      return cached
+
+    book = await self.get_book(book_id, session)
+    reviews = await review_page(session, [Review.book_id == book.id], BOOK_DETAIL_REVIEWS)
+    payload = self._book_detail(book, reviews).model_dump_json()
+    await book_cache.set_book_detail(book_id, version, payload)
+
+    return payload
   
   async def update_book(self, book_id:str, book_data: BookUpdate, session: AsyncSession):
-    book = await self.get_book(book_id, session)
+    # one UPDATE ... RETURNING; no fetch, no relationship loading, no refresh
+    update_dict = book_data.model_dump(exclude_unset=True)
+    columns = [getattr(Book, name) for name in BookSchema.model_fields]
 
-    if not book:
-        return None
+    if not update_dict:
+      # nothing to change: no write, so updated_at, the ETag and cached details stay put
+      result = await session.execute(select(*columns).where(Book.id == book_id))
+      book = result.mappings().first()
+      return dict(book) if book else None
 
-    update_dict = book_data.model_dump(exclude_unset=True)
+    result = await session.execute(
+      update(Book)
+      .where(Book.id == book_id)
+      .values(**update_dict)
+      .returning(*columns)
+      .execution_options(synchronize_session=False)
+    )
+    book = result.mappings().first()
 
-    for field, value in update_dict.items():
-        setattr(book, field, value)
+    if not book:
+        return None
 
     await session.commit()
-    await session.refresh(book)
+    await book_cache.invalidate_book_details([book["id"]])
 
-    return book
+    return dict(book)
 
   async def delete_book(self, book_id:str, session: AsyncSession):
-    book = await self.get_book(book_id, session)
+    # Not a lone DELETE ... RETURNING: the tag book counts have to come down with
+    # the book, and every CTE of one statement shares its snapshot. A link attached
+    # while the DELETE waits on the book's row lock would go by FK cascade without
+    # being counted, so _delete_books locks the row first and unlinks after.
+    deleted = await self._delete_books([Book.id == book_id], session)
 
-    if not book:
+    if not deleted:
         return None
 
-    await session.delete(book)
     await session.commit()
+    await book_cache.invalidate_book_details(deleted)
 
-    return book  # Optionally return the deleted book's data for confirmation
-
-    # fetch row -> modify -> commit -> refresh -> return modified row
\ No newline at end of file
+    return deleted[0]
@@ -0,0 +1,45 @@
+"""Background upkeep of book_similarities after tag changes.
+
+The tag routes queue refresh_book_similarities once a tag change has
+committed, so a request never waits on the rescore or fails because of it.
+The worker works through the changed books in bounded batches, one
+transaction each.
+"""
+import logging
+import uuid
+from typing import List
+
+from src.db.main import worker_session
+from src.books.service import BookService
+
+SIMILARITY_BATCH = 100  # changed books rescored per transaction
+SIMILARITY_TASK_BOOKS = 2000  # changed books per queued task, keeping messages small
+
+book_service = BookService()
+
+
+def queue_refresh(book_ids) -> None:
+  """Queue the rescore of `book_ids`; a broker failure is logged, never raised."""
+
+  # imported here: the tasks module loads the mail settings
+  from src.celery_tasks import refresh_book_similarities
+
+  book_ids = [str(book_id) for book_id in dict.fromkeys(book_ids)]
+  for start in range(0, len(book_ids), SIMILARITY_TASK_BOOKS):
+    try:
+      # retry=False: an unreachable broker fails at once instead of holding up the response
+      refresh_book_similarities.apply_async((book_ids[start:start + SIMILARITY_TASK_BOOKS],), retry=False)
+    except Exception as e:
+      logging.error(f"Queueing the similarity refresh of {len(book_ids)} books failed: {e}")
+      return
+
+
+async def refresh_similarities(book_ids: List[uuid.UUID]) -> int:
+  """Rescore the neighbours of `book_ids`, SIMILARITY_BATCH books per transaction."""
+
+  async with worker_session() as session:
+    for start in range(0, len(book_ids), SIMILARITY_BATCH):
+      await book_service.refresh_similarities(book_ids[start:start + SIMILARITY_BATCH], session)
+      await session.commit()
+
+  return len(book_ids)
@@ -0,0 +1,138 @@
+"""Trending books from hourly and daily Redis sorted-set buckets.
+
+Every book view or new review adds a weighted point to the book in the
+bucket of the current hour and in the bucket of the current day. The day
+window is the union of the last 24 hourly buckets, so it slides an hour at a
+time. The week window merges eight daily buckets instead of 168 hourly
+ones, the oldest weighted by the share of it still inside the window.
+Buckets expire on their own once no window can reach them, and the
+compaction task trims finished buckets down to their leaders so memory and
+merge cost stay bounded however many books get touched.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import List, Set, Tuple
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from src.config import Config
+from src.db.redis import redis_client
+
+BUCKET_SECONDS = 3600
+DAY_SECONDS = 24 * BUCKET_SECONDS
+TRENDING_WINDOWS = {"day": 24, "week": 24 * 7}  # window -> hours covered
+HOURS_KEPT = TRENDING_WINDOWS["day"]  # longer windows are merged from daily buckets
+DAYS_KEPT = TRENDING_WINDOWS["week"] // 24 + 1  # the oldest one is partly outside the window
+BUCKET_TTL = (HOURS_KEPT + 1) * BUCKET_SECONDS
+DAY_BUCKET_TTL = (DAYS_KEPT + 1) * DAY_SECONDS
+BUCKET_SIZE = 500  # members a finished bucket keeps after compaction, well above any page
+MERGED_TTL = 60  # seconds a merged window is reused before it is rebuilt
+
+VIEW_WEIGHT = 1
+REVIEW_WEIGHT = 5
+
+# strong references to in-flight increments; the event loop only keeps weak ones
+_pending: Set[asyncio.Task] = set()
+
+
+def current_bucket() -> int:
+  return int(time.time()) // BUCKET_SECONDS
+
+
+def current_day() -> int:
+  return int(time.time()) // DAY_SECONDS
+
+
+def bucket_key(bucket: int) -> str:
+  return f"trending:{bucket}"
+
+
+def day_key(day: int) -> str:
+  return f"trending:day:{day}"
+
+
+async def _increment(book_id: uuid.UUID, weight: int) -> None:
+  key, daily = bucket_key(current_bucket()), day_key(current_day())
+  try:
+    async with redis_client.pipeline(transaction=False) as pipe:
+      pipe.zincrby(key, weight, str(book_id))
+      pipe.zincrby(daily, weight, str(book_id))
+      # plain EXPIRE (NX needs Redis 7): refreshed on every write, a bucket
+      # still outlives every window since its last write is within its own period
+      pipe.expire(key, BUCKET_TTL)
+      pipe.expire(daily, DAY_BUCKET_TTL)
+      await pipe.execute()
+  except RedisError as e:
+    logging.error(f"Trending increment failed for {book_id}: {e}")
+
+
+def record(book_id: uuid.UUID, weight: int = VIEW_WEIGHT) -> None:
+  """Count an event for a book without making the caller wait for Redis."""
+
+  task = asyncio.get_running_loop().create_task(_increment(book_id, weight))
+  _pending.add(task)
+  task.add_done_callback(_pending.discard)
+
+
+def window_buckets(window: str) -> dict:
+  """Bucket key -> weight of every bucket merged for the window."""
+
+  hours = TRENDING_WINDOWS[window]
+  if hours <= HOURS_KEPT:
+    now = current_bucket()
+    return {bucket_key(bucket): 1 for bucket in range(now - hours + 1, now + 1)}
+
+  today, days = current_day(), hours // 24
+  buckets = {day_key(day): 1 for day in range(today - days + 1, today + 1)}
+  # today is only partly over, so the window reaches back into the day before the oldest full one
+  elapsed = (time.time() % DAY_SECONDS) / DAY_SECONDS
+  buckets[day_key(today - days)] = round(1 - elapsed, 4)
+  return buckets
+
+
+async def top_books(window: str, limit: int) -> List[Tuple[uuid.UUID, float]]:
+  """Best scoring (book id, score) pairs over the window, highest first."""
+
+  merged = f"trending:window:{window}:{current_bucket()}"
+  try:
+    if not await redis_client.exists(merged):
+      async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.zunionstore(merged, window_buckets(window))
+        pipe.expire(merged, MERGED_TTL)
+        await pipe.execute()
+    rows = await redis_client.zrevrange(merged, 0, limit - 1, withscores=True)
+  except RedisError as e:
+    logging.error(f"Trending read failed for {window}: {e}")
+    return []
+
+  return [(uuid.UUID(member.decode()), score) for member, score in rows]
+
+
+async def compact(client=redis_client) -> dict:
+  """Trim every finished bucket to its BUCKET_SIZE leaders and drop buckets past every window."""
+
+  now, today = current_bucket(), current_day()
+  finished = [bucket_key(bucket) for bucket in range(now - HOURS_KEPT + 1, now)]
+  finished += [day_key(day) for day in range(today - DAYS_KEPT + 1, today)]
+  expired = [bucket_key(bucket) for bucket in range(now - 2 * HOURS_KEPT, now - HOURS_KEPT + 1)]
+  expired += [day_key(day) for day in range(today - 2 * DAYS_KEPT, today - DAYS_KEPT + 1)]
+
+  async with client.pipeline(transaction=False) as pipe:
+    for key in finished:
+      pipe.zremrangebyrank(key, 0, -(BUCKET_SIZE + 1))
+    pipe.delete(*expired)
+    results = await pipe.execute()
+
+  return {"trimmed": sum(results[:-1]), "dropped": results[-1]}
+
+
+async def run_compaction() -> dict:
+  # Celery runs this under asyncio.run, so it gets a client bound to that loop
+  client = aioredis.from_url(Config.REDIS_URL)
+  try:
+    return await compact(client)
+  finally:
+    await client.aclose()
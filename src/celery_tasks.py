@@ -1,6 +1,7 @@
 from celery import Celery
 from src.mail import create_message, mail
 import asyncio
+import uuid
 from src.config import Config
 
 celery_app = Celery('bookly')
@@ -46,3 +47,22 @@ def send_password_reset_email(email: str, token: str):
 
     # Celery task is sync → FastAPI-Mail async
     asyncio.run(mail.send_message(message))
+
+@celery_app.task
+def build_book_recommendations():
+    # imported here so the web process, which only queues mail, never loads numpy/scipy
+    from src.books.recommendations import build_recommendations
+
+    return asyncio.run(build_recommendations())
+
+@celery_app.task
+def compact_trending_books():
+    from src.books.trending import run_compaction
+
+    return asyncio.run(run_compaction())
+
+@celery_app.task
+def refresh_book_similarities(book_ids: list):
+    from src.books.similarities import refresh_similarities
+
+    return asyncio.run(refresh_similarities([uuid.UUID(book_id) for book_id in book_ids]))
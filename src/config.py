@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from celery.schedules import crontab
 
 class Settings(BaseSettings):
     # These MUST match the names inside your .env file exactly
@@ -37,4 +38,15 @@ Config = Settings()
 
 broker_url = Config.REDIS_URL
 result_backend = Config.REDIS_URL
-broker_connection_retry_on_startup = True
\ No newline at end of file
+broker_connection_retry_on_startup = True
+
+beat_schedule = {
+    "build-book-recommendations": {
+        "task": "src.celery_tasks.build_book_recommendations",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "compact-trending-books": {
+        "task": "src.celery_tasks.compact_trending_books",
+        "schedule": crontab(minute=5),
+    },
+}
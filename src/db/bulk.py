@@ -0,0 +1,234 @@
+import codecs
+import csv
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import asyncpg
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import literal
+from sqlalchemy.dialects import postgresql as pg
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+IMPORT_FORMATS = ("ndjson", "csv")
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+# what a COPY that did not load raises: rejections by the server, and rows
+# asyncpg cannot encode for a column (its client-side DataError is a ValueError)
+COPY_ERRORS = (asyncpg.PostgresError, ValueError)
+INT4_MAX = 2**31 - 1
+
+
+class ImportRowError(BaseModel):
+  line: int
+  errors: List[str]
+
+
+class ImportChunkReport(BaseModel):
+  chunk: int
+  rows: int
+  inserted: int
+  failed: int
+  seconds: float
+
+
+class ImportReport(BaseModel):
+  inserted: int = 0
+  failed: int = 0
+  elapsed_seconds: float = 0.0
+  rows_per_second: float = 0.0
+  chunks: List[ImportChunkReport] = []
+  errors: List[ImportRowError] = []
+  errors_truncated: bool = False
+
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+  decoder = codecs.getincrementaldecoder("utf-8-sig")()
+  buffer = ""
+  line_no = 0
+
+  async for chunk in stream:
+    buffer += decoder.decode(chunk)
+    *lines, buffer = buffer.split("\n")
+    for line in lines:
+      line_no += 1
+      yield line_no, line.rstrip("\r")
+
+  buffer += decoder.decode(b"", final=True)
+  if buffer:
+    yield line_no + 1, buffer.rstrip("\r")
+
+
+async def iter_records(stream: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+  """Decode an NDJSON or CSV byte stream into (line number, row) pairs without buffering it.
+
+  Rows that cannot be decoded are yielded as an `ImportRowError` so the caller
+  can report them alongside validation errors.
+  """
+
+  if fmt == "ndjson":
+    async for line_no, line in _iter_lines(stream):
+      if not line.strip():
+        continue
+      try:
+        row = json.loads(line)
+      except ValueError as e:
+        yield line_no, ImportRowError(line=line_no, errors=[f"invalid JSON: {e}"])
+        continue
+      if not isinstance(row, dict):
+        yield line_no, ImportRowError(line=line_no, errors=["expected a JSON object"])
+        continue
+      yield line_no, row
+    return
+
+  header: Optional[List[str]] = None
+  pending, pending_line = "", 0
+  async for line_no, line in _iter_lines(stream):
+    # a quoted field may span lines; wait until the quotes are balanced
+    pending = f"{pending}\n{line}" if pending else line
+    pending_line = pending_line or line_no
+    if pending.count('"') % 2:
+      continue
+
+    record, start = pending, pending_line
+    pending, pending_line = "", 0
+    if not record.strip():
+      continue
+
+    values = next(csv.reader([record]))
+    if header is None:
+      header = [name.strip() for name in values]
+      continue
+    if len(values) != len(header):
+      yield start, ImportRowError(line=start, errors=[f"expected {len(header)} columns, got {len(values)}"])
+      continue
+    yield start, dict(zip(header, values))
+
+  if pending:
+    yield pending_line, ImportRowError(line=pending_line, errors=["unterminated quoted field"])
+
+
+def reject_nul(value: str) -> str:
+  """Field validator body: PostgreSQL text cannot hold NUL, so refuse it before the database does."""
+
+  if "\x00" in value:
+    raise ValueError("must not contain NUL characters")
+  return value
+
+
+def uuid_array(ids: Iterable) -> Any:
+  """`ids` as one uuid[] parameter instead of one bind per id, for `= any_(...)` and unnest."""
+
+  return literal(list(ids), pg.ARRAY(pg.UUID(as_uuid=True)))
+
+
+def validation_messages(error: ValidationError) -> List[str]:
+  return [f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()]
+
+
+async def run_import(
+    records: AsyncIterator[Tuple[int, Any]],
+    validate: Callable[[dict], Any],
+    load_chunk: Callable[[List[Tuple[int, Any]]], Awaitable[List[ImportRowError]]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ImportReport:
+  """Validate decoded rows and hand them to `load_chunk` `chunk_size` rows at a time.
+
+  `load_chunk` receives (line number, validated row) pairs and returns errors
+  for any rows it rejected; everything else counts as inserted.
+  """
+
+  report = ImportReport()
+  started = time.perf_counter()
+  chunk: List[Tuple[int, Any]] = []
+  chunk_failed = 0
+
+  def record_errors(errors: Iterable[ImportRowError]) -> None:
+    for error in errors:
+      report.failed += 1
+      if len(report.errors) < MAX_REPORTED_ERRORS:
+        report.errors.append(error)
+      else:
+        report.errors_truncated = True
+
+  async def flush() -> None:
+    nonlocal chunk, chunk_failed
+    chunk_started = time.perf_counter()
+    rejected = await load_chunk(chunk) if chunk else []
+    record_errors(rejected)
+    inserted = len(chunk) - len(rejected)
+    report.inserted += inserted
+    report.chunks.append(ImportChunkReport(
+      chunk=len(report.chunks) + 1,
+      rows=len(chunk) + chunk_failed,
+      inserted=inserted,
+      failed=len(rejected) + chunk_failed,
+      seconds=round(time.perf_counter() - chunk_started, 4),
+    ))
+    chunk, chunk_failed = [], 0
+
+  async for line_no, row in records:
+    if isinstance(row, ImportRowError):
+      record_errors([row])
+      chunk_failed += 1
+    else:
+      try:
+        chunk.append((line_no, validate(row)))
+      except ValidationError as e:
+        record_errors([ImportRowError(line=line_no, errors=validation_messages(e))])
+        chunk_failed += 1
+
+    if len(chunk) + chunk_failed >= chunk_size:
+      await flush()
+
+  if chunk or chunk_failed:
+    await flush()
+
+  report.elapsed_seconds = round(time.perf_counter() - started, 4)
+  if report.elapsed_seconds:
+    report.rows_per_second = round(report.inserted / report.elapsed_seconds, 1)
+
+  return report
+
+
+async def load_or_bisect(
+    chunk: List[Tuple[int, Any]],
+    load: Callable[[List[Tuple[int, Any]]], Awaitable[None]],
+    session: AsyncSession,
+    errors: Tuple[type, ...] = COPY_ERRORS,
+) -> List[ImportRowError]:
+  """Load a chunk with `load`, which commits; on a database error, halve it and retry.
+
+  Only the rows that still fail on their own are reported, each against its
+  own error. A chunk with k bad rows costs about k * log2(len(chunk)) extra
+  loads; a clean chunk costs one.
+  """
+
+  try:
+    await load(chunk)
+  except errors as e:
+    await session.rollback()
+    if len(chunk) == 1:
+      return [ImportRowError(line=chunk[0][0], errors=[f"not loaded: {e}"])]
+    middle = len(chunk) // 2
+    return (
+      await load_or_bisect(chunk[:middle], load, session, errors)
+      + await load_or_bisect(chunk[middle:], load, session, errors)
+    )
+  return []
+
+
+async def copy_records(
+    session: AsyncSession, table: str, columns: Sequence[str], records: List[tuple]) -> None:
+  """Load rows with the asyncpg COPY protocol on the session's own connection.
+
+  COPY joins the session's transaction once a statement has been executed in
+  it; on an otherwise idle session it is committed as a statement of its own.
+  """
+
+  connection = await session.connection()
+  raw_connection = await connection.get_raw_connection()
+  await raw_connection.driver_connection.copy_records_to_table(
+    table, records=records, columns=list(columns)
+  )
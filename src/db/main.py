@@ -1,8 +1,10 @@
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.config import Config
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 engine: AsyncEngine = create_async_engine(
@@ -26,3 +28,15 @@ async def init_db():
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+
+
+@asynccontextmanager
+async def worker_session() -> AsyncGenerator[AsyncSession, None]:
+    """A session on its own unpooled engine, for jobs a Celery worker runs under asyncio.run:
+    every run has a new event loop, so it must not share the app's pooled connections."""
+    worker_engine = create_async_engine(Config.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(worker_engine) as session:
+            yield session
+    finally:
+        await worker_engine.dispose()
@@ -2,7 +2,8 @@ from sqlmodel import SQLModel, Field, Column, Relationship, ForeignKey
 import sqlalchemy.dialects.postgresql as pg
 from datetime import datetime, date
 from typing import List, Optional
-from sqlalchemy import func
+from sqlalchemy import func, Index, Computed, text
+from sqlalchemy.orm import deferred
 import uuid
 
 class User(SQLModel, table=True):
@@ -34,11 +35,15 @@ class User(SQLModel, table=True):
     
 class BookTag(SQLModel, table=True):
     __tablename__ = "book_tag"
+    __table_args__ = (
+        # the primary key serves book -> tags; this serves tag -> books
+        Index("ix_book_tag_tag_id_book_id", "tag_id", "book_id"),
+    )
 
     book_id: uuid.UUID = Field(
         sa_column=Column(
             pg.UUID(as_uuid=True),
-            ForeignKey("books.id"),
+            ForeignKey("books.id", ondelete="CASCADE"),
             primary_key=True
         )
     )
@@ -46,13 +51,49 @@ class BookTag(SQLModel, table=True):
     tag_id: uuid.UUID = Field(
         sa_column=Column(
             pg.UUID(as_uuid=True),
-            ForeignKey("tags.id"),
+            ForeignKey("tags.id", ondelete="CASCADE"),
             primary_key=True
         )
     )
 
+BOOK_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(author, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(publisher, '')), 'C')"
+)
+# deferred below: only search reads it, every other Book load leaves it out
+BOOK_SEARCH_VECTOR_COLUMN = Column(
+    "search_vector", pg.TSVECTOR, Computed(BOOK_SEARCH_VECTOR, persisted=True)
+)
+
+# NULL until the first review, so an unrated book is never mistaken for a badly rated one
+BOOK_AVG_RATING = (
+    "CASE WHEN review_count > 0 THEN rating_sum::double precision / review_count END"
+)
+
 class Book(SQLModel, table=True):
     __tablename__ = "books"
+    __table_args__ = (
+        # keyset pagination walks (created_at, id) newest first
+        Index("ix_books_created_at_id", "created_at", "id"),
+        Index("ix_books_user_id_created_at_id", "user_id", "created_at", "id"),
+        # filter and sort keys of the books list
+        Index("ix_books_author", "author"),
+        Index("ix_books_publisher", "publisher"),
+        Index("ix_books_language", "language"),
+        Index("ix_books_published_date_id", "published_date", "id"),
+        Index("ix_books_page_count_id", "page_count", "id"),
+        Index("ix_books_title_id", "title", "id"),
+        Index("ix_books_avg_rating_id", "avg_rating", "id"),
+        # unrated books sort last in both directions
+        Index("ix_books_avg_rating_desc_id", text("avg_rating DESC NULLS LAST"), text("id DESC")),
+        Index("ix_books_review_count_id", "review_count", "id"),
+        Index("ix_books_search_vector", "search_vector", postgresql_using="gin"),
+        # pg_trgm indexes for typeahead (similarity and ILIKE prefix matches)
+        Index("ix_books_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_books_author_trgm", "author", postgresql_using="gin", postgresql_ops={"author": "gin_trgm_ops"}),
+    )
+    __mapper_args__ = {"properties": {"search_vector": deferred(BOOK_SEARCH_VECTOR_COLUMN)}}
 
     id: uuid.UUID = Field(
         sa_column=Column(
@@ -71,6 +112,19 @@ class Book(SQLModel, table=True):
     user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="users.id")
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now, nullable=False))
     updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now, nullable=False))
+    # rating aggregates, kept in step with reviews by ReviewService
+    review_count: int = Field(default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0"))
+    rating_sum: int = Field(default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0"))
+    rating_histogram: List[int] = Field(
+        default_factory=lambda: [0] * 5,
+        sa_column=Column(pg.ARRAY(pg.INTEGER), nullable=False, server_default="{0,0,0,0,0}"),
+    )
+    # maintained by postgres, never written by the application
+    avg_rating: Optional[float] = Field(
+        default=None,
+        sa_column=Column(pg.DOUBLE_PRECISION, Computed(BOOK_AVG_RATING, persisted=True)),
+    )
+    search_vector: Optional[str] = Field(default=None, sa_column=BOOK_SEARCH_VECTOR_COLUMN)
     user: Optional[User] = Relationship(back_populates="books")
     reviews: List["Review"] = Relationship(back_populates="book", sa_relationship_kwargs={"lazy": "selectin"} )
     tags: List["Tag"] = Relationship(link_model=BookTag, back_populates="books")
@@ -80,6 +134,11 @@ class Book(SQLModel, table=True):
     
 class Review(SQLModel, table=True):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_created_at_id", "created_at", "id"),
+        Index("ix_reviews_book_id_created_at_id", "book_id", "created_at", "id"),
+        Index("ix_reviews_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id: uuid.UUID = Field(
         sa_column=Column(
@@ -89,7 +148,7 @@ class Review(SQLModel, table=True):
           default=uuid.uuid4
         )
     )
-    book_id: Optional[uuid.UUID] = Field(default=None, foreign_key="books.id")
+    book_id: Optional[uuid.UUID] = Field(default=None, foreign_key="books.id", ondelete="CASCADE")
     user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="users.id")
     rating: int = Field(lt=5, gt=0)
     review_text: str
@@ -104,6 +163,10 @@ class Review(SQLModel, table=True):
 
 class Tag(SQLModel, table=True):
     __tablename__ = "tags"
+    __table_args__ = (
+        Index("ix_tags_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_tags_book_count_id", "book_count", "id"),
+    )
 
     id: uuid.UUID = Field(
         sa_column=Column(
@@ -131,11 +194,55 @@ class Tag(SQLModel, table=True):
         )
     )
 
+    # maintained by TagService._attach/_detach and by book deletes
+    book_count: int = Field(default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0"))
+
+    # loaded only on access; deleting a tag leaves its book_tag rows to the FK cascade
     books: List["Book"] = Relationship(
         link_model=BookTag,
         back_populates="tags",
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "select", "passive_deletes": True},
     )
 
     def __repr__(self) -> str:
-        return f"<Tag {self.name}>"
\ No newline at end of file
+        return f"<Tag {self.name}>"
+
+class BookRecommendation(SQLModel, table=True):
+    """Precomputed "readers who liked this also liked" neighbours of one book, best first."""
+    __tablename__ = "book_recommendations"
+
+    book_id: uuid.UUID = Field(
+        sa_column=Column(
+            pg.UUID(as_uuid=True),
+            ForeignKey("books.id", ondelete="CASCADE"),
+            primary_key=True
+        )
+    )
+    neighbor_ids: List[uuid.UUID] = Field(sa_column=Column(pg.ARRAY(pg.UUID(as_uuid=True)), nullable=False))
+    scores: List[float] = Field(sa_column=Column(pg.ARRAY(pg.REAL), nullable=False))
+    computed_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now, nullable=False))
+
+
+class BookSimilarity(SQLModel, table=True):
+    """Tag-overlap (Jaccard) similarity, stored in both directions for each kept pair."""
+    __tablename__ = "book_similarities"
+    __table_args__ = (
+        Index("ix_book_similarities_book_id_score", "book_id", "score", "similar_book_id"),
+        Index("ix_book_similarities_similar_book_id", "similar_book_id"),
+    )
+
+    book_id: uuid.UUID = Field(
+        sa_column=Column(
+            pg.UUID(as_uuid=True),
+            ForeignKey("books.id", ondelete="CASCADE"),
+            primary_key=True
+        )
+    )
+    similar_book_id: uuid.UUID = Field(
+        sa_column=Column(
+            pg.UUID(as_uuid=True),
+            ForeignKey("books.id", ondelete="CASCADE"),
+            primary_key=True
+        )
+    )
+    score: float = Field(sa_column=Column(pg.REAL, nullable=False))
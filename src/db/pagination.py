@@ -0,0 +1,52 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from src.errors import InvalidCursor
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last row of a page into an opaque string."""
+
+    payload = json.dumps([_dump_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> Tuple[Any, ...]:
+    """Unpack a cursor built by `encode_cursor`, converting each value with `parsers`."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise InvalidCursor()
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    # AttributeError: a value of the wrong JSON type, e.g. uuid.UUID(123)
+    except (ValueError, TypeError, AttributeError, binascii.Error, UnicodeError):
+        raise InvalidCursor()
+
+
+def build_page(
+    rows: List[Any], limit: int, cursor_values: Callable[[Any], Tuple[Any, ...]]
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim a `limit + 1` result down to one page and work out the next cursor."""
+
+    if len(rows) <= limit:
+        return list(rows), None
+
+    page = list(rows[:limit])
+    return page, encode_cursor(*cursor_values(page[-1]))
@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from pydantic import BaseModel, create_model
+
+from src.errors import InvalidFieldSelection
+
+
+def parse_fields(raw: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+  """Turn `?fields=title,author` into a tuple of schema field names in request order.
+
+  `id` always comes first, so every projected item can still be addressed.
+  """
+
+  if raw is None:
+    return None
+
+  fields = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+  if not fields or any(name not in schema.model_fields for name in fields):
+    raise InvalidFieldSelection()
+
+  if "id" in schema.model_fields:
+    fields = tuple(dict.fromkeys(("id", *fields)))
+  return fields
+
+
+@lru_cache(maxsize=256)
+def partial_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+  """Response model holding only `fields` of `schema`, with the same types."""
+
+  definitions = {
+    name: (schema.model_fields[name].annotation, ...)
+    for name in fields
+  }
+  return create_model(f"{schema.__name__}Fields", **definitions)
+
+
+@lru_cache(maxsize=256)
+def partial_page_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+  return create_model(
+    f"{schema.__name__}FieldsPage",
+    items=(List[partial_schema(schema, fields)], ...),
+    next_cursor=(Optional[str], None),
+  )
@@ -1,13 +1,54 @@
 import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 from src.config import Config
+from typing import List, Optional
+import logging
 
 JTI_EXPIRY = 3600 # in seconds, adjust as needed (e.g., 1 hour)
 
-token_blocklist = aioredis.from_url(Config.REDIS_URL)
+redis_client = aioredis.from_url(Config.REDIS_URL)
+
+token_blocklist = redis_client
 
 async def add_token_to_blocklist(jti: str):
     await token_blocklist.set(name=jti, value="blocked", ex=JTI_EXPIRY)
 
 async def is_token_blocked(jti: str):
     jti = await token_blocklist.get(jti)
-    return jti is not None
\ No newline at end of file
+    return jti is not None
+
+# Cache helpers: a cache outage must never fail the request, so errors are
+# logged and treated as a miss.
+async def cache_get(key: str) -> Optional[bytes]:
+    try:
+        return await redis_client.get(key)
+    except RedisError as e:
+        logging.error(f"Redis cache read failed for {key}: {e}")
+        return None
+
+async def cache_mget(*keys: str) -> List[Optional[bytes]]:
+    try:
+        return await redis_client.mget(*keys)
+    except RedisError as e:
+        logging.error(f"Redis cache read failed for {keys}: {e}")
+        return [None] * len(keys)
+
+async def cache_set(key: str, value: str | bytes, ex: int) -> None:
+    try:
+        await redis_client.set(name=key, value=value, ex=ex)
+    except RedisError as e:
+        logging.error(f"Redis cache write failed for {key}: {e}")
+
+async def cache_delete(*keys: str) -> None:
+    if not keys:
+        return
+    try:
+        await redis_client.delete(*keys)
+    except RedisError as e:
+        logging.error(f"Redis cache delete failed for {keys}: {e}")
+
+async def cache_incr(key: str) -> None:
+    try:
+        await redis_client.incr(key)
+    except RedisError as e:
+        logging.error(f"Redis counter increment failed for {key}: {e}")
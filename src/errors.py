@@ -59,6 +59,18 @@ class UserNotFound(BooklyException):
   """User Not Found"""
   pass
 
+class InvalidReview(BooklyException):
+  """User has submitted a review the database cannot store, such as one without text."""
+  pass
+
+class InvalidCursor(BooklyException):
+  """User has provided a pagination cursor that could not be decoded."""
+  pass
+
+class InvalidFieldSelection(BooklyException):
+  """User has asked for fields that the resource does not have."""
+  pass
+
 def create_exception_handler(status_code: int, initial_detail: Any) -> Callable[[Request,Exception], JSONResponse]:
   
   async def exception_handler(request: Request, exc: BooklyException) -> JSONResponse:
@@ -204,6 +216,43 @@ def register_error_handlers(app: FastAPI):
         ),
     )
 
+    app.add_exception_handler(
+        InvalidReview,
+        create_exception_handler(
+            # the same status as a body that fails ReviewCreate validation
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            initial_detail={
+                "message": "Review is missing a required value",
+                "resolution": "Provide a rating and the review text",
+                "error_code": "invalid_review",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Pagination cursor is invalid",
+                "resolution": "Use the next_cursor returned by the previous page",
+                "error_code": "invalid_cursor",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidFieldSelection,
+        create_exception_handler(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            initial_detail={
+                "message": "Unknown field requested",
+                "resolution": "Only request fields that appear in the full response",
+                "error_code": "invalid_fields",
+            },
+        ),
+    )
+
     @app.exception_handler(500)
     async def internal_server_error(request, exc):
 
@@ -0,0 +1,34 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+  """Strong ETag from the watermarks that identify one version of a resource."""
+
+  digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+  return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+  header = request.headers.get("if-none-match")
+  if not header:
+    return False
+  if header.strip() == "*":
+    return True
+
+  # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+  candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+  return etag in candidates
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+  response.headers["ETag"] = etag
+  response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+  response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+  set_cache_headers(response, etag, cache_control)
+  return response
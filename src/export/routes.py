@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Path, Query
+from fastapi.responses import StreamingResponse
+
+from src.auth.dependencies import RoleChecker
+
+from .service import EXPORTS, ExportService
+
+export_router = APIRouter()
+export_service = ExportService()
+admin_role_checker = Depends(RoleChecker(["admin"]))
+
+MEDIA_TYPES = {
+  "ndjson": "application/x-ndjson",
+  "csv": "text/csv",
+}
+
+
+@export_router.get("/{resource}", dependencies=[admin_role_checker])
+async def export_resource(
+    resource: str = Path(..., pattern=f"^({'|'.join(EXPORTS)})$", description="books, reviews or users"),
+    format: str = Query("ndjson", pattern=f"^({'|'.join(MEDIA_TYPES)})$"),
+) -> StreamingResponse:
+
+  return StreamingResponse(
+    export_service.stream(resource, format),
+    media_type=MEDIA_TYPES[format],
+    headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'},
+  )
@@ -0,0 +1,62 @@
+import csv
+import io
+from typing import AsyncIterator, Type
+
+from pydantic import BaseModel
+from sqlalchemy.orm import noload
+from sqlmodel import select
+
+from src.auth.schema import UserRead
+from src.books.schemas import Book as BookSchema
+from src.db.main import async_session
+from src.db.models import Book, Review, User
+from src.reviews.schemas import ReviewRead
+
+EXPORT_FETCH_SIZE = 1000
+
+# resource -> (table model, schema used to serialise each row)
+EXPORTS = {
+  "books": (Book, BookSchema),
+  "reviews": (Review, ReviewRead),
+  "users": (User, UserRead),
+}
+
+
+class ExportService:
+
+  def _columns(self, schema: Type[BaseModel]) -> list:
+    return [name for name, field in schema.model_fields.items() if not field.exclude]
+
+  async def stream(self, resource: str, fmt: str) -> AsyncIterator[str]:
+    """Yield the whole table as NDJSON or CSV, EXPORT_FETCH_SIZE rows at a time.
+
+    Rows come from a server-side cursor, so memory use does not depend on the
+    size of the table. The generator opens its own session because it keeps
+    running after the route handler has returned.
+    """
+
+    model, schema = EXPORTS[resource]
+    columns = self._columns(schema)
+
+    if fmt == "csv":
+      yield self._csv_lines([columns])
+
+    async with async_session() as session:
+      result = await session.stream_scalars(
+        select(model)
+        .options(noload("*"))  # relationships are not part of the export
+        .execution_options(yield_per=EXPORT_FETCH_SIZE)
+      )
+
+      async for rows in result.partitions():
+        items = [schema.model_validate(row, from_attributes=True) for row in rows]
+        if fmt == "csv":
+          dumped = [item.model_dump(mode="json") for item in items]
+          yield self._csv_lines([[row[column] for column in columns] for row in dumped])
+        else:
+          yield "".join(f"{item.model_dump_json()}\n" for item in items)
+
+  def _csv_lines(self, rows: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
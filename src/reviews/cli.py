@@ -0,0 +1,35 @@
+"""Bulk import reviews from the command line.
+
+    python -m src.reviews.cli legacy_reviews.ndjson
+    python -m src.reviews.cli partner_feed.csv --format csv --chunk-size 10000
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from src.db.bulk import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, iter_records
+from src.db.main import async_session
+from src.books.cli import read_file
+from src.reviews.service import ReviewService
+
+
+async def import_file(path: Path, fmt: str, chunk_size: int):
+  async with async_session() as session:
+    records = iter_records(read_file(path), fmt)
+    return await ReviewService().import_reviews(records, session, chunk_size=chunk_size)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Bulk import reviews from an NDJSON or CSV file")
+  parser.add_argument("path", type=Path)
+  parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+  parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+  args = parser.parse_args()
+
+  fmt = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "ndjson")
+  report = asyncio.run(import_file(args.path, fmt, args.chunk_size))
+  print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+  main()
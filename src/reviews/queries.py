@@ -0,0 +1,78 @@
+"""Keyset-paginated review queries shared by ReviewService and BookService."""
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_, func, true
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.bulk import uuid_array
+from src.db.models import Review
+from src.db.pagination import DEFAULT_PAGE_SIZE, build_page, decode_cursor
+
+# newest first; (created_at, id) is indexed on its own and behind book_id and user_id,
+# so a page is a short index range scan
+REVIEW_ORDER = (Review.created_at.desc(), Review.id.desc())
+
+
+def review_cursor(review) -> tuple:
+  return (review.created_at, review.id)
+
+
+async def review_page(
+    session: AsyncSession, clauses: list, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = None) -> dict:
+  if fields:
+    # project only the requested columns (plus the keyset columns) so an unread
+    # review_text is never fetched from TOAST
+    selected = dict.fromkeys((*fields, "created_at", "id"))
+    statement = select(*(getattr(Review, name) for name in selected))
+  else:
+    statement = select(Review)
+
+  statement = statement.where(*clauses)
+  if cursor:
+    created_at, review_id = decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+    statement = statement.where(tuple_(Review.created_at, Review.id) < tuple_(created_at, review_id))
+  statement = statement.order_by(*REVIEW_ORDER).limit(limit + 1)
+
+  if fields:
+    result = await session.execute(statement)
+    rows, next_cursor = build_page(result.mappings().all(), limit, lambda row: (row["created_at"], row["id"]))
+    return {"items": [{name: row[name] for name in fields} for row in rows], "next_cursor": next_cursor}
+
+  result = await session.exec(statement)
+  reviews, next_cursor = build_page(result.all(), limit, review_cursor)
+
+  return {"items": reviews, "next_cursor": next_cursor}
+
+
+async def first_review_pages(
+    session: AsyncSession, book_ids: List[uuid.UUID], limit: int) -> Dict[uuid.UUID, dict]:
+  """First review page of many books in one statement (LATERAL ... LIMIT per book)."""
+
+  if not book_ids:
+    return {}
+
+  books = func.unnest(uuid_array(book_ids)).table_valued("id").render_derived("wanted")
+  newest = (
+    select(Review)
+    .where(Review.book_id == books.c.id)
+    .order_by(*REVIEW_ORDER)
+    .limit(limit + 1)
+    .subquery()
+    .lateral("newest")
+  )
+  statement = select(Review).from_statement(select(newest).select_from(books).join(newest, true()))
+  result = await session.execute(statement)
+
+  grouped: Dict[uuid.UUID, list] = {book_id: [] for book_id in book_ids}
+  for review in result.scalars().all():
+    grouped[review.book_id].append(review)
+
+  pages = {}
+  for book_id, reviews in grouped.items():
+    items, next_cursor = build_page(reviews, limit, review_cursor)
+    pages[book_id] = {"items": items, "next_cursor": next_cursor}
+  return pages
@@ -1,40 +1,128 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response, status, HTTPException
+from fastapi.responses import JSONResponse
+from typing import Optional
+from datetime import datetime
+import uuid
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.auth.dependencies import RoleChecker, get_current_user
+from src.auth.dependencies import RoleChecker, access_token_bearer, get_current_user
 from src.db.main import get_session
 from src.db.models import User
 
-from .schemas import ReviewCreate, ReviewRead
+from .schemas import ReviewCreate, ReviewFilter, ReviewPage, ReviewRead, REVIEW_SUMMARY_FIELDS
 from .service import ReviewService
-from src.errors import ReviewNotFound
+from src.errors import InvalidFieldSelection, ReviewNotFound
+from src.db.projection import parse_fields, partial_page_schema
+from src.etag import etag_matches, make_etag, not_modified, set_cache_headers
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.db.bulk import IMPORT_FORMATS, ImportReport, iter_records
 
 review_service = ReviewService()
 review_router = APIRouter()
 admin_role_checker = Depends(RoleChecker(["admin"]))
 user_role_checker = Depends(RoleChecker(["user", "admin"]))
 
-@review_router.get("/", response_model=list[ReviewRead], status_code=status.HTTP_200_OK, dependencies=[admin_role_checker])
-async def get_all_reviews(session: AsyncSession = Depends(get_session)) -> list[ReviewRead]:
-  reviews = await review_service.get_all_reviews(session)
+# a review only changes through its own updated_at, so short-lived caching is safe
+REVIEW_CACHE_CONTROL = "private, max-age=60"
+
+def get_review_filters(
+  book_id: Optional[uuid.UUID] = Query(None),
+  user_id: Optional[uuid.UUID] = Query(None),
+  min_rating: Optional[int] = Query(None, ge=1, le=5),
+  max_rating: Optional[int] = Query(None, ge=1, le=5),
+  created_from: Optional[datetime] = Query(None),
+  created_to: Optional[datetime] = Query(None)) -> ReviewFilter:
+  return ReviewFilter(
+    book_id=book_id,
+    user_id=user_id,
+    min_rating=min_rating,
+    max_rating=max_rating,
+    created_from=created_from,
+    created_to=created_to,
+  )
+
+def selected_fields(fields: Optional[str], summary: bool) -> Optional[tuple]:
+  selected = parse_fields(fields, ReviewRead)
+  if summary:
+    # summary mode never reads review_text, whatever else was asked for
+    selected = tuple(name for name in (selected or REVIEW_SUMMARY_FIELDS) if name != "review_text")
+    if not selected:
+      raise InvalidFieldSelection()
+  return selected
+
+def sparse_page(page: dict, fields: tuple) -> JSONResponse:
+  schema = partial_page_schema(ReviewRead, fields)
+  return JSONResponse(content=schema.model_validate(page).model_dump(mode="json"))
+
+FIELDS_QUERY = Query(None, description="Comma separated fields to return, e.g. id,rating")
+SUMMARY_QUERY = Query(False, description="Leave out review_text")
+
+@review_router.get("/", response_model=ReviewPage, status_code=status.HTTP_200_OK, dependencies=[admin_role_checker])
+async def get_all_reviews(
+  filters: ReviewFilter = Depends(get_review_filters),
+  limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+  cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+  fields: Optional[str] = FIELDS_QUERY,
+  summary: bool = SUMMARY_QUERY,
+  session: AsyncSession = Depends(get_session)) -> ReviewPage:
+  selected = selected_fields(fields, summary)
+  reviews = await review_service.get_all_reviews(
+    session, filters=filters, limit=limit, cursor=cursor, fields=selected
+  )
+  if selected:
+    return sparse_page(reviews, selected)
   return reviews
 
+@review_router.get("/book/{book_id}", response_model=ReviewPage, status_code=status.HTTP_200_OK, dependencies=[user_role_checker])
+async def get_book_reviews(
+  book_id: uuid.UUID,
+  limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+  cursor: Optional[str] = Query(None, description="next_cursor from the previous page or from a BookDetail"),
+  fields: Optional[str] = FIELDS_QUERY,
+  summary: bool = SUMMARY_QUERY,
+  session: AsyncSession = Depends(get_session)) -> ReviewPage:
+  selected = selected_fields(fields, summary)
+  reviews = await review_service.get_book_reviews(book_id, session, limit=limit, cursor=cursor, fields=selected)
+  if selected:
+    return sparse_page(reviews, selected)
+  return reviews
+
+@review_router.post("/import", response_model=ImportReport, status_code=status.HTTP_200_OK, dependencies=[admin_role_checker])
+async def import_reviews(
+  request: Request,
+  format: str = Query("ndjson", pattern=f"^({'|'.join(IMPORT_FORMATS)})$", description="Body format: ndjson or csv"),
+  session: AsyncSession = Depends(get_session)) -> ImportReport:
+  # the body is decoded as it arrives, so feeds of any size use constant memory
+  records = iter_records(request.stream(), format)
+  report = await review_service.import_reviews(records, session)
+  return report
+
 @review_router.get("/{review_id}", response_model=ReviewRead, status_code=status.HTTP_200_OK, dependencies=[user_role_checker])
-async def get_review(review_id: str, session: AsyncSession = Depends(get_session)) -> ReviewRead:
+async def get_review(
+  review_id: str,
+  request: Request,
+  response: Response,
+  session: AsyncSession = Depends(get_session)) -> ReviewRead:
   review = await review_service.get_review(review_id, session)
   if not review:
     raise ReviewNotFound()
+
+  etag = make_etag(review.id, review.updated_at)
+  if etag_matches(request, etag):
+    return not_modified(etag, REVIEW_CACHE_CONTROL)
+
+  set_cache_headers(response, etag, REVIEW_CACHE_CONTROL)
   return review
 
 @review_router.post("/book/{book_id}", response_model=ReviewRead, status_code=status.HTTP_201_CREATED, dependencies=[user_role_checker])
 async def create_review(
-      book_id: str,
+      book_id: uuid.UUID,
       review_data: ReviewCreate,
-      current_user: User = Depends(get_current_user),
+      token_details: dict = Depends(access_token_bearer),
       session: AsyncSession = Depends(get_session)
     ):
     new_review = await review_service.create_review(
-        user_email = current_user.email, 
+        user_id=uuid.UUID(token_details['user']['id']),
         book_id=book_id, 
         review_data=review_data, 
         session=session
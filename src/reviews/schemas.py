@@ -1,8 +1,17 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Optional
 from datetime import datetime
 import uuid
 
+from src.db.bulk import reject_nul
+
+
+def as_naive_local(value: Optional[datetime]) -> Optional[datetime]:
+    """reviews.created_at is a naive TIMESTAMP in server local time, and asyncpg refuses aware values for it."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
 
 class ReviewRead(BaseModel):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, description="Unique identifier for the review")
@@ -15,4 +24,61 @@ class ReviewRead(BaseModel):
     
 class ReviewCreate(BaseModel):
     rating: int = Field(..., ge=1, le=5, description="Rating for the book (1-5)")
-    review_text: Optional[str] = Field(None, description="Optional review comment about the book")
\ No newline at end of file
+    review_text: str = Field(..., description="Review comment about the book")  # reviews.review_text is NOT NULL
+
+    @field_validator("review_text")
+    @classmethod
+    def no_nul(cls, value):
+        return reject_nul(value)
+
+class ReviewPage(BaseModel):
+    items: List[ReviewRead]
+    next_cursor: Optional[str] = None
+
+class ReviewImport(ReviewCreate):
+    """One row of a bulk review import; the author is given by id or by email."""
+    book_id: uuid.UUID
+    user_id: Optional[uuid.UUID] = None
+    user_email: Optional[str] = None
+    created_at: Optional[datetime] = Field(None, description="Original review time, defaults to the import time")
+
+    @field_validator("user_id", "user_email", "created_at", mode="before")
+    @classmethod
+    def empty_as_missing(cls, value):
+        # CSV feeds leave unused columns empty rather than omitting them
+        return None if value == "" else value
+
+    @field_validator("user_email")
+    @classmethod
+    def no_nul_email(cls, value):
+        # looked up as a query parameter, which PostgreSQL refuses with NUL in it
+        return None if value is None else reject_nul(value)
+
+    @field_validator("created_at")
+    @classmethod
+    def naive_local(cls, value):
+        # COPY rejects an aware value for the whole chunk
+        return as_naive_local(value)
+
+    @model_validator(mode="after")
+    def check_author(self):
+        if (self.user_id is None) == (self.user_email is None):
+            raise ValueError("provide exactly one of user_id or user_email")
+        return self
+
+# every ReviewRead field except review_text, for list views that only show ratings
+REVIEW_SUMMARY_FIELDS = ("id", "book_id", "user_id", "rating", "created_at", "updated_at")
+
+class ReviewFilter(BaseModel):
+    book_id: Optional[uuid.UUID] = None
+    user_id: Optional[uuid.UUID] = None
+    min_rating: Optional[int] = Field(None, ge=1, le=5)
+    max_rating: Optional[int] = Field(None, ge=1, le=5)
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    @field_validator("created_from", "created_to")
+    @classmethod
+    def naive_local(cls, value):
+        # compared against reviews.created_at, so ?created_from=...Z must not reach asyncpg aware
+        return as_naive_local(value)
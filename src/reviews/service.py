@@ -1,66 +1,211 @@
-from src.db.models import Review
+from src.db.models import Review, Book, User
 from src.auth.service import UserService
 from src.books.service import BookService
+from src.books.cache import invalidate_book_details
+from src.books import trending
 from src.db.main import get_session
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi import HTTPException, status
-from .schemas import ReviewCreate
+from .schemas import ReviewCreate, ReviewFilter, ReviewImport
 from sqlmodel import select
-import logging
-from src.errors import BookNotFound, UserNotFound
+from sqlalchemy import insert, delete, any_, literal, or_
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.dialects import postgresql as pg
+from datetime import datetime
+import uuid
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from src.errors import BookNotFound, BooklyException, InvalidReview, UserNotFound
+from src.db.pagination import DEFAULT_PAGE_SIZE
+from src.db.bulk import COPY_ERRORS, DEFAULT_CHUNK_SIZE, ImportRowError, copy_records, load_or_bisect, run_import, uuid_array
+from .queries import review_page
 
 user_service = UserService()
 book_service = BookService()
 
+REVIEW_IMPORT_COLUMNS = ("id", "book_id", "user_id", "rating", "review_text", "created_at", "updated_at")
+
+FOREIGN_KEY_VIOLATION = "23503"
+NOT_NULL_VIOLATION = "23502"
+
+# record_ratings fails as a DBAPIError (e.g. an int4 overflow), the COPY as an asyncpg error
+IMPORT_ERRORS = COPY_ERRORS + (DBAPIError,)
+
+
+def _integrity_error(error: IntegrityError) -> Optional[BooklyException]:
+    """The BooklyException for a constraint a new review broke, None if unexpected"""
+
+    sqlstate = getattr(error.orig, "sqlstate", None)
+    if sqlstate == FOREIGN_KEY_VIOLATION:
+        # asyncpg's own exception, carrying the constraint name, is the cause of the DBAPI error
+        constraint = getattr(error.orig.__cause__, "constraint_name", None) or ""
+        # e.g. the author was deleted while their access token is still valid
+        return BookNotFound() if "book_id" in constraint else UserNotFound()
+    if sqlstate == NOT_NULL_VIOLATION:
+        return InvalidReview()
+    return None
+
 class ReviewService:
 
     async def create_review(
-        self, user_email: str, book_id: str, review_data: ReviewCreate, session: AsyncSession):
+        self, user_id: uuid.UUID, book_id: uuid.UUID, review_data: ReviewCreate, session: AsyncSession):
+        # two statements whatever the size of the book or the user: the aggregate
+        # UPDATE doubles as the existence check, then INSERT ... RETURNING
+        if not await book_service.record_rating(book_id, review_data.rating, 1, session):
+            await session.rollback()
+            raise BookNotFound()
 
         try:
-            user = await user_service.get_user_by_email(user_email, session)
-            if not user:
-                raise UserNotFound()
-
-            book = await book_service.get_book(book_id, session)
-            if not book:
-                raise BookNotFound()
-
-            review = Review(
-                user_id=user.id,
-                book_id=book.id,
-                **review_data.model_dump()
+            result = await session.execute(
+                insert(Review)
+                .values(user_id=user_id, book_id=book_id, **review_data.model_dump())
+                .returning(Review)
             )
-            session.add(review)
+        except IntegrityError as e:
+            await session.rollback()
+            error = _integrity_error(e)
+            if error is None:
+                raise
+            raise error from e
+        review = result.scalar_one()
+        await session.commit()
+        await invalidate_book_details([book_id])
+        trending.record(book_id, trending.REVIEW_WEIGHT)
+        return review
+
+    async def _resolve_import_refs(self, chunk: List[Tuple[int, ReviewImport]], session: AsyncSession):
+        """Existing book ids, and user ids keyed by id and by email, for one chunk in two queries."""
+
+        book_ids = list({review.book_id for _, review in chunk})
+        user_ids = list({review.user_id for _, review in chunk if review.user_id})
+        emails = list({review.user_email for _, review in chunk if review.user_email})
+
+        result = await session.execute(
+            select(Book.id).where(Book.id == any_(uuid_array(book_ids)))
+        )
+        books = set(result.scalars().all())
+
+        result = await session.execute(
+            select(User.id, User.email).where(or_(
+                User.id == any_(uuid_array(user_ids)),
+                User.email == any_(literal(emails, pg.ARRAY(pg.VARCHAR))),
+            ))
+        )
+        users = {}
+        for user_id, email in result.all():
+            users[user_id] = user_id
+            users[email] = user_id
+
+        return books, users
+
+    async def import_reviews(
+        self, records: AsyncIterator[Tuple[int, Any]], session: AsyncSession, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Bulk load decoded rows in the ReviewImport shape.
+
+        Each chunk resolves its books and users in bulk, adds its ratings to the
+        book aggregates with one UPDATE and writes the reviews with one COPY,
+        all in a single transaction. A chunk the database rejects is rolled back
+        and split until the failing rows are found; only those are reported.
+        """
+
+        loaded = set()
+
+        async def copy_chunk(rows: List[Tuple[int, tuple]]) -> None:
+            copy_rows = [row for _, row in rows]
+            # record_ratings runs first (and opens the transaction on a retry), so the
+            # COPY joins it and the rating aggregates go back with the reviews on failure
+            await book_service.record_ratings([(row[1], row[3]) for row in copy_rows], session)
+            await copy_records(session, Review.__tablename__, REVIEW_IMPORT_COLUMNS, copy_rows)
             await session.commit()
-            await session.refresh(review)
-            return review
-        except Exception as e:
-            logging.error(f"Error creating review: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
-                detail="OOPS! Something went wrong while creating the review. Please try again.")
+            loaded.update(row[1] for row in copy_rows)
+
+        async def load_chunk(chunk: List[Tuple[int, ReviewImport]]) -> List[ImportRowError]:
+            books, users = await self._resolve_import_refs(chunk, session)
+
+            rejected, copied = [], []
+            now = datetime.now()
+            for line, review in chunk:
+                user_id = users.get(review.user_id or review.user_email)
+                errors = []
+                if review.book_id not in books:
+                    errors.append(f"book_id: no book {review.book_id}")
+                if user_id is None:
+                    errors.append(f"user: no user {review.user_id or review.user_email}")
+                if errors:
+                    rejected.append(ImportRowError(line=line, errors=errors))
+                    continue
+                created_at = review.created_at or now
+                copied.append((line, (
+                    uuid.uuid4(), review.book_id, user_id, review.rating, review.review_text, created_at, created_at
+                )))
+
+            if not copied:
+                await session.rollback()
+                return rejected
+
+            loaded.clear()
+            rejected += await load_or_bisect(copied, copy_chunk, session, IMPORT_ERRORS)
+            await invalidate_book_details(loaded)
+            return rejected
+
+        return await run_import(records, ReviewImport.model_validate, load_chunk, chunk_size=chunk_size)
 
     async def get_review(self, review_id: str, session: AsyncSession):
         statement = select(Review).where(Review.id == review_id)
         result = await session.exec(statement)
         return result.first()
     
-    async def get_all_reviews(self, session: AsyncSession):
-        statement = select(Review).order_by(Review.created_at.desc())
-        result = await session.exec(statement)
-        return result.all()
-    
+    def _filter_clauses(self, filters: Optional[ReviewFilter]) -> list:
+        if filters is None:
+            return []
+
+        clauses = []
+        if filters.book_id is not None:
+            clauses.append(Review.book_id == filters.book_id)
+        if filters.user_id is not None:
+            clauses.append(Review.user_id == filters.user_id)
+        if filters.min_rating is not None:
+            clauses.append(Review.rating >= filters.min_rating)
+        if filters.max_rating is not None:
+            clauses.append(Review.rating <= filters.max_rating)
+        if filters.created_from is not None:
+            clauses.append(Review.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            clauses.append(Review.created_at <= filters.created_to)
+        return clauses
+
+    async def get_all_reviews(
+        self, session: AsyncSession, filters: Optional[ReviewFilter] = None, limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None) -> dict:
+        return await review_page(session, self._filter_clauses(filters), limit, cursor, fields=fields)
+
+    async def get_book_reviews(
+        self, book_id: str, session: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None) -> dict:
+        # keyset page over ix_reviews_book_id_created_at_id, newest first
+        return await review_page(session, [Review.book_id == book_id], limit, cursor, fields=fields)
+
     async def delete_review(self, review_id: str, user_email: str, session: AsyncSession):
-        user = await user_service.get_user_by_email(user_email, session)
-        review = await self.get_review(review_id, session)
+        """Delete the caller's own review, None if it is not theirs or already gone.
+
+        One DELETE ... RETURNING decides the race: of two concurrent deletes of
+        the same review only the one that gets the row back takes its rating
+        out of the book's aggregates.
+        """
 
-        if not review or review.user_id != user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_NOT_FOUND, 
-                detail="Cannot delete this review")
+        author_id = select(User.id).where(User.email == user_email).scalar_subquery()
+        result = await session.execute(
+            delete(Review)
+            .where(Review.id == review_id, Review.user_id == author_id)
+            .returning(Review.id, Review.book_id, Review.rating)
+            .execution_options(synchronize_session=False)
+        )
+        review = result.first()
+        if review is None:
+            await session.rollback()
+            return None
 
-        await session.delete(review)
+        if review.book_id is not None:
+            await book_service.record_rating(review.book_id, review.rating, -1, session)
         await session.commit()
+        await invalidate_book_details([review.book_id])
 
-        return review
\ No newline at end of file
+        return review
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.main import async_session
+from src.db.models import Tag
+from src.db.redis import redis_client
+
+TAG_CACHE_SIZE = 10000
+TAG_INVALIDATION_CHANNEL = "tags:invalidate"
+RESUBSCRIBE_DELAY = 1  # seconds between attempts while Redis is unreachable
+PENDING_KEY = "tag_ids_pending"  # session.info entry for ids waiting on a commit
+
+
+class TagNameCache:
+    """Size-bounded, least-recently-used map of tag name to tag id for one worker."""
+
+    def __init__(self, maxsize: int = TAG_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._ids: "OrderedDict[str, uuid.UUID]" = OrderedDict()
+
+    def get(self, name: str) -> Optional[uuid.UUID]:
+        tag_id = self._ids.get(name)
+        if tag_id is not None:
+            self._ids.move_to_end(name)
+        return tag_id
+
+    def put(self, name: str, tag_id: uuid.UUID) -> None:
+        self._ids[name] = tag_id
+        self._ids.move_to_end(name)
+        while len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+
+    def discard(self, names: Iterable[str]) -> None:
+        for name in names:
+            self._ids.pop(name, None)
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+tag_ids = TagNameCache()
+
+
+def resolve(names: Iterable[str]) -> Dict[str, uuid.UUID]:
+    """The cached subset of `names`; whatever is missing has to come from the database."""
+
+    found = {}
+    for name in names:
+        tag_id = tag_ids.get(name)
+        if tag_id is not None:
+            found[name] = tag_id
+    return found
+
+
+def _cache_pending(sync_session) -> None:
+    pending = sync_session.info[PENDING_KEY]
+    for name, tag_id in pending.items():
+        tag_ids.put(name, tag_id)
+    pending.clear()
+
+
+def _drop_pending(sync_session) -> None:
+    sync_session.info[PENDING_KEY].clear()
+
+
+def remember(session: AsyncSession, ids: Dict[str, uuid.UUID]) -> None:
+    """Cache ids read or created in the session's transaction once, and only if, it commits."""
+
+    pending = session.info.get(PENDING_KEY)
+    if pending is None:
+        pending = session.info[PENDING_KEY] = {}
+        event.listen(session.sync_session, "after_commit", _cache_pending)
+        event.listen(session.sync_session, "after_rollback", _drop_pending)
+    pending.update(ids)
+
+
+async def invalidate(*names: str) -> None:
+    """Forget names here and in every other worker; call after the change has been committed."""
+
+    tag_ids.discard(names)
+    try:
+        await redis_client.publish(TAG_INVALIDATION_CHANNEL, json.dumps(names))
+    except RedisError as e:
+        logging.error(f"Tag cache invalidation publish failed for {names}: {e}")
+
+
+async def warm() -> None:
+    try:
+        async with async_session() as session:
+            result = await session.exec(select(Tag.name, Tag.id).limit(TAG_CACHE_SIZE))
+            for name, tag_id in result.all():
+                tag_ids.put(name, tag_id)
+    except Exception as e:
+        # a cold cache only costs queries; never keep the worker from starting
+        logging.error(f"Tag cache warm-up failed: {e}")
+
+
+async def listen() -> None:
+    """Apply invalidations published by any worker until cancelled."""
+
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(TAG_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    tag_ids.discard(json.loads(message["data"]))
+        except RedisError as e:
+            logging.error(f"Tag cache invalidation listener lost Redis: {e}")
+            # messages may have been missed while disconnected
+            tag_ids.clear()
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+        finally:
+            await pubsub.aclose()
+
+
+async def start() -> asyncio.Task:
+    """Subscribe this worker to invalidations, then warm its cache."""
+
+    listener = asyncio.create_task(listen())
+    await warm()
+    return listener
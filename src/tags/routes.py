@@ -1,26 +1,47 @@
-from typing import List
+import uuid
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 
 from src.auth.dependencies import RoleChecker
-from src.books.schemas import Book
+from src.books.schemas import Book, BookBulkResult
 from src.db.main import get_session
+from src.etag import etag_matches, make_etag, not_modified, set_cache_headers
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
-from .schemas import TagAddModel, TagCreateModel, TagModel
+from .schemas import TagAddModel, TagCreateModel, TagModel, TagPage, TagRetagModel, DEFAULT_TAG_SORT, TAG_SORT_PATTERN
 from .service import TagService
 
 tags_router = APIRouter()
 tag_service = TagService()
 user_role_checker = Depends(RoleChecker(["user", "admin"]))
+admin_role_checker = Depends(RoleChecker(["admin"]))
 
+# the tag vocabulary changes rarely; let clients reuse it for a minute
+TAGS_CACHE_CONTROL = "private, max-age=60"
 
-@tags_router.get("/", response_model=List[TagModel], dependencies=[user_role_checker])
-async def get_all_tags(session: AsyncSession = Depends(get_session)):
-    tags = await tag_service.get_tags(session)
 
-    return tags
+@tags_router.get("/", response_model=TagPage, dependencies=[user_role_checker])
+async def get_all_tags(
+    request: Request,
+    sort: str = Query(DEFAULT_TAG_SORT, pattern=TAG_SORT_PATTERN, description="Sort key, prefix with - for descending"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    session: AsyncSession = Depends(get_session),
+):
+    tags = await tag_service.get_tags(session, sort=sort, limit=limit, cursor=cursor)
+
+    # book counts move with every tagging, so the page itself is the validator
+    payload = TagPage.model_validate(tags).model_dump_json()
+    etag = make_etag(payload)
+    if etag_matches(request, etag):
+        return not_modified(etag, TAGS_CACHE_CONTROL)
+
+    response = Response(content=payload, media_type="application/json")
+    set_cache_headers(response, etag, TAGS_CACHE_CONTROL)
+    return response
 
 
 @tags_router.post(
@@ -42,7 +63,7 @@ async def add_tag(
     "/book/{book_id}/tags", response_model=Book, dependencies=[user_role_checker]
 )
 async def add_tags_to_book(
-    book_id: str, tag_data: TagAddModel, session: AsyncSession = Depends(get_session)
+    book_id: uuid.UUID, tag_data: TagAddModel, session: AsyncSession = Depends(get_session)
 ) -> Book:
 
     book_with_tag = await tag_service.add_tags_to_book(
@@ -52,6 +73,32 @@ async def add_tags_to_book(
     return book_with_tag
 
 
+@tags_router.delete(
+    "/book/{book_id}/tags", response_model=Book, dependencies=[user_role_checker]
+)
+async def remove_tags_from_book(
+    book_id: uuid.UUID,
+    name: List[str] = Query(..., description="Tag names to detach"),
+    session: AsyncSession = Depends(get_session),
+) -> Book:
+
+    book = await tag_service.remove_tags_from_book(book_id, name, session)
+
+    return book
+
+
+@tags_router.post(
+    "/retag", response_model=BookBulkResult, dependencies=[admin_role_checker]
+)
+async def retag_books(
+    retag: TagRetagModel, session: AsyncSession = Depends(get_session)
+) -> BookBulkResult:
+
+    result = await tag_service.retag_books(retag, session)
+
+    return result
+
+
 @tags_router.put(
     "/{tag_id}", response_model=TagModel, status_code= status.HTTP_200_OK,dependencies=[user_role_checker]
 )
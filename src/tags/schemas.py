@@ -2,7 +2,12 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+TAG_SORT_KEYS = ("book_count", "name", "created_at")
+TAG_SORT_PATTERN = rf"^-?({'|'.join(TAG_SORT_KEYS)})$"
+DEFAULT_TAG_SORT = "-book_count"
+MAX_RETAG_BOOKS = 1000
 
 
 class TagModel(BaseModel):
@@ -11,9 +16,32 @@ class TagModel(BaseModel):
     created_at: Optional[datetime] = None
 
 
+class TagWithBookCount(TagModel):
+    book_count: int
+
+
+class TagPage(BaseModel):
+    items: List[TagWithBookCount]
+    next_cursor: Optional[str] = None
+
+
 class TagCreateModel(BaseModel):
     name: str
 
 
 class TagAddModel(BaseModel):
-    tags: List[TagCreateModel]
\ No newline at end of file
+    tags: List[TagCreateModel]
+
+
+class TagRetagModel(BaseModel):
+    book_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=MAX_RETAG_BOOKS)
+    add: List[str] = []
+    remove: List[str] = []
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if not self.add and not self.remove:
+            raise ValueError("provide tags to add or remove")
+        if set(self.add) & set(self.remove):
+            raise ValueError("a tag cannot be both added and removed")
+        return self
@@ -1,17 +1,30 @@
 from fastapi import status
 from fastapi.exceptions import HTTPException
-from sqlmodel import desc, select
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.db.models import Book
 from src.books.service import BookService
-from src.db.models import Tag
-from sqlalchemy.orm import selectinload
-
-from .schemas import TagAddModel, TagCreateModel
-from src.errors import TagNotFound, TagAlreadyExists, BookNotFound
+from src.books.cache import invalidate_book_details
+from src.books.similarities import queue_refresh
+from . import cache as tag_cache
+from src.db.models import Tag, BookTag
+from sqlalchemy.orm import noload
+from sqlalchemy import any_, delete, func, literal, true, tuple_, update
+from sqlalchemy.dialects import postgresql as pg
+from datetime import datetime
+from typing import Dict, List, Optional
+import uuid
+
+from .schemas import TagAddModel, TagCreateModel, TagRetagModel, DEFAULT_TAG_SORT
+from src.errors import TagNotFound, TagAlreadyExists, BookNotFound, InvalidCursor
+from src.db.pagination import DEFAULT_PAGE_SIZE, build_page, decode_cursor
+from src.db.bulk import uuid_array
 
 book_service = BookService()
 
+# sort key -> parser for the value stored in the cursor
+TAG_SORT_PARSERS = {"book_count": int, "name": str, "created_at": datetime.fromisoformat}
+
 
 server_error = HTTPException(
     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Something went wrong"
@@ -20,49 +33,203 @@ server_error = HTTPException(
 
 class TagService:
 
-    async def get_tags(self, session: AsyncSession):
-        """Get all tags"""
-
-        statement = select(Tag).order_by(desc(Tag.created_at))
+    async def get_tags(
+        self, session: AsyncSession, sort: str = DEFAULT_TAG_SORT, limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None) -> dict:
+        """One page of tags with their book counts, as a single column-only query"""
+
+        descending = sort.startswith("-")
+        sort_key = sort.lstrip("-")
+
+        columns = {"book_count": Tag.book_count, "name": Tag.name, "created_at": Tag.created_at}
+        column = columns[sort_key]
+        parse = TAG_SORT_PARSERS[sort_key]
+
+        # the maintained count lets a book_count sort walk ix_tags_book_count_id
+        statement = select(Tag.id, Tag.name, Tag.created_at, Tag.book_count)
+        if cursor:
+            cursor_sort, value, tag_id = decode_cursor(cursor, str, parse, uuid.UUID)
+            if cursor_sort != sort:
+                raise InvalidCursor()
+            position = tuple_(column, Tag.id)
+            after = tuple_(value, tag_id)
+            statement = statement.where(position < after if descending else position > after)
+
+        order = (column.desc(), Tag.id.desc()) if descending else (column.asc(), Tag.id.asc())
+        result = await session.execute(statement.order_by(*order).limit(limit + 1))
+        tags, next_cursor = build_page(
+            [dict(row) for row in result.mappings().all()], limit, lambda tag: (sort, tag[sort_key], tag["id"])
+        )
+
+        return {"items": tags, "next_cursor": next_cursor}
+
+    def _recount(self, links, sign: int):
+        """CTE moving each tag's book_count by sign times its rows in links (a book_id, tag_id CTE)"""
+
+        counts = select(links.c.tag_id, func.count().label("n")).group_by(links.c.tag_id).subquery("counts")
+        return (
+            update(Tag)
+            .where(Tag.id == counts.c.tag_id)
+            .values(book_count=Tag.book_count + sign * counts.c.n)
+            .returning(Tag.id)
+            .cte("recounted")
+        )
+
+    async def _upsert_tags(self, names, session: AsyncSession) -> Dict[str, uuid.UUID]:
+        """Ids of the named tags by name, creating missing ones.
+
+        Names this worker has cached cost nothing; the rest take one upsert.
+        DO UPDATE rather than DO NOTHING so existing tags come back in RETURNING;
+        concurrent requests adding the same new tag meet at the unique index
+        instead of failing. Ids learned here are cached only if the
+        transaction commits.
+        """
+
+        names = set(names)
+        found = tag_cache.resolve(names)
+        missing = sorted(names - found.keys())  # a stable order keeps concurrent upserts from deadlocking
+        if missing:
+            statement = pg.insert(Tag).values([{"name": name} for name in missing])
+            result = await session.execute(
+                statement
+                .on_conflict_do_update(index_elements=[Tag.name], set_={"name": statement.excluded.name})
+                .returning(Tag.name, Tag.id)
+            )
+            upserted = dict(result.all())
+            tag_cache.remember(session, upserted)
+            found.update(upserted)
+
+        return found
+
+    async def _attach(self, book_ids, tags: Dict[str, uuid.UUID], session: AsyncSession) -> set:
+        """Link every existing book to every named tag in one INSERT ... ON CONFLICT DO NOTHING.
+
+        The same statement adds the new links to the tags' book counts.
+
+        A cached id whose tag has since been deleted (or deleted and recreated
+        under the same name) links nothing; such names are dropped from the
+        cache, upserted again and linked in a second pass.
+        """
+
+        if not tags:
+            return set()
+
+        # FOR KEY SHARE keeps the tags from being deleted before the links are in
+        known = (
+            select(Tag.id)
+            .where(Tag.id == any_(uuid_array(tags.values())))
+            .with_for_update(read=True, key_share=True)
+            .cte("known")
+        )
+        books = func.unnest(uuid_array(book_ids)).table_valued("book_id").render_derived("wanted_books")
+        links = (
+            select(books.c.book_id, known.c.id)
+            .select_from(books)
+            .join(Book, Book.id == books.c.book_id)
+            .join(known, true())
+        )
+        linked = (
+            pg.insert(BookTag)
+            .from_select(["book_id", "tag_id"], links)
+            .on_conflict_do_nothing()
+            .returning(BookTag.book_id, BookTag.tag_id)
+            .cte("linked")
+        )
+        result = await session.execute(select(
+            select(func.array_agg(linked.c.book_id)).scalar_subquery(),
+            select(func.array_agg(known.c.id)).scalar_subquery(),
+        ).add_cte(self._recount(linked, 1)))
+        linked_ids, known_ids = result.one()
+        attached = set(linked_ids or [])
+
+        stale = [name for name, tag_id in tags.items() if tag_id not in set(known_ids or [])]
+        if stale:
+            tag_cache.tag_ids.discard(stale)
+            attached |= await self._attach(book_ids, await self._upsert_tags(stale, session), session)
+
+        return attached
+
+    async def _detach(self, book_ids, names, session: AsyncSession) -> set:
+        """Unlink the named tags from the books in one DELETE ... USING tags, uncounting them"""
+
+        if not names:
+            return set()
+
+        unlinked = (
+            delete(BookTag)
+            .where(
+                BookTag.tag_id == Tag.id,
+                Tag.name == any_(literal(list(set(names)), pg.ARRAY(pg.VARCHAR))),
+                BookTag.book_id == any_(uuid_array(book_ids)),
+            )
+            .returning(BookTag.book_id, BookTag.tag_id)
+            .cte("unlinked")
+        )
+        result = await session.execute(
+            select(unlinked.c.book_id).add_cte(self._recount(unlinked, -1))
+        )
+        return set(result.scalars().all())
+
+    async def _get_book(self, book_id: uuid.UUID, session: AsyncSession) -> Book:
+        result = await session.exec(
+            select(Book)
+            .where(Book.id == book_id)
+            .options(noload(Book.tags), noload(Book.reviews))
+        )
+        book = result.first()
 
-        result = await session.exec(statement)
+        if not book:
+            raise BookNotFound()
 
-        return result.all()
+        return book
 
     async def add_tags_to_book(
-        self, book_id: str, tag_data: TagAddModel, session: AsyncSession
+        self, book_id: uuid.UUID, tag_data: TagAddModel, session: AsyncSession
     ):
-        """Add tags to a book"""
+        """Add tags to a book in a fixed number of statements, however many tags"""
 
-        result = await session.exec(
-          select(Book)
-          .where(Book.id == book_id)
-          .options(selectinload(Book.tags))
-      )
+        book = await self._get_book(book_id, session)
+        tags = await self._upsert_tags([tag.name for tag in tag_data.tags], session)
 
-        book = result.first()
+        attached = await self._attach([book.id], tags, session)
+        await session.commit()
+        await invalidate_book_details([book.id])
+        queue_refresh(attached)
+        return book
 
-        if not book:
-            raise BookNotFound()
+    async def remove_tags_from_book(self, book_id: uuid.UUID, names: List[str], session: AsyncSession):
+        """Detach the named tags from a book; unknown or unattached names are ignored"""
 
-        for tag_item in tag_data.tags:
-            result = await session.exec(
-                select(Tag).where(Tag.name == tag_item.name)
-            )
+        book = await self._get_book(book_id, session)
+
+        detached = await self._detach([book.id], names, session)
+        await session.commit()
+        await invalidate_book_details([book.id])
+        queue_refresh(detached)
+        return book
 
-            tag = result.first()
-            if not tag:
-                tag = Tag(name=tag_item.name)
-                session.add(tag)
-                await session.flush() # ensures tag gets ID
+    async def retag_books(self, retag: TagRetagModel, session: AsyncSession) -> dict:
+        """Add and remove tags across many books in one transaction"""
 
-            book.tags.append(tag)
+        book_ids = list(dict.fromkeys(retag.book_ids))
+        tags = await self._upsert_tags(retag.add, session)
+        detached = await self._detach(book_ids, retag.remove, session)
+        attached = await self._attach(book_ids, tags, session)
 
+        changed = attached | detached
         await session.commit()
-        await session.refresh(book)
-        return book
+        await invalidate_book_details(changed)
+        # only books whose tags changed are rescored, in the background
+        queue_refresh(changed)
 
+        return {"count": len(changed), "ids": list(changed)}
 
+    async def _tagged_book_ids(self, tag_id, session: AsyncSession) -> list:
+        result = await session.exec(
+            select(BookTag.book_id).where(BookTag.tag_id == tag_id)
+        )
+
+        return result.all()
 
     async def get_tag_by_id(self, tag_id: str, session: AsyncSession):
         """Get tag by uid"""
@@ -76,20 +243,21 @@ class TagService:
     async def add_tag(self, tag_data: TagCreateModel, session: AsyncSession):
         """Create a tag"""
 
-        statement = select(Tag).where(Tag.name == tag_data.name)
-
-        result = await session.exec(statement)
+        # the unique index decides; a cached name may belong to a tag deleted since
+        result = await session.execute(
+            pg.insert(Tag)
+            .values(name=tag_data.name)
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+            .returning(Tag)
+        )
+        new_tag = result.scalar_one_or_none()
 
-        tag = result.first()
-
-        if tag:
+        if new_tag is None:
             raise TagAlreadyExists()
 
-        new_tag = Tag(name=tag_data.name)
-
-        session.add(new_tag)
         await session.commit()
-        await session.refresh(new_tag)
+        await tag_cache.invalidate(new_tag.name)
+        tag_cache.tag_ids.put(new_tag.name, new_tag.id)
         return new_tag
 
     async def update_tag(
@@ -100,13 +268,17 @@ class TagService:
         if not tag:
             raise TagNotFound()
 
+        old_name = tag.name
         update_data_dict = tag_update_data.model_dump()
 
         for k, v in update_data_dict.items():
             setattr(tag, k, v)
 
+        book_ids = await self._tagged_book_ids(tag.id, session)
         await session.commit()
         await session.refresh(tag)
+        await tag_cache.invalidate(old_name, tag.name)
+        await invalidate_book_details(book_ids)
 
         return tag
 
@@ -117,5 +289,10 @@ class TagService:
         if not tag:
             raise TagNotFound()
 
+        book_ids = await self._tagged_book_ids(tag.id, session)
         await session.delete(tag)
-        await session.commit()
\ No newline at end of file
+        await session.commit()
+        await tag_cache.invalidate(tag.name)
+        await invalidate_book_details(book_ids)
+        # book_tag rows went with the tag by cascade; its books are rescored without it
+        queue_refresh(book_ids)
\ No newline at end of file
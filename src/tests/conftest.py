@@ -1,8 +1,15 @@
+import time
+import uuid
+from datetime import date, datetime
+from types import SimpleNamespace
 from src.db.main import get_session
+from src.auth import dependencies
 from src.auth.dependencies import AccessTokenBearer, RefreshTokenBearer, RoleChecker
 from src import app
+from src.tags import cache as tag_cache
+from src.db.models import Book
 from fastapi.testclient import TestClient
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 import pytest
 
 mock_session = Mock()
@@ -12,6 +19,53 @@ mock_book_service = Mock()
 def get_mock_session():
   yield mock_session
 
+class ScriptedResult:
+  """The rows one statement returned, readable the ways the services read a result."""
+
+  def __init__(self, rows):
+    self.rows = list(rows)
+
+  def all(self):
+    return self.rows
+
+  def first(self):
+    return self.rows[0] if self.rows else None
+
+  def one(self):
+    (row,) = self.rows
+    return row
+
+  scalar_one = one
+
+  def scalar_one_or_none(self):
+    return self.first()
+
+  def scalars(self):
+    return self
+
+  def mappings(self):
+    return self
+
+  @property
+  def rowcount(self):
+    return len(self.rows)
+
+class ScriptedSession:
+  """Stands in for an AsyncSession: records every statement and answers each
+  with the next scripted list of rows, no rows once the script runs out."""
+
+  def __init__(self, *answers):
+    self.answers = list(answers)
+    self.statements = []
+    self.commit = AsyncMock()
+    self.rollback = AsyncMock()
+
+  async def execute(self, statement, *args, **kwargs):
+    self.statements.append(statement)
+    return ScriptedResult(self.answers.pop(0) if self.answers else [])
+
+  exec = execute
+
 role_checker = RoleChecker(allowed_roles=["admin","user"])
 access_token_bearer = AccessTokenBearer()
 refresh_token_bearer = RefreshTokenBearer()
@@ -35,4 +89,57 @@ def fake_book_service():
 
 @pytest.fixture
 def test_client():
-  return TestClient(app)
\ No newline at end of file
+  return TestClient(app)
+
+@pytest.fixture
+def admin_client():
+  """A client past authentication: the token and the user behind every RoleChecker are stubbed."""
+  user = SimpleNamespace(uid=uuid.uuid4(), email="admin@example.com", role="admin", is_verified=True)
+  app.dependency_overrides[dependencies.access_token_bearer] = lambda: {"user": {"email": user.email, "id": str(user.uid)}}
+  app.dependency_overrides[dependencies.get_current_user] = lambda: user
+  # TrustedHostMiddleware only lets localhost through
+  yield TestClient(app, base_url="http://localhost")
+  app.dependency_overrides.pop(dependencies.access_token_bearer)
+  app.dependency_overrides.pop(dependencies.get_current_user)
+
+@pytest.fixture
+def scripted_session():
+  """ScriptedSession factory: scripted_session([rows of the first statement], [rows of the second], ...)"""
+  return ScriptedSession
+
+@pytest.fixture
+def make_book():
+  """Book row factory: make_book("Think Python"), with any column overridden by keyword."""
+  def make(title, **columns):
+    return Book(**{
+      "id": uuid.uuid4(), "title": title, "author": "Allen B. Downey", "publisher": "O'Reilly Media",
+      "published_date": date(2021, 1, 1), "page_count": 300, "language": "English",
+      "created_at": datetime(2026, 3, 1), "updated_at": datetime(2026, 3, 2), "tags": [],
+      **columns,
+    })
+  return make
+
+@pytest.fixture
+def assert_same_clauses():
+  """Asserts two lists of SQL clauses match one for one, bound values included."""
+  def check(actual, expected):
+    assert len(actual) == len(expected)
+    for clause, wanted in zip(actual, expected):
+      assert clause.compare(wanted), f"{clause} != {wanted}"
+  return check
+
+@pytest.fixture
+def tag_ids(monkeypatch):
+  """An empty tag name cache standing in for the worker-wide one for the length of a test."""
+  cache = tag_cache.TagNameCache()
+  monkeypatch.setattr(tag_cache, "tag_ids", cache)
+  return cache
+
+@pytest.fixture
+def server_tz(monkeypatch):
+  """Runs a test on a server two hours east of UTC, whose local time the TIMESTAMP columns hold."""
+  monkeypatch.setenv("TZ", "UTC-2")  # POSIX offsets count west, so this is UTC+2
+  time.tzset()
+  yield
+  monkeypatch.undo()
+  time.tzset()
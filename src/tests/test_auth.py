@@ -24,4 +24,73 @@ def test_user_creation(fake_session, fake_user_service, test_client):
   assert fake_user_service.user_exists_called_once()
   assert fake_user_service.user_exists_called_once_with(signup_data['email'],fake_session)
   assert fake_user_service.create_user_called_once()
-  assert fake_user_service. create_user_called_once_with(user_data, fake_session)
\ No newline at end of file
+  assert fake_user_service. create_user_called_once_with(user_data, fake_session)
+
+def test_token_is_verified_once_per_request(monkeypatch):
+  from fastapi import Depends, FastAPI
+  from fastapi.testclient import TestClient
+  from src.auth import dependencies
+  from src.auth.utils import create_access_token
+
+  decodes, lookups = [], []
+  decode_access_token = dependencies.decode_access_token
+
+  def decode(token):
+    decodes.append(token)
+    return decode_access_token(token)
+
+  async def is_token_blocked(jti):
+    lookups.append(jti)
+    return False
+
+  monkeypatch.setattr(dependencies, "decode_access_token", decode)
+  monkeypatch.setattr(dependencies, "is_token_blocked", is_token_blocked)
+
+  app = FastAPI()
+  other_bearer = dependencies.AccessTokenBearer()
+
+  @app.get("/probe")
+  async def probe(first: dict = Depends(dependencies.access_token_bearer), second: dict = Depends(other_bearer)):
+    return {"same": first is second}
+
+  token = create_access_token({"email": "john.doe@example.com"})
+  response = TestClient(app).get("/probe", headers={"Authorization": f"Bearer {token}"})
+
+  assert response.json() == {"same": True}
+  assert len(decodes) == 1
+  assert len(lookups) == 1
+
+def test_me_loads_the_user_once_and_adds_books_and_reviews(scripted_session, monkeypatch):
+  import uuid
+  from datetime import date, datetime
+  from unittest.mock import AsyncMock
+  from fastapi.testclient import TestClient
+  from src import app
+  from src.auth import dependencies
+  from src.db.main import get_session
+  from src.db.models import Book, User
+
+  user = User(
+    id=uuid.uuid4(), username="jane", email="jane@example.com", first_name="Jane", last_name="Doe",
+    role="user", password_hash="secret", is_verified=True,
+    created_at=datetime(2026, 3, 1), updated_at=datetime(2026, 3, 1),
+  )
+  book = Book(
+    id=uuid.uuid4(), title="Think Python", author="Allen B. Downey", publisher="O'Reilly Media",
+    published_date=date(2021, 1, 1), page_count=300, language="English", user_id=user.id,
+    created_at=datetime(2026, 3, 1), updated_at=datetime(2026, 3, 1),
+  )
+  session = scripted_session([book], [])  # the user's books, then their reviews
+  get_user_by_email = AsyncMock(return_value=user)
+  monkeypatch.setattr(dependencies.user_service, "get_user_by_email", get_user_by_email)
+  monkeypatch.setitem(app.dependency_overrides, dependencies.access_token_bearer, lambda: {"user": {"email": user.email}})
+  monkeypatch.setitem(app.dependency_overrides, get_session, lambda: session)
+
+  response = TestClient(app, base_url="http://localhost").get(f"{auth_prefix}me")
+
+  assert response.status_code == 200
+  assert [item["title"] for item in response.json()["books"]] == ["Think Python"]
+  assert response.json()["reviews"] == []
+  # role_checker and /me share the one get_current_user load
+  get_user_by_email.assert_awaited_once()
+  assert len(session.statements) == 2
@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+import fakeredis
+import pytest
+
+from src.books import cache as book_cache
+from src.books.schemas import BookUpdate
+from src.books.service import BookService
+from src.db import redis as redis_module
+
+
+@pytest.fixture
+def redis(monkeypatch):
+  client = fakeredis.FakeAsyncRedis()
+  monkeypatch.setattr(redis_module, "redis_client", client)
+  return client
+
+
+def test_entry_is_served_only_at_its_version(redis):
+  book_id = uuid.uuid4()
+
+  async def scenario():
+    await book_cache.set_book_detail(book_id, '"v1"', '{"title": "Fluent Python"}')
+    return (
+      await book_cache.get_book_detail(book_id, '"v1"'),
+      await book_cache.get_book_detail(book_id, '"v2"'),
+      await redis.ttl(book_cache.book_detail_key(book_id)),
+    )
+
+  current, stale, ttl = asyncio.run(scenario())
+
+  assert current == b'{"title": "Fluent Python"}'
+  assert stale is None
+  assert 0 < ttl <= book_cache.BOOK_DETAIL_TTL
+
+
+def test_hits_and_misses_are_counted(redis):
+  book_id = uuid.uuid4()
+
+  async def scenario():
+    assert await book_cache.get_book_detail_stats() == {"hits": 0, "misses": 0, "hit_ratio": 0.0}
+    await book_cache.get_book_detail(book_id, '"v1"')
+    await book_cache.set_book_detail(book_id, '"v1"', "{}")
+    for _ in range(3):
+      await book_cache.get_book_detail(book_id, '"v1"')
+    return await book_cache.get_book_detail_stats()
+
+  assert asyncio.run(scenario()) == {"hits": 3, "misses": 1, "hit_ratio": 0.75}
+
+
+def _update(service, book_id, session):
+  return service.update_book(str(book_id), BookUpdate(title="Fluent Python 2"), session)
+
+
+def _delete(service, book_id, session):
+  return service.delete_book(str(book_id), session)
+
+
+@pytest.mark.parametrize("write", [_update, _delete])
+def test_writes_drop_the_cached_detail_after_commit(redis, scripted_session, write):
+  book_id, other_id = uuid.uuid4(), uuid.uuid4()
+  # UPDATE ... RETURNING the book, or the locked book id ahead of the DELETE
+  session = scripted_session([{"id": book_id}] if write is _update else [book_id])
+
+  async def scenario():
+    await book_cache.set_book_detail(book_id, '"v1"', "{}")
+    await book_cache.set_book_detail(other_id, '"v1"', "{}")
+    await write(BookService(), book_id, session)
+    return (
+      await redis.exists(book_cache.book_detail_key(book_id)),
+      await redis.exists(book_cache.book_detail_key(other_id)),
+    )
+
+  assert asyncio.run(scenario()) == (0, 1)
+  session.commit.assert_awaited_once()
@@ -0,0 +1,97 @@
+import asyncio
+import uuid
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import and_, or_, tuple_
+
+from src import API_ROUTE_VERSION
+from src.books.schemas import BookFilter
+from src.books.service import BookService
+from src.db.models import Book
+from src.db.pagination import encode_cursor
+
+book_prefix = f"/api/{API_ROUTE_VERSION}/books/"
+
+
+def _clauses(filters: BookFilter) -> list:
+  return BookService()._filter_clauses(filters)
+
+
+def test_range_filters_compile_to_indexable_comparisons(assert_same_clauses):
+  clauses = _clauses(BookFilter(
+    published_from=date(2020, 1, 1), published_to=date(2021, 6, 30), min_pages=100, max_pages=400,
+  ))
+
+  assert_same_clauses(clauses, [
+    Book.published_date >= date(2020, 1, 1),
+    Book.published_date <= date(2021, 6, 30),
+    Book.page_count >= 100,
+    Book.page_count <= 400,
+  ])
+
+
+def test_year_filter_is_a_date_range(assert_same_clauses):
+  # a range over the indexed column rather than EXTRACT(year ...)
+  assert_same_clauses(_clauses(BookFilter(published_year=2019)), [
+    Book.published_date.between(date(2019, 1, 1), date(2019, 12, 31)),
+  ])
+
+
+def test_list_filters_use_equality_for_one_value(assert_same_clauses):
+  assert_same_clauses(_clauses(BookFilter(author=["Ramalho"], language=["English", "French"])), [
+    Book.author == "Ramalho",
+    Book.language.in_(["English", "French"]),
+  ])
+
+
+def test_equal_bounds_are_allowed(assert_same_clauses):
+  assert_same_clauses(_clauses(BookFilter(min_pages=200, max_pages=200)), [Book.page_count >= 200, Book.page_count <= 200])
+
+
+@pytest.mark.parametrize("bounds", [
+  {"published_from": date(2021, 1, 1), "published_to": date(2020, 1, 1)},
+  {"min_pages": 500, "max_pages": 100},
+])
+def test_inverted_ranges_are_rejected(bounds):
+  with pytest.raises(ValidationError):
+    BookFilter(**bounds)
+
+
+@pytest.mark.parametrize("params", [
+  {"published_from": "2021-01-01", "published_to": "2020-01-01"},
+  {"min_pages": 500, "max_pages": 100},
+  {"published_year": 0},
+])
+def test_inverted_or_invalid_ranges_are_a_422(admin_client, params):
+  response = admin_client.get(book_prefix, params=params)
+
+  assert response.status_code == 422
+
+
+def _page_statement(scripted_session, sort: str, cursor=None):
+  session = scripted_session()
+  asyncio.run(BookService().get_all_books(session, sort=sort, cursor=cursor))
+  return session.statements[0]
+
+
+def test_unrated_books_sort_last_in_both_directions(scripted_session, assert_same_clauses):
+  assert_same_clauses(_page_statement(scripted_session, "-avg_rating")._order_by_clauses, [
+    Book.avg_rating.desc().nulls_last(), Book.id.desc(),
+  ])
+  assert_same_clauses(_page_statement(scripted_session, "avg_rating")._order_by_clauses, [
+    Book.avg_rating.asc().nulls_last(), Book.id.asc(),
+  ])
+
+
+def test_avg_rating_cursor_reaches_and_walks_the_null_tail(scripted_session, assert_same_clauses):
+  book_id = uuid.uuid4()
+
+  rated = _page_statement(scripted_session, "-avg_rating", encode_cursor("-avg_rating", 4.5, book_id))
+  assert_same_clauses([rated.whereclause], [
+    or_(tuple_(Book.avg_rating, Book.id) < tuple_(4.5, book_id), Book.avg_rating.is_(None)),
+  ])
+
+  unrated = _page_statement(scripted_session, "-avg_rating", encode_cursor("-avg_rating", None, book_id))
+  assert_same_clauses([unrated.whereclause], [and_(Book.avg_rating.is_(None), Book.id < book_id)])
@@ -1,4 +1,17 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import inspect
+
 from src import API_ROUTE_VERSION
+from src.books import cache as book_cache
+from src.books import routes as book_routes
+from src.books.schemas import BookUpdate
+from src.books import service as book_service_module
+from src.books.service import BookService
+from src.db.models import Book as BookModel
 
 book_prefix = f"/api/{API_ROUTE_VERSION}/books/"
 
@@ -8,4 +21,76 @@ def test_get_all_books(fake_session, fake_book_service, test_client):
   )
 
   assert fake_book_service.get_all_books_called_once()
-  assert fake_book_service.get_all_books_called_once_with(fake_session) 
\ No newline at end of file
+  assert fake_book_service.get_all_books_called_once_with(fake_session) 
+
+def test_empty_update_reads_the_book_without_writing(scripted_session, monkeypatch):
+  row = {"id": uuid.uuid4(), "title": "Think Python"}
+  session = scripted_session([row])
+  invalidate = AsyncMock()
+  monkeypatch.setattr(book_cache, "invalidate_book_details", invalidate)
+
+  book = asyncio.run(BookService().update_book(str(row["id"]), BookUpdate(), session))
+
+  assert book == row
+  assert session.statements[0].is_select
+  session.commit.assert_not_awaited()
+  invalidate.assert_not_awaited()
+
+
+def test_update_writes_and_invalidates_the_cached_detail(scripted_session, monkeypatch):
+  row = {"id": uuid.uuid4(), "title": "Think Python 2"}
+  session = scripted_session([row])
+  invalidate = AsyncMock()
+  monkeypatch.setattr(book_cache, "invalidate_book_details", invalidate)
+
+  asyncio.run(BookService().update_book(str(row["id"]), BookUpdate(title="Think Python 2"), session))
+
+  assert session.statements[0].is_update
+  session.commit.assert_awaited_once()
+  invalidate.assert_awaited_once_with([row["id"]])
+
+
+def test_only_search_reads_the_search_vector():
+  assert inspect(BookModel).attrs.search_vector.deferred
+  assert not any(column.deferred for name, column in inspect(BookModel).column_attrs.items() if name != "search_vector")
+
+
+@pytest.mark.parametrize("q, status_code", [("a", 422), ("ab", 422), (" ab  ", 422), ("pyt", 200), (" py t ", 200)])
+def test_suggest_needs_a_prefix_with_trigrams(admin_client, monkeypatch, q, status_code):
+  suggest = AsyncMock(return_value=[])
+  monkeypatch.setattr(book_routes.book_service, "suggest", suggest)
+
+  response = admin_client.get(f"{book_prefix}suggest", params={"q": q})
+
+  assert response.status_code == status_code
+  assert suggest.await_count == (status_code == 200)
+
+
+def test_suggest_skips_the_database_for_short_prefixes():
+  session = Mock(execute=AsyncMock())
+
+  assert asyncio.run(BookService().suggest(" ab ", session)) == []
+  session.execute.assert_not_awaited()
+
+
+def test_batch_get_keeps_request_order_and_marks_missing_ids(scripted_session, monkeypatch, make_book):
+  first, second = make_book("Fluent Python"), make_book("Think Python")
+  missing = uuid.uuid4()
+  # the database hands the books back in its own order
+  session = scripted_session([second, first])
+  first_pages = AsyncMock(side_effect=lambda session, book_ids, limit: {
+    book_id: {"items": [], "next_cursor": None} for book_id in book_ids
+  })
+  monkeypatch.setattr(book_service_module, "first_review_pages", first_pages)
+
+  items = asyncio.run(BookService().get_books_by_ids([first.id, missing, second.id, first.id], session))
+
+  assert [(item["id"], item["found"]) for item in items] == [
+    (first.id, True), (missing, False), (second.id, True), (first.id, True),
+  ]
+  assert items[0]["book"].title == "Fluent Python"
+  assert items[1]["book"] is None
+  assert items[2]["book"].title == "Think Python"
+  # one query for the books and one review query for the ones found, duplicates collapsed
+  assert len(session.statements) == 1
+  assert sorted(first_pages.await_args.args[1]) == sorted([first.id, second.id])
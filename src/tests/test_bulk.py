@@ -0,0 +1,221 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from pydantic import ValidationError
+
+from src import API_ROUTE_VERSION
+from src.books import routes as book_routes
+from src.books.schemas import BookBulkSelection, BookCreate, BookFilter
+from src.books.service import BookService
+from src.db.bulk import INT4_MAX, ImportRowError, iter_records, load_or_bisect, run_import
+from src.reviews.schemas import ReviewImport
+
+
+async def _stream(*chunks: bytes):
+  for chunk in chunks:
+    yield chunk
+
+
+async def _collect(stream, fmt):
+  return [record async for record in iter_records(stream, fmt)]
+
+
+def test_ndjson_records_survive_chunk_boundaries():
+  records = asyncio.run(_collect(_stream(b'{"title": "Flu', b'ent"}\n\n{"title": "Think"}', b"\nnot json\n"), "ndjson"))
+
+  assert records[0] == (1, {"title": "Fluent"})
+  assert records[1] == (3, {"title": "Think"})
+  assert records[2][0] == 4
+  assert isinstance(records[2][1], ImportRowError)
+
+
+def test_csv_records_allow_quoted_newlines():
+  body = b'title,author\n"Fluent\nPython",Ramalho\nThink Python,Downey\n'
+  records = asyncio.run(_collect(_stream(body), "csv"))
+
+  assert records == [
+    (2, {"title": "Fluent\nPython", "author": "Ramalho"}),
+    (4, {"title": "Think Python", "author": "Downey"}),
+  ]
+
+
+def test_run_import_reports_invalid_rows_and_loads_valid_ones():
+  body = (
+    b'{"title": "Think Python", "author": "Allen B. Downey", "publisher": "O\'Reilly Media", '
+    b'"published_date": "2021-01-01", "page_count": 1234, "language": "English"}\n'
+    b'{"title": "Missing fields"}\n'
+  )
+  loaded = []
+
+  async def load_chunk(chunk):
+    loaded.extend(chunk)
+    return []
+
+  report = asyncio.run(run_import(iter_records(_stream(body), "ndjson"), BookCreate.model_validate, load_chunk))
+
+  assert report.inserted == 1
+  assert report.failed == 1
+  assert report.errors[0].line == 2
+  assert loaded[0][1].title == "Think Python"
+
+
+def test_review_import_stores_aware_times_as_naive_local(server_tz):
+  row = ReviewImport.model_validate({
+    "rating": 4, "review_text": "Good", "book_id": "8a3f1c0e-6a43-4b8e-9f53-1f0d2b6f7a10",
+    "user_email": "john.doe@example.com", "created_at": "2026-03-01T10:30:00Z",
+  })
+
+  assert row.created_at == datetime(2026, 3, 1, 12, 30)
+
+
+def test_load_or_bisect_reports_only_the_rows_the_database_rejects():
+  chunk = [(line, line) for line in range(1, 12)]
+  loaded, failures = [], []
+
+  async def load(rows):
+    bad = [value for _, value in rows if value in (4, 9)]
+    if bad:
+      failures.append(rows)
+      raise ValueError(f"bad value {bad[0]}")
+    loaded.extend(value for _, value in rows)
+
+  session = Mock(rollback=AsyncMock())
+  errors = asyncio.run(load_or_bisect(chunk, load, session))
+
+  assert [(error.line, error.errors) for error in errors] == [(4, ["not loaded: bad value 4"]), (9, ["not loaded: bad value 9"])]
+  assert sorted(loaded) == [value for value in range(1, 12) if value not in (4, 9)]
+  assert session.rollback.await_count == len(failures)
+  assert len(failures) < len(chunk)
+
+
+def test_load_or_bisect_loads_a_clean_chunk_once():
+  load = AsyncMock()
+
+  assert asyncio.run(load_or_bisect([(1, "a"), (2, "b")], load, Mock())) == []
+  load.assert_awaited_once()
+
+
+_BOOK = {
+  "title": "Think Python", "author": "Allen B. Downey", "publisher": "O'Reilly Media",
+  "published_date": "2021-01-01", "page_count": 1234, "language": "English",
+}
+
+
+@pytest.mark.parametrize("change", [
+  {"page_count": INT4_MAX + 1},
+  {"page_count": -1},
+  {"title": "Think\x00Python"},
+  {"language": "\x00"},
+])
+def test_book_create_rejects_what_postgres_would(change):
+  with pytest.raises(ValidationError):
+    BookCreate.model_validate({**_BOOK, **change})
+
+
+def test_book_create_accepts_the_largest_page_count():
+  assert BookCreate.model_validate({**_BOOK, "page_count": INT4_MAX}).page_count == INT4_MAX
+
+
+def test_review_import_reports_only_the_rows_the_database_rejects():
+  from sqlalchemy.exc import DBAPIError
+  from src.reviews import service as review_service
+
+  book_id, user_id = uuid.uuid4(), uuid.uuid4()
+  rows = [
+    {"rating": 4, "review_text": text, "book_id": str(book_id), "user_id": str(user_id)}
+    for text in ("fine", "rejected", "also fine")
+  ]
+  session = Mock(rollback=AsyncMock(), commit=AsyncMock())
+  copied = []
+
+  async def record_ratings(ratings, session):
+    if len(ratings) == 3:
+      raise DBAPIError("UPDATE books", {}, ValueError("integer out of range"))
+
+  async def copy(session, table, columns, records):
+    if any(record[4] == "rejected" for record in records):
+      raise ValueError("invalid input")
+    copied.extend(record[4] for record in records)
+
+  async def records():
+    for line, row in enumerate(rows, 1):
+      yield line, row
+
+  with patch.object(review_service.ReviewService, "_resolve_import_refs", AsyncMock(return_value=({book_id}, {user_id: user_id}))), \
+      patch.object(review_service.book_service, "record_ratings", record_ratings), \
+      patch.object(review_service, "copy_records", copy), \
+      patch.object(review_service, "invalidate_book_details", AsyncMock()) as invalidate:
+    report = asyncio.run(review_service.ReviewService().import_reviews(records(), session))
+
+  assert (report.inserted, report.failed) == (2, 1)
+  assert report.errors[0].line == 2
+  assert report.errors[0].errors == ["not loaded: invalid input"]
+  assert sorted(copied) == ["also fine", "fine"]
+  invalidate.assert_awaited_once_with({book_id})
+
+
+def test_review_text_rejects_nul():
+  with pytest.raises(ValidationError):
+    ReviewImport.model_validate({"rating": 4, "review_text": "a\x00b", "book_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4())})
+
+
+_BULK_PREFIX = f"/api/{API_ROUTE_VERSION}/books"
+
+
+@pytest.mark.parametrize("method, path, extra", [
+  ("PATCH", "/bulk", {"patch": {"language": "English"}}),
+  ("POST", "/bulk-delete", {}),
+])
+@pytest.mark.parametrize("selection", [
+  {"filter": {"author": []}},
+  {"filter": {"publisher": [], "language": []}},
+  {"filter": {}},
+])
+def test_bulk_writes_reject_a_filter_without_conditions(admin_client, monkeypatch, method, path, extra, selection):
+  bulk_update, bulk_delete = AsyncMock(return_value=[]), AsyncMock(return_value=[])
+  monkeypatch.setattr(book_routes.book_service, "bulk_update_books", bulk_update)
+  monkeypatch.setattr(book_routes.book_service, "bulk_delete_books", bulk_delete)
+
+  response = admin_client.request(method, f"{_BULK_PREFIX}{path}", json={**selection, **extra})
+
+  assert response.status_code == 422
+  bulk_update.assert_not_awaited()
+  bulk_delete.assert_not_awaited()
+
+
+def test_bulk_update_rejects_an_empty_patch(admin_client, monkeypatch):
+  bulk_update = AsyncMock(return_value=[])
+  monkeypatch.setattr(book_routes.book_service, "bulk_update_books", bulk_update)
+
+  response = admin_client.patch(f"{_BULK_PREFIX}/bulk", json={"ids": [str(uuid.uuid4())], "patch": {}})
+
+  assert response.status_code == 422
+  bulk_update.assert_not_awaited()
+
+
+def test_bulk_writes_never_run_without_a_where_clause():
+  # model_construct skips validation, standing in for a selection that slipped past it
+  selection = BookBulkSelection.model_construct(ids=None, filter=BookFilter.model_construct(author=[]))
+  session = Mock(execute=AsyncMock())
+
+  with pytest.raises(ValueError):
+    BookService()._selection_clauses(selection)
+  with pytest.raises(ValueError):
+    asyncio.run(BookService()._delete_books([], session))
+  session.execute.assert_not_awaited()
+
+
+def test_default_timestamps_share_the_import_basis(server_tz):
+  from src.db import models
+
+  imported = ReviewImport.model_validate({
+    "rating": 4, "review_text": "Good", "book_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()),
+    "created_at": datetime.now(timezone.utc).isoformat(),
+  })
+
+  for model in (models.Book, models.Review, models.User):
+    for name in ("created_at", "updated_at"):
+      assert abs(model.__table__.c[name].default.arg(None) - imported.created_at) < timedelta(minutes=1)
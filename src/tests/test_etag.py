@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from starlette.requests import Request
+
+from src import API_ROUTE_VERSION
+from src.books import routes as book_routes
+from src.etag import etag_matches, make_etag
+from src.reviews import routes as review_routes
+from src.tags import routes as tag_routes
+
+ETAG = make_etag("book", 1)
+
+
+def _request(if_none_match=None):
+  headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+  return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.parametrize("header, matches", [
+  (None, False),
+  ("", False),
+  ("*", True),
+  (" * ", True),
+  (ETAG, True),
+  (f"W/{ETAG}", True),
+  (f'"other", {ETAG}', True),
+  (f'"other",W/{ETAG} ', True),
+  ('"other", W/"another"', False),
+  (ETAG.strip('"'), False),  # an entity tag is only ever a quoted value
+])
+def test_if_none_match_parsing(header, matches):
+  assert etag_matches(_request(header), ETAG) is matches
+
+
+def _revalidate(client, url):
+  first = client.get(url)
+  assert first.status_code == 200
+  etag = first.headers["ETag"]
+
+  second = client.get(url, headers={"If-None-Match": etag})
+  assert second.status_code == 304
+  assert second.headers["ETag"] == etag
+  assert second.content == b""
+  return etag
+
+
+def test_book_detail_answers_304(admin_client, monkeypatch):
+  book_id = uuid.uuid4()
+  monkeypatch.setattr(book_routes.trending, "record", lambda *args: None)
+  monkeypatch.setattr(book_routes.book_service, "get_book_etag_parts", AsyncMock(return_value=(book_id, datetime(2026, 3, 1), 4, None)))
+  detail = AsyncMock(return_value='{"id": "cached"}')
+  monkeypatch.setattr(book_routes.book_service, "get_book_detail", detail)
+
+  _revalidate(admin_client, f"/api/{API_ROUTE_VERSION}/books/{book_id}")
+
+  # the 304 is decided from the watermarks alone
+  assert detail.await_count == 1
+
+
+def test_review_answers_304(admin_client, monkeypatch):
+  review = SimpleNamespace(
+    id=uuid.uuid4(), book_id=uuid.uuid4(), user_id=uuid.uuid4(), rating=4, review_text="Good",
+    created_at=datetime(2026, 3, 1), updated_at=datetime(2026, 3, 2),
+  )
+  monkeypatch.setattr(review_routes.review_service, "get_review", AsyncMock(return_value=review))
+
+  _revalidate(admin_client, f"/api/{API_ROUTE_VERSION}/reviews/{review.id}")
+
+
+def test_tag_page_answers_304(admin_client, monkeypatch):
+  tags = {"items": [{"id": uuid.uuid4(), "name": "python", "created_at": datetime(2026, 3, 1), "book_count": 3}], "next_cursor": None}
+  get_tags = AsyncMock(return_value=tags)
+  monkeypatch.setattr(tag_routes.tag_service, "get_tags", get_tags)
+
+  etag = _revalidate(admin_client, f"/api/{API_ROUTE_VERSION}/tags/")
+
+  # a changed page gets a new validator
+  tags["items"][0]["book_count"] = 4
+  response = admin_client.get(f"/api/{API_ROUTE_VERSION}/tags/", headers={"If-None-Match": etag})
+  assert response.status_code == 200
+  assert response.headers["ETag"] != etag
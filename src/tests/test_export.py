@@ -0,0 +1,99 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from src import API_ROUTE_VERSION
+from src.db.models import User
+from src.export import service as export_service
+
+
+class _StreamingSession:
+  """Hands out the given partitions of rows one at a time, recording how far it was read."""
+
+  def __init__(self, *partitions):
+    self.partitions_given = partitions
+    self.pulled = 0
+    self.statements = []
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, *exc):
+    return False
+
+  async def stream_scalars(self, statement):
+    self.statements.append(statement)
+    return self
+
+  async def partitions(self):
+    for rows in self.partitions_given:
+      self.pulled += 1
+      yield rows
+
+
+@pytest.fixture
+def streaming_session(monkeypatch):
+  def install(*partitions):
+    session = _StreamingSession(*partitions)
+    monkeypatch.setattr(export_service, "async_session", lambda: session)
+    return session
+  return install
+
+
+async def _take(stream, count: int) -> list:
+  return [await stream.__anext__() for _ in range(count)]
+
+
+def test_export_yields_each_partition_before_reading_the_next(streaming_session, make_book):
+  session = streaming_session([make_book("Think Python"), make_book("Think Stats")], [make_book("Think Bayes")])
+  stream = export_service.ExportService().stream("books", "ndjson")
+
+  (first,) = asyncio.run(_take(stream, 1))
+
+  assert session.pulled == 1
+  assert [json.loads(line)["title"] for line in first.splitlines()] == ["Think Python", "Think Stats"]
+  statement = session.statements[0]
+  assert statement.get_execution_options()["yield_per"] == export_service.EXPORT_FETCH_SIZE
+
+
+def test_ndjson_export_writes_one_schema_row_per_line(streaming_session, make_book):
+  book = make_book("Think Python")
+  streaming_session([book])
+
+  (chunk,) = asyncio.run(_take(export_service.ExportService().stream("books", "ndjson"), 1))
+
+  assert chunk.endswith("\n")
+  row = json.loads(chunk)
+  assert row["id"] == str(book.id)
+  assert row["published_date"] == "2021-01-01"
+  assert "search_vector" not in row and "rating_sum" not in row
+
+
+def test_csv_export_writes_a_header_then_rows_in_its_order(streaming_session):
+  user = User(
+    id=uuid.uuid4(), username="jane", email="jane@example.com", first_name="Jane", last_name="Doe",
+    role="user", password_hash="secret", is_verified=True,
+    created_at=datetime(2026, 3, 1), updated_at=datetime(2026, 3, 1),
+  )
+  streaming_session([user])
+
+  chunks = asyncio.run(_take(export_service.ExportService().stream("users", "csv"), 2))
+
+  header = chunks[0].rstrip("\n").split(",")
+  assert header == ["id", "username", "email", "first_name", "last_name", "role", "is_verified", "created_at", "updated_at"]
+  assert chunks[1] == f"{user.id},jane,jane@example.com,Jane,Doe,user,True,2026-03-01T00:00:00,2026-03-01T00:00:00\n"
+  assert "secret" not in "".join(chunks)
+
+
+def test_export_route_streams_with_a_download_name(admin_client, streaming_session, make_book):
+  streaming_session([make_book("Think Python")])
+
+  response = admin_client.get(f"/api/{API_ROUTE_VERSION}/export/books", params={"format": "ndjson"})
+
+  assert response.status_code == 200
+  assert response.headers["content-type"].startswith("application/x-ndjson")
+  assert response.headers["content-disposition"] == 'attachment; filename="books.ndjson"'
+  assert json.loads(response.text)["title"] == "Think Python"
@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from src.db.pagination import build_page, decode_cursor, encode_cursor
+from src.errors import InvalidCursor
+
+
+def test_cursor_round_trip():
+  created_at = datetime(2026, 3, 1, 12, 30, 15, 120)
+  book_id = uuid.uuid4()
+
+  cursor = encode_cursor(created_at, book_id)
+
+  assert decode_cursor(cursor, datetime.fromisoformat, uuid.UUID) == (created_at, book_id)
+
+
+def test_invalid_cursor_is_rejected():
+  with pytest.raises(InvalidCursor):
+    decode_cursor("not-a-cursor", datetime.fromisoformat, uuid.UUID)
+
+  with pytest.raises(InvalidCursor):
+    decode_cursor(encode_cursor(1), datetime.fromisoformat, uuid.UUID)
+
+  # well formed, but the id slot holds a JSON integer
+  with pytest.raises(InvalidCursor):
+    decode_cursor(encode_cursor(datetime(2026, 3, 1), 123), datetime.fromisoformat, uuid.UUID)
+
+
+def test_build_page_sets_next_cursor_only_when_more_rows():
+  rows = [1, 2, 3]
+
+  page, next_cursor = build_page(rows, 3, lambda row: (row,))
+  assert page == [1, 2, 3]
+  assert next_cursor is None
+
+  page, next_cursor = build_page(rows, 2, lambda row: (row,))
+  assert page == [1, 2]
+  assert decode_cursor(next_cursor, int) == (2,)
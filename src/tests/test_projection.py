@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+
+import pytest
+
+from src import API_ROUTE_VERSION
+from src.books.schemas import Book
+from src.books.service import BookService
+from src.db.projection import parse_fields, partial_schema
+from src.errors import InvalidFieldSelection
+from src.reviews.queries import review_page
+from src.reviews.schemas import ReviewRead
+
+
+def _selected_columns(statement) -> list:
+  return [column.name for column in statement.selected_columns]
+
+
+def test_parse_fields_keeps_request_order_with_id_first():
+  assert parse_fields(None, Book) is None
+  assert parse_fields("author, title,author", Book) == ("id", "author", "title")
+  assert parse_fields("title,id", Book) == ("id", "title")
+
+
+@pytest.mark.parametrize("raw", ["", " , ", "title,nope", "password"])
+def test_parse_fields_rejects_unknown_or_empty_selections(raw):
+  with pytest.raises(InvalidFieldSelection):
+    parse_fields(raw, Book)
+
+
+def test_partial_schema_holds_only_the_selected_fields():
+  schema = partial_schema(ReviewRead, ("id", "rating"))
+
+  assert list(schema.model_fields) == ["id", "rating"]
+  assert partial_schema(ReviewRead, ("id", "rating")) is schema
+
+
+def test_review_projection_selects_only_requested_and_keyset_columns(scripted_session):
+  session = scripted_session()
+
+  asyncio.run(review_page(session, [], 10, fields=("id", "rating")))
+
+  assert _selected_columns(session.statements[0]) == ["id", "rating", "created_at"]
+
+
+def test_book_projection_selects_only_requested_and_keyset_columns(scripted_session):
+  session = scripted_session()
+
+  asyncio.run(BookService().get_all_books(session, sort="-page_count", fields=("id", "title")))
+
+  assert _selected_columns(session.statements[0]) == ["id", "title", "page_count"]
+
+
+def test_unknown_field_is_a_422(admin_client):
+  for url in (f"/api/{API_ROUTE_VERSION}/books/", f"/api/{API_ROUTE_VERSION}/reviews/book/{uuid.uuid4()}"):
+    response = admin_client.get(url, params={"fields": "title,nope" if "books" in url else "rating,nope"})
+
+    assert response.status_code == 422
+    assert response.json()["error_code"] == "invalid_fields"
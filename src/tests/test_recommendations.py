@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.books.recommendations import rating_matrix, recommendation_rows, top_k_neighbors
+
+
+def test_top_k_neighbors_match_dense_cosine():
+  rng = np.random.default_rng(7)
+  pairs = {(u, b): r for u, b, r in zip(rng.integers(0, 60, 600), rng.integers(0, 40, 600), rng.integers(1, 6, 600))}
+  users, books = (np.array(column) for column in zip(*pairs))
+  matrix = rating_matrix(users, books, np.array(list(pairs.values())), 60, 40)
+
+  neighbors, scores = top_k_neighbors(matrix, k=3)
+
+  dense = matrix.toarray()
+  norms = np.linalg.norm(dense, axis=0)
+  similarity = dense.T @ dense / np.outer(norms, norms)
+  np.fill_diagonal(similarity, 0)
+  for book in range(40):
+    expected = np.sort(similarity[book][similarity[book] > 0])[::-1][:3]
+    found = scores[book][neighbors[book] >= 0]
+    assert np.allclose(found, expected, atol=1e-5)
+    assert neighbors[book][0] != book
+
+
+def test_rows_skip_books_deleted_during_the_build():
+  book_ids = [uuid.uuid4() for _ in range(3)]
+  neighbors = np.array([[1, 2], [2, 0], [0, -1]], dtype=np.int32)
+  scores = np.array([[0.9, 0.5], [0.8, 0.4], [0.7, 0.0]], dtype=np.float32)
+  now = datetime(2026, 3, 1)
+
+  rows = recommendation_rows(book_ids, neighbors, scores, {book_ids[0], book_ids[2]}, now)
+
+  assert [row[0] for row in rows] == [book_ids[0], book_ids[2]]
+  assert rows[0][1] == [book_ids[2]]
+  assert np.allclose(rows[0][2], [0.5])
+  assert rows[1] == (book_ids[2], [book_ids[0]], [pytest.approx(0.7)], now)
@@ -0,0 +1,175 @@
+import asyncio
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src import API_ROUTE_VERSION
+from src.db.models import Review
+from src.db.pagination import decode_cursor
+from src.errors import BookNotFound, InvalidReview, UserNotFound
+from src.reviews import routes as review_routes
+from src.reviews import service as review_service
+from src.reviews.queries import first_review_pages
+from src.reviews.schemas import ReviewCreate, ReviewFilter
+
+review_prefix = f"/api/{API_ROUTE_VERSION}/reviews"
+
+
+def test_review_filter_compares_in_naive_local_time(server_tz):
+  filters = ReviewFilter(created_from="2024-01-01T00:00:00Z", created_to="2024-01-31T23:00:00-02:00")
+
+  assert filters.created_from == datetime(2024, 1, 1, 2)
+  assert filters.created_to == datetime(2024, 2, 1, 3)
+
+
+def test_aware_created_from_query_reaches_the_service_naive(admin_client, monkeypatch, server_tz):
+  get_all_reviews = AsyncMock(return_value={"items": [], "next_cursor": None})
+  monkeypatch.setattr(review_routes.review_service, "get_all_reviews", get_all_reviews)
+
+  response = admin_client.get(f"{review_prefix}/", params={"created_from": "2024-01-01T00:00:00Z"})
+
+  assert response.status_code == 200
+  assert get_all_reviews.await_args.kwargs["filters"].created_from == datetime(2024, 1, 1, 2)
+
+
+def _delete_review(session):
+  record_rating = AsyncMock(return_value=True)
+  with patch.object(review_service.book_service, "record_rating", record_rating), \
+      patch.object(review_service, "invalidate_book_details", AsyncMock()):
+    deleted = asyncio.run(review_service.ReviewService().delete_review(str(uuid.uuid4()), "jane@example.com", session))
+  return deleted, record_rating
+
+
+def test_delete_review_takes_the_rating_out_once(scripted_session):
+  row = SimpleNamespace(id=uuid.uuid4(), book_id=uuid.uuid4(), rating=4)
+  session = scripted_session([row])
+
+  deleted, record_rating = _delete_review(session)
+
+  assert deleted is row
+  record_rating.assert_awaited_once_with(row.book_id, 4, -1, session)
+  statement = session.statements[0]
+  assert statement.is_delete
+  assert [column.name for column in statement._returning] == ["id", "book_id", "rating"]
+
+
+def test_losing_a_concurrent_delete_leaves_the_aggregates_alone(scripted_session):
+  session = scripted_session([])
+
+  deleted, record_rating = _delete_review(session)
+
+  assert deleted is None
+  record_rating.assert_not_awaited()
+  session.commit.assert_not_awaited()
+
+
+def _review(book_id, day: int) -> Review:
+  return Review(
+    id=uuid.uuid4(), book_id=book_id, user_id=uuid.uuid4(), rating=4, review_text="Good",
+    created_at=datetime(2026, 3, day), updated_at=datetime(2026, 3, day),
+  )
+
+
+def test_first_review_pages_groups_the_lateral_rows_per_book(scripted_session):
+  busy, quiet, unreviewed = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+  # LATERAL returns up to limit + 1 newest reviews of each book, books interleaved
+  busy_reviews = [_review(busy, day) for day in (9, 8, 7)]
+  quiet_review = _review(quiet, 5)
+  session = scripted_session([busy_reviews[0], quiet_review, busy_reviews[1], busy_reviews[2]])
+
+  pages = asyncio.run(first_review_pages(session, [busy, quiet, unreviewed], 2))
+
+  assert pages[busy]["items"] == busy_reviews[:2]
+  # the cursor points at the last review shown, so the next page starts at the third
+  assert decode_cursor(pages[busy]["next_cursor"], datetime.fromisoformat, uuid.UUID) == (
+    datetime(2026, 3, 8), busy_reviews[1].id,
+  )
+  assert pages[quiet] == {"items": [quiet_review], "next_cursor": None}
+  assert pages[unreviewed] == {"items": [], "next_cursor": None}
+  assert len(session.statements) == 1
+
+
+def test_first_review_pages_skips_the_query_without_books(scripted_session):
+  session = scripted_session()
+
+  assert asyncio.run(first_review_pages(session, [], 2)) == {}
+  assert session.statements == []
+
+
+class _AsyncpgError(Exception):
+  def __init__(self, constraint):
+    super().__init__(constraint)
+    self.constraint_name = constraint
+
+
+class _DriverError(Exception):
+  """What an asyncpg failure looks like behind SQLAlchemy's IntegrityError."""
+
+  def __init__(self, sqlstate, constraint=None):
+    super().__init__(sqlstate)
+    self.sqlstate = sqlstate
+    self.__cause__ = _AsyncpgError(constraint)
+
+
+def _create_review(scripted_session, error=None, book_exists=True):
+  session = scripted_session([SimpleNamespace(id=uuid.uuid4())])
+  if error is not None:
+    session.execute = AsyncMock(side_effect=IntegrityError("INSERT INTO reviews", {}, error))
+  with patch.object(review_service.book_service, "record_rating", AsyncMock(return_value=book_exists)), \
+      patch.object(review_service, "invalidate_book_details", AsyncMock()), \
+      patch.object(review_service.trending, "record", Mock()):
+    review = asyncio.run(review_service.ReviewService().create_review(
+      uuid.uuid4(), uuid.uuid4(), ReviewCreate(rating=4, review_text="Good"), session
+    ))
+  return review, session
+
+
+@pytest.mark.parametrize("error, expected", [
+  (_DriverError(review_service.FOREIGN_KEY_VIOLATION, "reviews_book_id_fkey"), BookNotFound),
+  (_DriverError(review_service.FOREIGN_KEY_VIOLATION, "reviews_user_id_fkey"), UserNotFound),
+  (_DriverError(review_service.NOT_NULL_VIOLATION), InvalidReview),
+])
+def test_create_review_maps_constraint_violations(scripted_session, error, expected):
+  with pytest.raises(expected):
+    _create_review(scripted_session, error)
+
+
+def test_create_review_reraises_unexpected_integrity_errors(scripted_session):
+  with pytest.raises(IntegrityError):
+    _create_review(scripted_session, _DriverError("23505", "reviews_pkey"))
+
+
+def test_create_review_for_a_missing_book_inserts_nothing(scripted_session):
+  with pytest.raises(BookNotFound):
+    _create_review(scripted_session, book_exists=False)
+
+
+def test_create_review_commits_the_insert(scripted_session):
+  review, session = _create_review(scripted_session)
+
+  assert session.statements[0].is_insert
+  session.commit.assert_awaited_once()
+
+
+@pytest.mark.parametrize("body", [{"rating": 4}, {"rating": 4, "review_text": None}, {"rating": 4, "review_text": "a\x00b"}])
+def test_review_text_is_required(admin_client, monkeypatch, body):
+  create_review = AsyncMock()
+  monkeypatch.setattr(review_routes.review_service, "create_review", create_review)
+
+  response = admin_client.post(f"{review_prefix}/book/{uuid.uuid4()}", json=body)
+
+  assert response.status_code == 422
+  create_review.assert_not_awaited()
+
+
+def test_constraint_errors_reach_the_client_as_404_and_422(admin_client, monkeypatch):
+  url = f"{review_prefix}/book/{uuid.uuid4()}"
+  body = {"rating": 4, "review_text": "Good"}
+
+  for error, status_code in ((BookNotFound(), 404), (UserNotFound(), 404), (InvalidReview(), 422)):
+    monkeypatch.setattr(review_routes.review_service, "create_review", AsyncMock(side_effect=error))
+    assert admin_client.post(url, json=body).status_code == status_code
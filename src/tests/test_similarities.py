@@ -0,0 +1,70 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.books import similarities
+from src.db import main as db_main
+from src.books.service import BookService
+from src.celery_tasks import refresh_book_similarities
+
+
+def test_queue_refresh_splits_large_changes_into_several_tasks():
+  book_ids = [uuid.uuid4() for _ in range(similarities.SIMILARITY_TASK_BOOKS + 1)]
+
+  with patch.object(refresh_book_similarities, "apply_async") as apply_async:
+    similarities.queue_refresh(book_ids + book_ids[:3])
+
+  sent = [call.args[0][0] for call in apply_async.call_args_list]
+  assert [len(ids) for ids in sent] == [similarities.SIMILARITY_TASK_BOOKS, 1]
+  assert sent[0][0] == str(book_ids[0])
+  assert all(call.kwargs == {"retry": False} for call in apply_async.call_args_list)
+
+
+def test_queue_refresh_swallows_broker_failures():
+  with patch.object(refresh_book_similarities, "apply_async", side_effect=ConnectionError("broker down")):
+    similarities.queue_refresh([uuid.uuid4()])
+
+
+def test_refresh_runs_one_transaction_per_batch():
+  book_ids = [uuid.uuid4() for _ in range(2 * similarities.SIMILARITY_BATCH + 1)]
+  session = MagicMock(commit=AsyncMock())
+  session.__aenter__ = AsyncMock(return_value=session)
+  session.__aexit__ = AsyncMock(return_value=False)
+  engine = MagicMock(dispose=AsyncMock())
+
+  with patch.object(db_main, "create_async_engine", return_value=engine), \
+      patch.object(db_main, "AsyncSession", return_value=session), \
+      patch.object(similarities.book_service, "refresh_similarities", AsyncMock()) as refresh:
+    assert asyncio.run(similarities.refresh_similarities(book_ids)) == len(book_ids)
+
+  assert [len(call.args[0]) for call in refresh.call_args_list] == [100, 100, 1]
+  assert session.commit.await_count == 3
+  engine.dispose.assert_awaited_once()
+
+
+def _writes(statement, verb: str) -> bool:
+  return getattr(statement, f"is_{verb}") and statement.table.name == "book_similarities"
+
+
+def test_holders_are_rescored_in_place_and_only_short_lists_rebuilt(scripted_session):
+  changed, full_holder, short_holder = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+  session = scripted_session(
+    [],  # advisory lock
+    [full_holder, short_holder],  # holders that lost the changed book
+    [],  # delete the changed book's list
+    [changed],  # its rebuilt list
+    [full_holder],  # holders still at SIMILAR_BOOKS_KEPT
+    [],  # delete the short holder's list
+    [short_holder],  # its rebuilt list
+  )
+
+  asyncio.run(BookService().refresh_similarities([changed], session))
+
+  # the held pairs are rescored by an UPDATE riding along the DELETE of pairs that no longer overlap
+  rescore = session.statements[1]
+  assert _writes(rescore, "delete")
+  (rescored,) = rescore._independent_ctes
+  assert _writes(rescored.element, "update")
+  # only the changed book and the holder that fell short are recomputed from scratch
+  assert sum(_writes(statement, "insert") for statement in session.statements) == 2
+  assert len(session.statements) == 7
@@ -0,0 +1,54 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.tags import cache as tag_cache
+from src.tags.cache import TagNameCache
+
+
+def test_tag_name_cache_evicts_least_recently_used():
+  cache = TagNameCache(maxsize=2)
+  python, data, ml = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+  cache.put("python", python)
+  cache.put("data", data)
+  assert cache.get("python") == python  # now the most recent
+  cache.put("ml", ml)
+
+  assert cache.get("data") is None
+  assert cache.get("python") == python
+  assert len(cache) == 2
+
+  cache.discard(["python", "unknown"])
+  assert cache.get("python") is None
+
+
+def test_ids_are_cached_only_when_the_transaction_commits(tag_ids):
+  session = AsyncSession()
+  rolled_back, committed = uuid.uuid4(), uuid.uuid4()
+
+  session.sync_session.begin()
+  tag_cache.remember(session, {"rolled-back": rolled_back})
+  session.sync_session.rollback()
+  assert tag_ids.get("rolled-back") is None
+
+  session.sync_session.begin()
+  tag_cache.remember(session, {"committed": committed})
+  assert tag_ids.get("committed") is None
+  session.sync_session.commit()
+  assert tag_ids.get("committed") == committed
+
+
+def test_invalidate_forgets_names_and_tells_the_other_workers(tag_ids, monkeypatch):
+  publish = AsyncMock()
+  monkeypatch.setattr(tag_cache.redis_client, "publish", publish)
+  tag_ids.put("python", uuid.uuid4())
+  tag_ids.put("data", uuid.uuid4())
+
+  asyncio.run(tag_cache.invalidate("python"))
+
+  assert tag_ids.get("python") is None
+  assert tag_ids.get("data") is not None
+  publish.assert_awaited_once_with(tag_cache.TAG_INVALIDATION_CHANNEL, '["python"]')
@@ -0,0 +1,56 @@
+import operator
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.sql.selectable import Exists
+
+from src import API_ROUTE_VERSION
+from src.books.schemas import BookFilter, tag_query_terms
+from src.books.service import BookService
+
+
+def test_tag_query_terms_split_and_or_not():
+  assert tag_query_terms("python,data|ml,-beginner|intro") == [
+    (False, ("python",)),
+    (False, ("data", "ml")),
+    (True, ("beginner", "intro")),
+  ]
+
+
+def test_spaces_around_terms_and_names_are_ignored():
+  assert tag_query_terms(BookFilter(tags="python, -beginner , data | science fiction").tags) == [
+    (False, ("python",)),
+    (True, ("beginner",)),
+    (False, ("data", "science fiction")),
+  ]
+
+
+def test_hyphens_inside_names_are_kept():
+  assert tag_query_terms(BookFilter(tags="sci-fi,-non-fiction").tags) == [
+    (False, ("sci-fi",)),
+    (True, ("non-fiction",)),
+  ]
+
+
+@pytest.mark.parametrize("tags", ["a,,b", "a|", "-", "a,-b|", "a,  ", " ,a", "a| |b", " - ", "--a", "a,- -b"])
+def test_malformed_tag_queries_are_rejected(tags):
+  with pytest.raises(ValidationError):
+    BookFilter(tags=tags)
+
+
+@pytest.mark.parametrize("tags", ["a,  ", " ,a"])
+def test_blank_tag_names_are_a_422(admin_client, tags):
+  response = admin_client.get(f"/api/{API_ROUTE_VERSION}/books/", params={"tags": tags})
+
+  assert response.status_code == 422
+  assert response.json()["detail"][0]["loc"] == ["query", "tags"]
+
+
+def test_negated_terms_become_not_exists():
+  positive, negated = BookService()._tag_clauses("python, -beginner")
+
+  assert isinstance(positive, Exists)
+  assert negated.operator is operator.inv
+  assert isinstance(negated.element.element, Exists)
+  assert ["python"] in positive.compile().params.values()
+  assert ["beginner"] in negated.compile().params.values()
@@ -0,0 +1,160 @@
+import asyncio
+import uuid
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects import postgresql as pg
+
+from src import API_ROUTE_VERSION
+from src.db.models import BookTag, Tag
+from src.db.pagination import decode_cursor, encode_cursor
+from src.errors import InvalidCursor
+from src.tags import cache as tag_cache
+from src.tags.service import TagService
+
+tag_service = TagService()
+
+
+def _tag(book_count: int) -> dict:
+  return {"id": uuid.uuid4(), "name": f"tag-{book_count}", "created_at": datetime(2026, 3, 1), "book_count": book_count}
+
+
+@pytest.mark.parametrize("sort", ["popularity", "-book_count-", "--name", "book_count,name"])
+def test_unknown_tag_sort_is_a_422(admin_client, sort):
+  response = admin_client.get(f"/api/{API_ROUTE_VERSION}/tags/", params={"sort": sort})
+
+  assert response.status_code == 422
+
+
+def test_tag_page_reads_the_maintained_count_and_hands_back_a_cursor(scripted_session, assert_same_clauses):
+  rows = [_tag(count) for count in (9, 7, 4)]
+  session = scripted_session(rows)
+
+  page = asyncio.run(tag_service.get_tags(session, sort="-book_count", limit=2))
+
+  assert page["items"] == rows[:2]
+  assert decode_cursor(page["next_cursor"], str, int, uuid.UUID) == ("-book_count", 7, rows[1]["id"])
+  statement = session.statements[0]
+  # the maintained count, not a join to book_tag
+  assert [table.name for table in statement.get_final_froms()] == ["tags"]
+  assert_same_clauses(statement._order_by_clauses, [Tag.book_count.desc(), Tag.id.desc()])
+
+
+def test_tag_cursor_continues_after_the_last_row(scripted_session, assert_same_clauses):
+  session = scripted_session()
+  tag_id = uuid.uuid4()
+
+  asyncio.run(tag_service.get_tags(session, sort="name", limit=2, cursor=encode_cursor("name", "fantasy", tag_id)))
+
+  assert_same_clauses([session.statements[0].whereclause], [tuple_(Tag.name, Tag.id) > tuple_("fantasy", tag_id)])
+
+
+@pytest.mark.parametrize("cursor", [
+  encode_cursor("-book_count", 7, str(uuid.uuid4())),  # issued for another sort
+  encode_cursor("name", "fantasy"),
+  encode_cursor("book_count", "many", str(uuid.uuid4())),
+  "not-a-cursor",
+])
+def test_tag_cursor_must_match_the_sort(scripted_session, cursor):
+  with pytest.raises(InvalidCursor):
+    asyncio.run(tag_service.get_tags(scripted_session(), sort="book_count", cursor=cursor))
+
+
+@pytest.mark.parametrize("sign", [1, -1])
+def test_recount_moves_each_tag_by_its_links(sign):
+  links = delete(BookTag).returning(BookTag.book_id, BookTag.tag_id).cte("links")
+  counts = select(links.c.tag_id, func.count().label("n")).group_by(links.c.tag_id).subquery("counts")
+
+  recount = tag_service._recount(links, sign).element
+
+  assert recount.is_update and recount.table.name == "tags"
+  (moved,) = recount._values.values()
+  assert moved.compare(Tag.book_count + sign * counts.c.n)
+
+
+def test_detach_takes_the_removed_links_off_the_counts(scripted_session, monkeypatch):
+  book_id = uuid.uuid4()
+  session = scripted_session([book_id])
+  recount = Mock(wraps=tag_service._recount)
+  monkeypatch.setattr(tag_service, "_recount", recount)
+
+  assert asyncio.run(tag_service._detach([book_id], ["fantasy"], session)) == {book_id}
+
+  links, sign = recount.call_args.args
+  assert sign == -1
+  assert links.element.is_delete and links.element.table.name == "book_tag"
+  assert [cte.name for cte in session.statements[0]._independent_ctes] == ["recounted"]
+
+
+def test_upsert_reads_cached_names_and_upserts_the_rest_in_one_statement(scripted_session, tag_ids, monkeypatch):
+  cached, fantasy, python = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+  tag_ids.put("cached", cached)
+  session = scripted_session([("fantasy", fantasy), ("python", python)])
+  remember = Mock()
+  monkeypatch.setattr(tag_cache, "remember", remember)
+
+  found = asyncio.run(tag_service._upsert_tags(["python", "cached", "fantasy", "python"], session))
+
+  assert found == {"cached": cached, "fantasy": fantasy, "python": python}
+  (statement,) = session.statements
+  assert statement.is_insert and statement.table.name == "tags"
+  # DO UPDATE, so tags that already exist still come back in RETURNING
+  assert isinstance(statement._post_values_clause, pg.dml.OnConflictDoUpdate)
+  # missing names in sorted order, so concurrent upserts lock them in the same order
+  assert [value for key, value in statement.compile().params.items() if key.startswith("name")] == ["fantasy", "python"]
+  # learned ids wait for the commit before they are cached
+  remember.assert_called_once_with(session, {"fantasy": fantasy, "python": python})
+
+
+def test_upsert_of_cached_names_runs_no_statement(scripted_session, tag_ids):
+  tag_ids.put("python", uuid.uuid4())
+  session = scripted_session()
+
+  asyncio.run(tag_service._upsert_tags(["python"], session))
+
+  assert session.statements == []
+
+
+def test_attach_links_and_counts_in_one_statement(scripted_session, tag_ids, monkeypatch):
+  book_id, tag_id = uuid.uuid4(), uuid.uuid4()
+  session = scripted_session([([book_id], [tag_id])])
+  recount = Mock(wraps=tag_service._recount)
+  monkeypatch.setattr(tag_service, "_recount", recount)
+
+  attached = asyncio.run(tag_service._attach([book_id], {"python": tag_id}, session))
+
+  assert attached == {book_id}
+  assert len(session.statements) == 1
+  links, sign = recount.call_args.args
+  assert sign == 1
+  # existing links are skipped, so only new ones reach the count
+  assert links.element.is_insert and links.element.table.name == "book_tag"
+  assert isinstance(links.element._post_values_clause, pg.dml.OnConflictDoNothing)
+  assert [cte.name for cte in session.statements[0]._independent_ctes] == ["recounted"]
+
+
+def test_attach_relinks_names_whose_cached_id_went_stale(scripted_session, tag_ids, monkeypatch):
+  book_id, kept, stale, recreated = uuid.uuid4(), uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+  tag_ids.put("fantasy", stale)
+  session = scripted_session(
+    [([book_id], [kept])],  # the stale id links nothing
+    [("fantasy", recreated)],  # upsert of the stale name
+    [([book_id], [recreated])],  # second pass
+  )
+  monkeypatch.setattr(tag_cache, "remember", Mock())
+
+  attached = asyncio.run(tag_service._attach([book_id], {"python": kept, "fantasy": stale}, session))
+
+  assert attached == {book_id}
+  assert tag_ids.get("fantasy") is None
+  assert len(session.statements) == 3
+  assert session.statements[1].is_insert and session.statements[1].table.name == "tags"
+
+
+def test_attach_without_tags_runs_no_statement(scripted_session):
+  session = scripted_session()
+
+  assert asyncio.run(tag_service._attach([uuid.uuid4()], {}, session)) == set()
+  assert session.statements == []
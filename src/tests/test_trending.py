@@ -0,0 +1,116 @@
+import asyncio
+import uuid
+
+import fakeredis
+import pytest
+
+from src.books import trending
+
+# 2026-03-02 06:00 UTC, a quarter of the way into the day
+NOW = 1772431200.0
+
+
+@pytest.fixture
+def redis(monkeypatch):
+  client = fakeredis.FakeAsyncRedis()
+  monkeypatch.setattr(trending, "redis_client", client)
+  monkeypatch.setattr(trending.time, "time", lambda: NOW)
+  return client
+
+
+async def _score(client, key, book_id):
+  return await client.zscore(key, str(book_id))
+
+
+def test_record_counts_the_book_in_its_hour_and_day(redis):
+  book_id = uuid.uuid4()
+
+  async def scenario():
+    trending.record(book_id)
+    trending.record(book_id, trending.REVIEW_WEIGHT)
+    await asyncio.gather(*trending._pending)
+    hour, day = trending.bucket_key(trending.current_bucket()), trending.day_key(trending.current_day())
+    return (
+      await _score(redis, hour, book_id), await _score(redis, day, book_id),
+      await redis.ttl(hour), await redis.ttl(day),
+    )
+
+  hourly, daily, hour_ttl, day_ttl = asyncio.run(scenario())
+
+  assert hourly == daily == trending.VIEW_WEIGHT + trending.REVIEW_WEIGHT
+  assert hour_ttl == trending.BUCKET_TTL
+  assert day_ttl == trending.DAY_BUCKET_TTL
+  assert not trending._pending
+
+
+def test_day_window_merges_the_last_24_hours_only(redis):
+  fresh, stale = uuid.uuid4(), uuid.uuid4()
+  now = trending.current_bucket()
+
+  async def scenario():
+    await redis.zadd(trending.bucket_key(now), {str(fresh): 2})
+    await redis.zadd(trending.bucket_key(now - 23), {str(fresh): 1, str(stale): 1})
+    await redis.zadd(trending.bucket_key(now - 24), {str(stale): 10})
+    return await trending.top_books("day", 10)
+
+  assert asyncio.run(scenario()) == [(fresh, 3.0), (stale, 1.0)]
+
+
+def test_week_window_merges_eight_days_weighting_the_oldest(redis):
+  steady, old = uuid.uuid4(), uuid.uuid4()
+  today = trending.current_day()
+
+  assert trending.window_buckets("week") == {
+    **{trending.day_key(day): 1 for day in range(today - 6, today + 1)},
+    trending.day_key(today - 7): 0.75,
+  }
+
+  async def scenario():
+    for day in range(today - 6, today + 1):
+      await redis.zadd(trending.day_key(day), {str(steady): 1})
+    await redis.zadd(trending.day_key(today - 7), {str(old): 8})
+    await redis.zadd(trending.day_key(today - 8), {str(old): 100})
+    first = await trending.top_books("week", 10)
+    # the merged window is reused until it expires
+    await redis.zadd(trending.day_key(today), {str(steady): 50})
+    return first, await trending.top_books("week", 10), await redis.ttl(f"trending:window:week:{trending.current_bucket()}")
+
+  first, cached, ttl = asyncio.run(scenario())
+
+  assert first == [(steady, 7.0), (old, 6.0)]
+  assert cached == first
+  assert 0 < ttl <= trending.MERGED_TTL
+
+
+def test_compact_trims_finished_buckets_and_drops_expired_ones(redis, monkeypatch):
+  monkeypatch.setattr(trending, "BUCKET_SIZE", 2)
+  now, today = trending.current_bucket(), trending.current_day()
+  members = {str(uuid.uuid4()): score for score in range(1, 6)}
+  keys = [
+    trending.bucket_key(now), trending.bucket_key(now - 1), trending.bucket_key(now - 24),
+    trending.day_key(today), trending.day_key(today - 1), trending.day_key(today - 8),
+  ]
+
+  async def scenario():
+    for key in keys:
+      await redis.zadd(key, members)
+    report = await trending.compact(redis)
+    sizes = [await redis.zcard(key) for key in keys]
+    leaders = await redis.zrevrange(trending.bucket_key(now - 1), 0, -1, withscores=True)
+    return report, sizes, leaders
+
+  report, sizes, leaders = asyncio.run(scenario())
+
+  assert report == {"trimmed": 6, "dropped": 2}
+  # the running hour and day are left alone
+  assert sizes == [5, 2, 0, 5, 2, 0]
+  assert [score for _, score in leaders] == [5.0, 4.0]
+
+
+def test_top_books_is_empty_when_redis_fails(redis, monkeypatch):
+  async def broken(*args, **kwargs):
+    raise trending.RedisError("down")
+
+  monkeypatch.setattr(redis, "exists", broken)
+
+  assert asyncio.run(trending.top_books("day", 10)) == []